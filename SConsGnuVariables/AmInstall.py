@@ -0,0 +1,488 @@
+"""SConsGnuVariables.AmInstall
+
+Installation of files declared with automake's uniform names.
+
+Automake splits installation into two parts: ``install-exec`` installs
+architecture-dependent files (``bin_PROGRAMS``, ``lib_LTLIBRARIES``, ...) and
+``install-data`` installs architecture-independent ones (``include_HEADERS``,
+``pkgdata_DATA``, ...), see `AmUniformNames.install_category()
+<SConsGnuVariables.AmUniformNames.install_category>`. This module brings the
+same to SCons: given a dictionary of uniform names and their source files,
+`install_uniform_names()` creates the ``install-exec``, ``install-data``,
+``install`` and ``uninstall`` aliases.
+
+The destination of ``PREFIX_PRIMARY`` files is the ``PREFIXdir`` variable
+(e.g. ``${bindir}`` for ``bin_PROGRAMS``, ``${pkgincludedir}`` for
+``pkginclude_HEADERS``), taken from the environment or, if not defined there,
+resolved with `GnuDirVariables.ResolveVariables()
+<SConsGnuVariables.GnuDirVariables.ResolveVariables>`. Files listed under
+``nobase_`` names keep their subdirectories, other files are installed
+directly to the destination directory. ``noinst_`` and ``check_`` names are
+skipped. As in automake, ``man_MANS`` pages go to the ``manN`` subdirectory
+of ``${mandir}``, where ``N`` is the section given by the file's extension
+(``foo.1`` to ``${mandir}/man1``), unless ``${manNdir}`` is set to other
+than its default. ``info_TEXINFOS`` install the ``.info`` files built from
+the listed Texinfo sources.
+
+The files are grouped by destination directory and ``env.Install()`` is
+called once per directory, which keeps the setup fast for large trees.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import GnuDirVariables, AmInstall
+    env = Environment()
+    GnuDirVariables.AddToSConsEnvironment(env)
+    env['package'] = 'foo'
+    AmInstall.InstallUniformNames(env, {
+        'bin_PROGRAMS' : env.Program('foo', 'foo.c'),
+        'nobase_pkginclude_HEADERS' : ['foo.h', 'detail/bar.h'],
+    })
+
+after which ``scons install`` installs ``foo`` to ``${bindir}`` and headers
+to ``${pkgincludedir}`` and ``${pkgincludedir}/detail``.
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import posixpath
+
+from SConsGnuVariables import AmUniformNames
+from SConsGnuVariables import GnuDirVariables
+
+# Default names of the aliases, keyed by role.
+_default_aliases = { 'exec' : 'install-exec', 'data' : 'install-data',
+                     'install' : 'install', 'uninstall' : 'uninstall' }
+
+# Man page sections, as found in extensions of ``man_MANS`` files.
+_man_sections = '0123456789ln'
+
+# Directory variables of man page sections.
+_man_variables = frozenset('man%sdir' % s for s in _man_sections)
+
+# Default templates of man section variables.
+_man_defaults = dict((t[0], t[2]) for t in GnuDirVariables._variable_templates
+                     if t[0] in _man_variables)
+
+# Extensions of Texinfo sources.
+_texinfo_extensions = ('.texi', '.texinfo', '.txi')
+
+#############################################################################
+def _man_variable(name):
+    """Return ``manNdir`` variable for man page ``name`` listed under
+    ``man_MANS``, ``N`` being the first character of its extension.
+
+    **Example**:
+
+        >>> from SConsGnuVariables.AmInstall import _man_variable
+        >>> _man_variable('foo.1'), _man_variable('bar.3x')
+        ('man1dir', 'man3dir')
+    """
+    ext = posixpath.splitext(name)[1]
+    if len(ext) < 2 or ext[1] not in _man_sections:
+        raise ValueError("can't determine man section of %r" % name)
+    return 'man%sdir' % ext[1]
+
+#############################################################################
+def _man_section_dir(variable, mandir):
+    """Return ``manN`` subdirectory of ``mandir`` for ``manNdir`` section
+    ``variable``.
+
+    The defaults of ``manNdir`` variables in `GnuDirVariables` predate
+    ``${mandir}``, so man pages are installed under ``${mandir}`` unless the
+    section directory is set explicitly.
+    """
+    return posixpath.join(mandir, variable[:-len('dir')])
+
+#############################################################################
+def _info_file(node):
+    """Return the ``.info`` file built from Texinfo source ``node`` (file
+    name or SCons node)."""
+    name = node if isinstance(node, str) else node.name
+    base, ext = posixpath.splitext(name)
+    if ext not in _texinfo_extensions:
+        return node
+    if isinstance(node, str):
+        return base + '.info'
+    return node.dir.File(base + '.info')
+
+#############################################################################
+def _variable_groups(funame, main_prefix, files):
+    """Return ``[ (variable, files) ]``, ``files`` listed under ``funame``
+    grouped by their destination directory variables.
+
+    Man pages listed under ``man_MANS`` (also ``dist_man_MANS``,
+    ``notrans_man_MANS``, ...) are grouped by their sections, Texinfo
+    sources are replaced with their ``.info`` files.
+    """
+    if funame.endswith('_TEXINFOS'):
+        files = [_info_file(f) for f in files]
+    if main_prefix != 'man' or not funame.endswith('_MANS'):
+        return [(main_prefix + 'dir', files)]
+    groups = {}
+    for node in files:
+        name = node if isinstance(node, str) else node.name
+        groups.setdefault(_man_variable(name), []).append(node)
+    return sorted(groups.items())
+
+#############################################################################
+def partition_sources(sources, **kw):
+    """Partition ``{ funame : files }`` by install category, in one pass.
+
+    :Parameters:
+        sources : dict
+            dictionary ``{ funame : files }``
+    :Keywords:
+        [all]
+            see `decompose_name()
+            <SConsGnuVariables.AmUniformNames.decompose_name>`
+    :Returns:
+        dictionary ``{ category : [ (funame, add_prefixes, main_prefix,
+        files), ... ] }`` with keys ``'exec'``, ``'data'`` and ``'noinst'``,
+        names sorted alphabetically within each category
+    :Raises:
+        ValueError
+            if any of the names is not a valid uniform name
+    """
+    main_prefixes = kw.get('main_prefixes')
+    use_std_main_prefixes = kw.get('use_std_main_prefixes', True)
+    result = { 'exec' : [], 'data' : [], 'noinst' : [] }
+    for funame in sorted(sources):
+        add_prefixes, main_prefix, primary = AmUniformNames.DecomposeName(
+            funame, **kw)
+        category = AmUniformNames.install_category(main_prefix, main_prefixes,
+                                                   use_std_main_prefixes)
+        if category is None:
+            raise ValueError("can't determine install category of %r" % funame)
+        result[category].append((funame, add_prefixes, main_prefix,
+                                 sources[funame]))
+    return result
+
+#############################################################################
+def plan_install(sources, overrides=None, destdir='', srcdir=None, **kw):
+    """Compute installation plan without SCons.
+
+    **Example**:
+
+        >>> from SConsGnuVariables.AmInstall import plan_install
+        >>> plan_install({'nobase_include_HEADERS' : ['foo/bar.h'],
+        ...               'bin_SCRIPTS' : ['foo.sh']}, {'prefix' : '/usr'})
+        [('data', 'includedir', 'foo/bar.h', '/usr/include/foo/bar.h'), ('exec', 'bindir', 'foo.sh', '/usr/bin/foo.sh')]
+        >>> plan_install({'man_MANS' : ['foo.1', 'foo.conf.5']},
+        ...              {'prefix' : '/usr'})
+        [('data', 'man1dir', 'foo.1', '/usr/share/man/man1/foo.1'), ('data', 'man5dir', 'foo.conf.5', '/usr/share/man/man5/foo.conf.5')]
+
+    :Parameters:
+        sources : dict
+            dictionary ``{ funame : [ file, ... ] }``, with file names
+        overrides : dict | None
+            see `GnuDirVariables.ResolveVariables()
+            <SConsGnuVariables.GnuDirVariables.ResolveVariables>`
+        destdir : str
+            staging directory, see `GnuDirVariables.StagedVariables()
+            <SConsGnuVariables.GnuDirVariables.StagedVariables>`
+        srcdir : str | None
+            directory against which subdirectories of ``nobase_`` files are
+            determined, current directory by default
+    :Keywords:
+        [all]
+            see `partition_sources()`
+    :Returns:
+        list of ``(category, variable, source, dest)`` tuples, as accepted
+        by `Installer.execute_plan()
+        <SConsGnuVariables.Installer.execute_plan>`, ordered by category and
+        name; ``noinst`` names are omitted
+    :Raises:
+        ValueError
+            if a directory is not defined, a ``nobase_`` file is outside of
+            ``srcdir`` or a ``man_MANS`` file has no section extension
+    """
+    if overrides is None:
+        overrides = {}
+    staged = GnuDirVariables.StagedVariables(destdir, overrides)
+    if srcdir is None:
+        srcdir = os.curdir
+    partitioned = partition_sources(sources, **kw)
+    plan = []
+    for category in ('data', 'exec'):
+        for funame, add_prefixes, main_prefix, files in partitioned[category]:
+            nobase = 'nobase' in add_prefixes
+            if isinstance(files, str):
+                files = [files]
+            for variable, group in _variable_groups(funame, main_prefix,
+                                                    files):
+                if variable in _man_variables and variable not in overrides:
+                    base = staged.get('mandir')
+                    if base:
+                        base = _man_section_dir(variable, base)
+                else:
+                    base = staged.get(variable)
+                if not base:
+                    raise ValueError("installation directory %r is not "
+                                     "defined" % variable)
+                for source in group:
+                    if nobase:
+                        relpath = os.path.relpath(source, srcdir)
+                        relpath = posixpath.normpath(relpath.replace(os.sep,
+                                                                     '/'))
+                        if relpath.startswith('..'):
+                            raise ValueError("nobase file %r is outside of %r"
+                                             % (source, srcdir))
+                    else:
+                        relpath = os.path.basename(source)
+                    plan.append((category, variable, source,
+                                 posixpath.join(base, relpath)))
+    return plan
+
+#############################################################################
+def _directory_resolver(env):
+    """Return function mapping directory variable names to their values in
+    ``env``, memoized.
+
+    Man section variables left at their defaults map to subdirectories of
+    ``${mandir}``, see `_man_section_dir()`.
+    """
+    cache = {}
+    resolved = []
+    def resolve(name):
+        try:
+            return cache[name]
+        except KeyError:
+            pass
+        if name in _man_variables and \
+           env.get(name, _man_defaults.get(name)) == _man_defaults.get(name):
+            value = _man_section_dir(name, resolve('mandir'))
+        elif name in env:
+            value = env.subst('${%s}' % name)
+        else:
+            if not resolved:
+                overrides = GnuDirVariables._environment_overrides(env)
+                resolved.append(GnuDirVariables.ResolveVariables(overrides))
+            value = resolved[0].get(name)
+        if not value:
+            raise ValueError("installation directory %r is not defined" % name)
+        cache[name] = value
+        return value
+    return resolve
+
+#############################################################################
+def _relative_subdir(env, node, srcdir, is_cwd):
+    """Return directory part of ``node``'s path relative to ``srcdir``.
+
+    If ``srcdir`` is the current directory (``is_cwd``), relative file names
+    are handled without creating nodes, the nodes are then created once by
+    ``env.Install()``.
+    """
+    if is_cwd and isinstance(node, str) and not node.startswith(('#', '/')) \
+       and not os.path.isabs(node):
+        subdir = posixpath.dirname(posixpath.normpath(node.replace(os.sep,
+                                                                   '/')))
+    else:
+        if isinstance(node, str):
+            node = env.File(node)
+        subdir = posixpath.dirname(node.get_path(srcdir).replace(os.sep, '/'))
+    if subdir.startswith('..'):
+        raise ValueError("nobase file %r is outside of %r"
+                         % (str(node), str(srcdir)))
+    return subdir
+
+#############################################################################
+def group_by_directory(env, entries, srcdir=None, destdir='', variables=None):
+    """Group files by their destination directories.
+
+    :Parameters:
+        env
+            SCons environment
+        entries : sequence
+            ``(funame, add_prefixes, main_prefix, files)`` tuples, as returned
+            by `partition_sources()`
+        srcdir
+            directory against which subdirectories of ``nobase_`` files are
+            determined, the current SConscript's directory by default
+        destdir : str
+            staging directory prepended to destinations
+        variables : dict | None
+            if given, it's updated with ``{ directory : variable }``, the
+            names of GNU directory variables the directories belong to
+    :Returns:
+        list of ``(directory, files)`` pairs sorted by directory, ``files``
+        being nodes or file names
+    """
+    import SCons.Util
+    cwd = env.Dir('.')
+    if srcdir is None:
+        srcdir = cwd
+    else:
+        srcdir = env.Dir(srcdir)
+    is_cwd = srcdir is cwd
+    resolve = _directory_resolver(env)
+    if destdir:
+        destdir = destdir.rstrip('/')
+    groups = {}
+    if variables is None:
+        variables = {}
+    for funame, add_prefixes, main_prefix, files in entries:
+        nobase = 'nobase' in add_prefixes
+        files = SCons.Util.flatten(files)
+        for variable, group in _variable_groups(funame, main_prefix, files):
+            base = destdir + resolve(variable)
+            if not nobase:
+                groups.setdefault(base, []).extend(group)
+                variables.setdefault(base, variable)
+                continue
+            for node in group:
+                subdir = _relative_subdir(env, node, srcdir, is_cwd)
+                directory = posixpath.join(base, subdir) if subdir else base
+                groups.setdefault(directory, []).append(node)
+                variables.setdefault(directory, variable)
+    return sorted(groups.items())
+
+#############################################################################
+def _uninstall_action(paths, directories, cache=None):
+    def uninstall(target, source, env):
+        from SConsGnuVariables import Installer
+        Installer.remove_installed(paths, directories, cache = cache)
+        return 0
+    return uninstall
+
+#############################################################################
+def _uninstall_manifest_action(manifest, cache=None):
+    def uninstall(target, source, env):
+        from SConsGnuVariables import Installer
+        if os.path.exists(manifest):
+            Installer.uninstall(manifest, cache = cache)
+        return 0
+    return uninstall
+
+#############################################################################
+def install_uniform_names(env, sources, aliases=None, srcdir=None,
+                          destdir=None, install_cache=None,
+                          install_methods=None, install_manifest=None, **kw):
+    """Create install aliases for files declared with uniform names.
+
+    **Note**
+
+    You may wish to use `InstallUniformNames()` instead.
+
+    :Parameters:
+        env
+            SCons environment
+        sources : dict
+            dictionary ``{ funame : files }``, e.g.
+            ``{ 'bin_PROGRAMS' : env.Program('foo.c') }``; ``files`` may be
+            nodes, file names or (nested) lists of them
+        aliases : dict | None
+            alternative alias names, keyed by ``'exec'``, ``'data'``,
+            ``'install'`` and ``'uninstall'``
+        srcdir
+            see `group_by_directory()`
+        destdir : str | None
+            staging directory, ``${DESTDIR}`` from ``env`` by default
+        install_cache : str | None
+            if given, files already installed are not copied again, see
+            `Installer.UseInstallCache()
+            <SConsGnuVariables.Installer.UseInstallCache>`; the path is the
+            cache file, and the records of uninstalled files are dropped
+        install_methods : str | sequence | None
+            copy methods (e.g. ``'auto'`` or ``['hardlink', 'reflink']``),
+            see `Installer.make_copier()
+            <SConsGnuVariables.Installer.make_copier>`
+        install_manifest : str | None
+            if given, installed files are appended to this manifest (see
+            `Installer.RecordInstallManifest()
+            <SConsGnuVariables.Installer.RecordInstallManifest>`) and the
+            ``uninstall`` alias removes the files listed in the manifest,
+            including those installed by earlier runs; without it, the
+            ``uninstall`` alias removes the files installed by this call and
+            the destination directories left empty
+    :Keywords:
+        [all]
+            see `decompose_name()
+            <SConsGnuVariables.AmUniformNames.decompose_name>`
+    :Returns:
+        dictionary ``{ 'exec' : nodes, 'data' : nodes }`` with the installed
+        target nodes
+    """
+    names = _default_aliases.copy()
+    if aliases:
+        names.update(aliases)
+    if destdir is None:
+        destdir = env.subst('${DESTDIR}') if 'DESTDIR' in env else ''
+    partitioned = partition_sources(sources, **kw)
+    cache = None
+    if install_cache or install_methods or install_manifest:
+        from SConsGnuVariables import Installer
+        env = env.Clone()
+        if install_cache:
+            cache = Installer.UseInstallCache(env, install_cache,
+                                              install_methods)
+        elif install_methods:
+            Installer.UseInstallMethods(env, install_methods)
+    installed = {}
+    variables = {}
+    for category in ('exec', 'data'):
+        nodes = []
+        for directory, files in group_by_directory(env,
+                                                   partitioned[category],
+                                                   srcdir, destdir,
+                                                   variables):
+            nodes.extend(env.Install(directory, files))
+        installed[category] = nodes
+        if install_cache:
+            env.Precious(nodes)
+        env.Alias(names[category], nodes)
+        env.Alias(names['install'], nodes)
+    if install_manifest:
+        Installer.RecordInstallManifest(env, install_manifest, variables)
+        action = env.Action(_uninstall_manifest_action(install_manifest,
+                                                       cache),
+                            'Uninstalling files listed in %s'
+                            % install_manifest)
+    else:
+        paths = [n.get_abspath() for c in ('exec', 'data')
+                 for n in installed[c]]
+        directories = [env.Dir(d).get_abspath() for d in variables]
+        action = env.Action(_uninstall_action(paths, directories, cache),
+                            'Uninstalling %d files' % len(paths))
+    uninstall = env.Alias(names['uninstall'], [], action)
+    env.AlwaysBuild(uninstall)
+    return installed
+
+#############################################################################
+def PartitionSources(sources, **kw):
+    """Interface to `partition_sources()`."""
+    return partition_sources(sources, **kw)
+
+#############################################################################
+def InstallUniformNames(env, sources, **kw):
+    """Interface to `install_uniform_names()`."""
+    return install_uniform_names(env, sources, **kw)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,205 @@
+""" SConsGnuVariables.AmInstallTests
+
+Unit tests for SConsGnuVariables.AmInstall
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from SConsGnuVariables import AmInstall
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _env(self):
+        try:
+            import SCons.Environment
+        except ImportError:
+            self.skipTest('SCons is not available')
+        from SConsGnuVariables import GnuDirVariables
+        env = SCons.Environment.Environment(tools = [])
+        GnuDirVariables.AddToSConsEnvironment(env)
+        env['prefix'] = os.path.join(self.tmp, 'usr')
+        return env
+
+    def _sources(self, *names):
+        paths = []
+        for name in names:
+            path = os.path.join(self.tmp, 'src', name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            open(path, 'w').close()
+            paths.append(path)
+        return paths
+
+    def _aliases(self, prefix):
+        return dict((role, '%s-%s' % (prefix, role))
+                    for role in ('exec', 'data', 'install', 'uninstall'))
+
+    def _alias_sources(self, env, name):
+        return sorted(n.get_abspath() for n in env.Alias(name)[0].sources)
+
+    def test_plan_install(self):
+        plan = AmInstall.plan_install({ 'bin_PROGRAMS' : ['src/foo'],
+                                        'include_HEADERS' : 'foo.h' },
+                                      { 'prefix' : '/usr' })
+        self.assertEqual(plan, [
+            ('data', 'includedir', 'foo.h', '/usr/include/foo.h'),
+            ('exec', 'bindir', 'src/foo', '/usr/bin/foo') ])
+
+    def test_plan_install_nobase(self):
+        plan = AmInstall.plan_install(
+            { 'nobase_pkginclude_HEADERS' : ['src/a.h', 'src/detail/b.h'] },
+            { 'prefix' : '/usr', 'package' : 'foo' }, srcdir = 'src')
+        self.assertEqual([p[3] for p in plan],
+                         ['/usr/include/foo/a.h',
+                          '/usr/include/foo/detail/b.h'])
+        self.assertRaises(ValueError, AmInstall.plan_install,
+                          { 'nobase_include_HEADERS' : ['../a.h'] })
+
+    def test_plan_install_destdir(self):
+        plan = AmInstall.plan_install({ 'bin_SCRIPTS' : ['foo.sh'] },
+                                      { 'prefix' : '/usr' }, '/tmp/stage')
+        self.assertEqual(plan[0][3], '/tmp/stage/usr/bin/foo.sh')
+
+    def test_plan_install_skips_noinst(self):
+        plan = AmInstall.plan_install({ 'noinst_PROGRAMS' : ['foo'],
+                                        'check_PROGRAMS' : ['test'] })
+        self.assertEqual(plan, [])
+
+    def test_plan_install_man_sections(self):
+        plan = AmInstall.plan_install(
+            { 'man_MANS' : ['doc/foo.1', 'foo.conf.5', 'bar.3x'],
+              'notrans_dist_man_MANS' : ['baz.8'],
+              'man1_MANS' : ['qux.1'] }, { 'prefix' : '/usr' })
+        self.assertEqual(sorted((p[1], p[3]) for p in plan), [
+            ('man1dir', '/usr/share/man/man1/foo.1'),
+            ('man1dir', '/usr/share/man/man1/qux.1'),
+            ('man3dir', '/usr/share/man/man3/bar.3x'),
+            ('man5dir', '/usr/share/man/man5/foo.conf.5'),
+            ('man8dir', '/usr/share/man/man8/baz.8') ])
+
+    def test_plan_install_man_without_section(self):
+        self.assertRaises(ValueError, AmInstall.plan_install,
+                          { 'man_MANS' : ['README'] })
+        self.assertRaises(ValueError, AmInstall.plan_install,
+                          { 'man_MANS' : ['foo.txt'] })
+
+    def test_plan_install_texinfos(self):
+        plan = AmInstall.plan_install(
+            { 'info_TEXINFOS' : ['doc/foo.texi', 'bar.texinfo'] },
+            { 'prefix' : '/usr' })
+        self.assertEqual(plan, [
+            ('data', 'infodir', 'doc/foo.info', '/usr/share/info/foo.info'),
+            ('data', 'infodir', 'bar.info', '/usr/share/info/bar.info') ])
+
+    def test_partition_sources(self):
+        parts = AmInstall.partition_sources({ 'bin_PROGRAMS' : ['a'],
+                                              'data_DATA' : ['b'],
+                                              'noinst_HEADERS' : ['c'] })
+        self.assertEqual([e[0] for e in parts['exec']], ['bin_PROGRAMS'])
+        self.assertEqual([e[0] for e in parts['data']], ['data_DATA'])
+        self.assertEqual([e[0] for e in parts['noinst']], ['noinst_HEADERS'])
+        self.assertRaises(ValueError, AmInstall.partition_sources,
+                          { 'bogus_THINGS' : [] })
+
+    def test_plan_install_man_section_override(self):
+        plan = AmInstall.plan_install({ 'man_MANS' : ['foo.1', 'foo.5'] },
+                                      { 'prefix' : '/usr',
+                                        'man1dir' : '/opt/man1' })
+        self.assertEqual([p[3] for p in plan],
+                         ['/opt/man1/foo.1', '/usr/share/man/man5/foo.5'])
+
+    def test_install_uniform_names_aliases(self):
+        env = self._env()
+        script, header, page = self._sources('foo.sh', 'foo.h', 'foo.1')
+        names = self._aliases('aliases')
+        installed = AmInstall.install_uniform_names(env, {
+            'bin_SCRIPTS' : [script], 'include_HEADERS' : [header],
+            'man_MANS' : [page], 'noinst_HEADERS' : ['bar.h'] },
+            aliases = names)
+        prefix = env['prefix']
+        exec_files = [os.path.join(prefix, 'bin', 'foo.sh')]
+        data_files = [os.path.join(prefix, 'include', 'foo.h'),
+                      os.path.join(prefix, 'share', 'man', 'man1', 'foo.1')]
+        self.assertEqual(sorted(n.get_abspath() for n in installed['exec']),
+                         exec_files)
+        self.assertEqual(sorted(n.get_abspath() for n in installed['data']),
+                         sorted(data_files))
+        self.assertEqual(self._alias_sources(env, names['exec']), exec_files)
+        self.assertEqual(self._alias_sources(env, names['data']),
+                         sorted(data_files))
+        self.assertEqual(self._alias_sources(env, names['install']),
+                         sorted(exec_files + data_files))
+        uninstall = env.Alias(names['uninstall'])[0]
+        self.assertEqual(uninstall.sources, [])
+        self.assertTrue(uninstall.always_build)
+
+    def test_install_uniform_names_man_section_override(self):
+        env = self._env()
+        env['man1dir'] = os.path.join(self.tmp, 'man1')
+        page, = self._sources('foo.1')
+        installed = AmInstall.install_uniform_names(env, {
+            'man_MANS' : [page] }, aliases = self._aliases('mandir'))
+        self.assertEqual([n.get_abspath() for n in installed['data']],
+                         [os.path.join(self.tmp, 'man1', 'foo.1')])
+
+    def test_uninstall_action(self):
+        env = self._env()
+        prefix = env['prefix']
+        bindir = os.path.join(prefix, 'bin')
+        mandir = os.path.join(prefix, 'share', 'man', 'man1')
+        for directory in (bindir, mandir):
+            os.makedirs(directory)
+        paths = [os.path.join(bindir, 'foo'), os.path.join(mandir, 'foo.1')]
+        for path in paths + [os.path.join(bindir, 'other')]:
+            open(path, 'w').close()
+        paths.append(os.path.join(bindir, 'missing'))
+        action = AmInstall._uninstall_action(paths, [bindir, mandir])
+        self.assertEqual(action(None, None, env), 0)
+        self.assertEqual(os.listdir(bindir), ['other'])
+        self.assertFalse(os.path.exists(mandir))
+        # errors other than missing files are not swallowed
+        action = AmInstall._uninstall_action([bindir], [])
+        self.assertRaises(OSError, action, None, None, env)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,382 @@
+"""SConsGnuVariables.AmMakefiles
+
+Import of uniform names (see `SConsGnuVariables.AmUniformNames`) from
+automake's ``Makefile.am`` files.
+
+The module parses variable assignments found in ``Makefile.am`` files
+(``=``, ``:=`` and ``+=``, with line continuations), extracts these which
+are uniform names (e.g. ``bin_PROGRAMS = foo bar``), validates them with
+`ensure_name_sanity() <SConsGnuVariables.AmUniformNames.ensure_name_sanity>`
+and returns them together with their file lists. It's intended to help
+migrating large autotools trees to SCons.
+
+Parsing may be spread over a pool of worker processes (``workers``) and the
+parse results may be kept in an on-disk cache (``cache_file``), keyed by
+file's path, modification time and size, so that re-imports only re-parse
+files that have changed.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import AmMakefiles
+    uniform, errors = AmMakefiles.ImportTree('.', workers = 4,
+                                             cache_file = '.am-cache')
+    found = AmMakefiles.PartitionImported(uniform)
+    for path, name, files in found['exec']:
+        print path, name, files
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import re
+
+from SConsGnuVariables import AmUniformNames
+from SConsGnuVariables import AmNameScanner
+
+# Bump whenever the format of cached parse results changes.
+_cache_version = 2
+
+# Parse cache hits and misses, see `parse_makefiles()`.
+_cache_stats = [0, 0]
+
+# Below this number of files to parse, the process pool isn't worth its
+# startup cost.
+_min_parallel_files = 64
+
+# Keywords accepted by decompose_name().
+_decompose_keywords = frozenset([
+    'primary_names', 'main_prefixes', 'add_prefixes',
+    'use_std_primary_names', 'use_std_main_prefixes', 'use_std_add_prefixes'
+])
+
+_assignment_re = re.compile(r'^\s*([A-Za-z0-9_]+)\s*(\+=|:=|=)\s*(.*)$')
+_comment_re = re.compile(r'(?<!\\)#.*$')
+_conditional_re = re.compile(r'^\s*(if|else|endif)\b')
+
+#############################################################################
+def _logical_lines(text):
+    """Yield logical lines of ``text`` with backslash-newline continuations
+    joined."""
+    pending = []
+    for line in text.splitlines():
+        if line.endswith('\\'):
+            pending.append(line[:-1])
+            continue
+        pending.append(line)
+        yield ' '.join(pending)
+        pending = []
+    if pending:
+        yield ' '.join(pending)
+
+#############################################################################
+def parse_makefile_am(text):
+    """Parse variable assignments from ``Makefile.am`` contents.
+
+    Assignments with ``=`` and ``:=`` set variable's value and ``+=`` appends
+    to it. Assignments placed within automake conditionals (``if COND`` ...
+    ``endif``) never replace the value, they are always appended, so the
+    result contains words from all the branches. As in ``make``, repeated
+    words are kept. Comments, rules and their recipes are skipped.
+
+    :Parameters:
+        text : str
+            contents of ``Makefile.am`` file
+    :Returns:
+        dictionary ``{ 'name' : [ 'word1', 'word2', ... ], ... }``
+    """
+    variables = {}
+    depth = 0
+    for line in _logical_lines(text):
+        if line.startswith('\t'):
+            continue        # recipe
+        line = _comment_re.sub('', line)
+        match = _conditional_re.match(line)
+        if match:
+            keyword = match.group(1)
+            if keyword == 'if':
+                depth += 1
+            elif keyword == 'endif' and depth > 0:
+                depth -= 1
+            continue
+        match = _assignment_re.match(line)
+        if not match:
+            continue
+        name, op, value = match.groups()
+        words = value.split()
+        if op == '+=' or depth > 0:
+            variables.setdefault(name, []).extend(words)
+        else:
+            variables[name] = words
+    return variables
+
+#############################################################################
+def _parse_file(path):
+    """Read and parse single ``Makefile.am`` file."""
+    with open(path) as f:
+        return parse_makefile_am(f.read())
+
+#############################################################################
+def _parse_job(job):
+    # Executed by pool workers. Must be a module-level function (picklable).
+    path, key = job
+    return path, key, _parse_file(path)
+
+#############################################################################
+def _file_key(path):
+    st = os.stat(path)
+    return (st.st_mtime, st.st_size)
+
+#############################################################################
+def _load_cache(cache_file):
+    """Load parse cache, returns empty cache if the file is missing, broken
+    or has different version.
+
+    The cache is stored as JSON, so loading a file written by someone else
+    can't execute code.
+    """
+    import json
+    try:
+        with open(cache_file) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get('version') != _cache_version:
+            return {}
+        entries = {}
+        for path, (key, variables) in data['entries'].items():
+            entries[path] = (tuple(key), variables)
+    except Exception:
+        return {}
+    return entries
+
+#############################################################################
+def _save_cache(cache_file, entries):
+    """Atomically write parse cache."""
+    import json
+    import tempfile
+    dirname = os.path.dirname(os.path.abspath(cache_file))
+    fd, tmp = tempfile.mkstemp(dir = dirname, prefix = '.amcache')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'version' : _cache_version, 'entries' : entries}, f,
+                      separators = (',', ':'))
+        os.replace(tmp, cache_file)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+#############################################################################
+def parse_makefiles(paths, workers=None, cache_file=None):
+    """Parse many ``Makefile.am`` files, possibly in parallel and using
+    on-disk cache.
+
+    :Parameters:
+        paths : sequence
+            paths to ``Makefile.am`` files
+        workers : int | None
+            number of worker processes; ``None``, ``0`` and ``1`` mean
+            parsing in current process; small inputs are always parsed
+            in current process
+        cache_file : str | None
+            path to the cache file; files whose ``(path, mtime, size)``
+            match the cached entry are not parsed again; entries of other
+            files are kept in the cache (unless these files no longer
+            exist), so the file may be shared by imports of different
+            subtrees; ``None`` disables the cache
+    :Returns:
+        dictionary ``{ path : variables }``, where ``variables`` are as
+        returned by `parse_makefile_am()`
+    """
+    paths = list(paths)
+    cached = _load_cache(cache_file) if cache_file else {}
+    result = {}
+    entries = {}
+    todo = []
+    for path in paths:
+        key = _file_key(path)
+        try:
+            old_key, variables = cached[path]
+        except KeyError:
+            old_key = None
+        if old_key == key:
+            result[path] = variables
+            entries[path] = (key, variables)
+        else:
+            todo.append((path, key))
+
+    _cache_stats[0] += len(result)
+    _cache_stats[1] += len(todo)
+    if workers and workers > 1 and len(todo) >= _min_parallel_files:
+        import multiprocessing
+        pool = multiprocessing.Pool(workers)
+        try:
+            chunksize = max(1, len(todo) // (4 * workers))
+            parsed = pool.map(_parse_job, todo, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        parsed = [_parse_job(job) for job in todo]
+
+    for path, key, variables in parsed:
+        result[path] = variables
+        entries[path] = (key, variables)
+    if cache_file and todo:
+        for path in cached:
+            if path not in entries and os.path.exists(path):
+                entries[path] = cached[path]
+        _save_cache(cache_file, entries)
+    return result
+
+#############################################################################
+def extract_uniform_names(variables, **kw):
+    """Select and validate uniform names among parsed variables.
+
+    :Parameters:
+        variables : dict
+            variables, as returned by `parse_makefile_am()`
+    :Keywords:
+        [all]
+            see `ensure_name_sanity()
+            <SConsGnuVariables.AmUniformNames.ensure_name_sanity>`
+    :Returns:
+        tuple ``(uniform, errors)``, where ``uniform`` is a dictionary
+        ``{ name : [ file1, file2, ... ] }`` of valid uniform names and
+        ``errors`` is a dictionary ``{ name : message }`` of these names
+        that look like uniform names but fail sanity checks
+    """
+    candidates = AmNameScanner.filter_candidates(sorted(variables),
+        kw.get('primary_names'), kw.get('use_std_primary_names', True))
+    uniform = {}
+    errors = {}
+    for name in candidates:
+        try:
+            AmUniformNames.EnsureNameSanity(name, **kw)
+        except ValueError as e:
+            errors[name] = str(e)
+        else:
+            uniform[name] = variables[name]
+    return uniform, errors
+
+#############################################################################
+def import_makefiles(paths, workers=None, cache_file=None, **kw):
+    """Import uniform names and their file lists from ``Makefile.am`` files.
+
+    **Note**
+
+    You may wish to use `ImportMakefiles()` instead.
+
+    :Parameters:
+        paths : sequence
+            paths to ``Makefile.am`` files
+        workers : int | None
+            see `parse_makefiles()`
+        cache_file : str | None
+            see `parse_makefiles()`
+    :Keywords:
+        [all]
+            see `ensure_name_sanity()
+            <SConsGnuVariables.AmUniformNames.ensure_name_sanity>`
+    :Returns:
+        tuple ``(uniform, errors)``, where ``uniform`` is a dictionary
+        ``{ path : { name : [ file1, ... ] } }`` and ``errors`` is a
+        list of ``(path, name, message)`` tuples describing malformed
+        uniform names
+    """
+    parsed = parse_makefiles(paths, workers, cache_file)
+    uniform = {}
+    errors = []
+    for path in sorted(parsed):
+        names, errs = extract_uniform_names(parsed[path], **kw)
+        uniform[path] = names
+        for name in sorted(errs):
+            errors.append((path, name, errs[name]))
+    return uniform, errors
+
+#############################################################################
+def import_tree(top, workers=None, cache_file=None, **kw):
+    """Import uniform names from all ``Makefile.am`` files found under
+    directory ``top``.
+
+    **Note**
+
+    You may wish to use `ImportTree()` instead.
+
+    See `import_makefiles()` for description of arguments and returned
+    values.
+    """
+    paths = AmNameScanner.find_files(top, ('Makefile.am',))
+    return import_makefiles(paths, workers, cache_file, **kw)
+
+#############################################################################
+def partition_imported(uniform, **kw):
+    """Partition imported uniform names by install category.
+
+    **Note**
+
+    You may wish to use `PartitionImported()` instead.
+
+    :Parameters:
+        uniform : dict
+            uniform names, as returned by `import_makefiles()`
+    :Keywords:
+        [all]
+            see `partition_names()
+            <SConsGnuVariables.AmNameScanner.partition_names>`; other
+            keywords are ignored, so the keywords used for
+            `import_makefiles()` may be passed here as well
+    :Returns:
+        dictionary with keys as returned by `partition_names()
+        <SConsGnuVariables.AmNameScanner.partition_names>`, each value
+        being a list of ``(path, name, files)`` tuples
+    """
+    kw = dict((k, v) for k, v in kw.items() if k in _decompose_keywords)
+    result = dict((c, []) for c in AmNameScanner._categories)
+    for path in sorted(uniform):
+        names = uniform[path]
+        parts = AmNameScanner.partition_names(sorted(names), **kw)
+        for category, found in parts.items():
+            result[category].extend((path, n, names[n]) for n in found)
+    return result
+
+#############################################################################
+def ImportMakefiles(paths, **kw):
+    """Interface to `import_makefiles()`."""
+    return import_makefiles(paths, **kw)
+
+#############################################################################
+def ImportTree(top, **kw):
+    """Interface to `import_tree()`."""
+    return import_tree(top, **kw)
+
+#############################################################################
+def PartitionImported(uniform, **kw):
+    """Interface to `partition_imported()`."""
+    return partition_imported(uniform, **kw)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,138 @@
+""" SConsGnuVariables.AmMakefilesTests
+
+Unit tests for SConsGnuVariables.AmMakefiles
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from SConsGnuVariables import AmMakefiles
+
+class TestCase(unittest.TestCase):
+    def test_parse_assignments(self):
+        variables = AmMakefiles.parse_makefile_am(
+            "bin_PROGRAMS = foo bar\n"
+            "foo_SOURCES := foo.c\n")
+        self.assertEqual(variables, { 'bin_PROGRAMS' : ['foo', 'bar'],
+                                      'foo_SOURCES' : ['foo.c'] })
+
+    def test_parse_append(self):
+        variables = AmMakefiles.parse_makefile_am(
+            "bin_PROGRAMS = foo\n"
+            "bin_PROGRAMS += bar foo baz bar\n"
+            "new_DATA += a\n")
+        self.assertEqual(variables['bin_PROGRAMS'],
+                         ['foo', 'bar', 'foo', 'baz', 'bar'])
+        self.assertEqual(variables['new_DATA'], ['a'])
+
+    def test_parse_append_keeps_duplicates_like_assignment(self):
+        variables = AmMakefiles.parse_makefile_am(
+            "foo_SOURCES = a.c a.c\n"
+            "bar_SOURCES = a.c\n"
+            "bar_SOURCES += a.c\n")
+        self.assertEqual(variables['foo_SOURCES'], ['a.c', 'a.c'])
+        self.assertEqual(variables['bar_SOURCES'], ['a.c', 'a.c'])
+
+    def test_parse_assignment_replaces_value(self):
+        variables = AmMakefiles.parse_makefile_am(
+            "bin_PROGRAMS = foo\n"
+            "bin_PROGRAMS += bar\n"
+            "bin_PROGRAMS = baz\n"
+            "bin_PROGRAMS += foo\n")
+        self.assertEqual(variables['bin_PROGRAMS'], ['baz', 'foo'])
+
+    def test_parse_continuation_lines(self):
+        variables = AmMakefiles.parse_makefile_am(
+            "include_HEADERS = a.h \\\n"
+            "\tb.h \\\n"
+            "    c.h\n"
+            "include_HEADERS += d.h \\\n"
+            "  a.h\n")
+        self.assertEqual(variables['include_HEADERS'],
+                         ['a.h', 'b.h', 'c.h', 'd.h', 'a.h'])
+
+    def test_parse_conditionals_comments_and_recipes(self):
+        variables = AmMakefiles.parse_makefile_am(
+            "# bin_PROGRAMS = commented\n"
+            "bin_PROGRAMS = foo # trailing comment\n"
+            "if WITH_BAR\n"
+            "bin_PROGRAMS = bar\n"
+            "else\n"
+            "bin_PROGRAMS = baz bar\n"
+            "endif\n"
+            "all-local:\n"
+            "\tnoinst_DATA = recipe\n")
+        self.assertEqual(variables, { 'bin_PROGRAMS' : ['foo', 'bar',
+                                                        'baz', 'bar'] })
+
+    def test_parse_long_append_list(self):
+        lines = ["X = w0\n"] + ["X += w%d w0\n" % i for i in range(20000)]
+        variables = AmMakefiles.parse_makefile_am(''.join(lines))
+        self.assertEqual(len(variables['X']), 40001)
+
+    def test_cache_keeps_entries_of_other_imports(self):
+        top = tempfile.mkdtemp()
+        try:
+            paths = []
+            for sub in ('a', 'b'):
+                os.mkdir(os.path.join(top, sub))
+                path = os.path.join(top, sub, 'Makefile.am')
+                with open(path, 'w') as f:
+                    f.write('%s_DATA = x\n' % sub)
+                paths.append(path)
+            cache_file = os.path.join(top, 'cache')
+            AmMakefiles.parse_makefiles(paths[:1], cache_file = cache_file)
+            AmMakefiles.parse_makefiles(paths[1:], cache_file = cache_file)
+            self.assertEqual(sorted(AmMakefiles._load_cache(cache_file)),
+                             paths)
+            with open(cache_file) as f:
+                self.assertEqual(json.load(f)['version'],
+                                 AmMakefiles._cache_version)
+            hits = AmMakefiles._cache_stats[0]
+            result = AmMakefiles.parse_makefiles(paths,
+                                                 cache_file = cache_file)
+            self.assertEqual(AmMakefiles._cache_stats[0], hits + 2)
+            self.assertEqual(result[paths[1]], { 'b_DATA' : ['x'] })
+            with open(cache_file, 'wb') as f:
+                f.write(b'\x80\x04garbage')
+            self.assertEqual(AmMakefiles._load_cache(cache_file), {})
+        finally:
+            shutil.rmtree(top)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
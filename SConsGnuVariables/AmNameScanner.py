@@ -0,0 +1,287 @@
+"""SConsGnuVariables.AmNameScanner
+
+Discovery of uniform names (see `SConsGnuVariables.AmUniformNames`) used
+within a project.
+
+Projects often declare their files with construction variables named after
+automake's uniform names, e.g. ``bin_PROGRAMS`` or
+``nobase_pkginclude_HEADERS``. This module finds such names among the keys of
+SCons environment (`scan_environment()`) or within a tree of ``SConscript`` /
+``Makefile.am`` files (`scan_tree()`).
+
+The candidates are found in single pass with a regular expression compiled
+from known primary names (a primary-name suffix index), so `decompose_name()
+<SConsGnuVariables.AmUniformNames.decompose_name>` is called only for
+matching names. The discovered names are returned partitioned by install
+category (see `partition_names()`).
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import re
+import os
+
+from SConsGnuVariables import AmUniformNames
+
+# Install categories, in the order they appear in results.
+_categories = ('exec', 'data', 'noinst', 'invalid')
+
+# Files scanned by default by `scan_tree()`.
+_default_file_names = ('SConstruct', 'SConscript', 'Makefile.am')
+
+# Compiled regular expressions, keyed by frozenset of primary names.
+_regex_cache = {}
+
+#############################################################################
+def _primary_regexes(primary_names, use_std_primary_names):
+    """Return regular expressions matching uniform name candidates.
+
+    The function returns tuple ``(name_re, text_re)``. The ``name_re`` matches
+    a single string ending with ``_PRIMARY`` and ``text_re`` finds all
+    identifiers ending with ``_PRIMARY`` within a text, for any of the known
+    primary names. The expressions are compiled once per set of primary
+    names.
+    """
+    names = AmUniformNames._prepare_primary_names_list(primary_names,
+                                                      use_std_primary_names)
+    try:
+        return _regex_cache[names]
+    except KeyError:
+        pass
+    # longest first, so the alternation prefers e.g. LTLIBRARIES
+    alts = '|'.join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    if not alts:
+        alts = '(?!)'
+    name_re = re.compile(r'_(?:%s)\Z' % alts)
+    text_re = re.compile(r'(?<![A-Za-z0-9_])([A-Za-z0-9_]+_(?:%s))(?![A-Za-z0-9_])'
+                         % alts)
+    _regex_cache[names] = (name_re, text_re)
+    return name_re, text_re
+
+#############################################################################
+def _new_result():
+    return dict((c, []) for c in _categories)
+
+#############################################################################
+def partition_names(funames, primary_names=None, main_prefixes=None,
+                    add_prefixes=None, use_std_primary_names=True,
+                    use_std_main_prefixes=True, use_std_add_prefixes=True):
+    """Partition uniform names by install category.
+
+    **Note**
+
+    You may wish to use `PartitionNames()` instead.
+
+    **Description**
+
+    Each name from ``funames`` is decomposed with `decompose_name()
+    <SConsGnuVariables.AmUniformNames.decompose_name>` and assigned to one of
+    the following categories:
+
+        - ``'exec'``, names handled by ``install-exec``,
+        - ``'data'``, names handled by ``install-data``,
+        - ``'noinst'``, names that are not installed (``noinst_*``, ``check_*``),
+        - ``'invalid'``, names that can't be decomposed.
+
+    **Example**:
+
+        >>> from SConsGnuVariables.AmNameScanner import partition_names
+        >>> partition_names(['bin_PROGRAMS', 'include_HEADERS', 'foo_DATA'])
+        {'exec': ['bin_PROGRAMS'], 'data': ['include_HEADERS'], 'noinst': [], 'invalid': ['foo_DATA']}
+
+    :Parameters:
+        funames : sequence
+            uniform names to partition, duplicates are reported once
+        [others]
+            see `decompose_name()
+            <SConsGnuVariables.AmUniformNames.decompose_name>`
+    :Returns:
+        dictionary with keys ``'exec'``, ``'data'``, ``'noinst'`` and
+        ``'invalid'``; each value is a list of names in order of their first
+        appearance in ``funames``
+    """
+    result = _new_result()
+    seen = set()
+    for funame in funames:
+        if funame in seen:
+            continue
+        seen.add(funame)
+        try:
+            prefixes, main_prefix, primary = AmUniformNames.decompose_name(
+                funame, primary_names, main_prefixes, add_prefixes,
+                use_std_primary_names, use_std_main_prefixes,
+                use_std_add_prefixes)
+        except ValueError:
+            result['invalid'].append(funame)
+            continue
+        category = AmUniformNames.install_category(main_prefix, main_prefixes,
+                                                   use_std_main_prefixes)
+        if category is None:
+            category = 'invalid'
+        result[category].append(funame)
+    return result
+
+#############################################################################
+def filter_candidates(names, primary_names=None, use_std_primary_names=True):
+    """Return the names ending with ``_PRIMARY`` for a known primary name.
+
+    This is a cheap pre-selection, the returned names still may be malformed.
+    The order of ``names`` is preserved.
+    """
+    match = _primary_regexes(primary_names, use_std_primary_names)[0].search
+    return [name for name in names if match(name)]
+
+#############################################################################
+def scan_text(text, primary_names=None, use_std_primary_names=True):
+    """Return list of uniform name candidates found in ``text``.
+
+    Each identifier ending with ``_PRIMARY`` is reported once, in order of
+    first appearance.
+    """
+    regex = _primary_regexes(primary_names, use_std_primary_names)[1]
+    seen = set()
+    found = []
+    for name in regex.findall(text):
+        if name not in seen:
+            seen.add(name)
+            found.append(name)
+    return found
+
+#############################################################################
+def scan_environment(env, **kw):
+    """Find uniform names among construction variables of ``env``.
+
+    **Note**
+
+    You may wish to use `ScanEnvironment()` instead.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables.AmNameScanner import scan_environment
+        env = Environment(bin_PROGRAMS = ['foo'], CC = 'gcc')
+        found = scan_environment(env)
+        # found['exec'] == ['bin_PROGRAMS']
+
+    :Parameters:
+        env
+            SCons environment, or any other object with ``keys()`` method
+            (e.g. dictionary)
+    :Keywords:
+        [all]
+            see `partition_names()`
+    :Returns:
+        names partitioned as by `partition_names()`
+    """
+    names = filter_candidates(sorted(env.keys()), kw.get('primary_names'),
+                              kw.get('use_std_primary_names', True))
+    return partition_names(names, **kw)
+
+#############################################################################
+def scan_files(paths, **kw):
+    """Find uniform names used within files.
+
+    Files are read as text and every identifier that ends with a known
+    primary name (e.g. ``bin_PROGRAMS`` in both ``bin_PROGRAMS = foo`` and
+    ``env['bin_PROGRAMS']``) is taken as a candidate.
+
+    :Parameters:
+        paths : sequence
+            files to be scanned
+    :Keywords:
+        [all]
+            see `partition_names()`
+    :Returns:
+        names partitioned as by `partition_names()`
+    """
+    primary_names = kw.get('primary_names')
+    use_std = kw.get('use_std_primary_names', True)
+    seen = set()
+    names = []
+    for path in paths:
+        with open(path) as f:
+            text = f.read()
+        for name in scan_text(text, primary_names, use_std):
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return partition_names(names, **kw)
+
+#############################################################################
+def find_files(top, file_names=_default_file_names):
+    """Return sorted list of files named as one of ``file_names`` found
+    under directory ``top``."""
+    file_names = frozenset(file_names)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename in file_names:
+                found.append(os.path.join(dirpath, filename))
+    return found
+
+#############################################################################
+def scan_tree(top, file_names=_default_file_names, **kw):
+    """Find uniform names used within a tree of ``SConscript`` /
+    ``Makefile.am`` files.
+
+    **Note**
+
+    You may wish to use `ScanTree()` instead.
+
+    :Parameters:
+        top : str
+            top-level directory of the tree
+        file_names : sequence
+            names of files to be scanned, by default ``SConstruct``,
+            ``SConscript`` and ``Makefile.am``
+    :Keywords:
+        [all]
+            see `partition_names()`
+    :Returns:
+        names partitioned as by `partition_names()`
+    """
+    return scan_files(find_files(top, file_names), **kw)
+
+#############################################################################
+def PartitionNames(funames, **kw):
+    """Interface to `partition_names()`."""
+    return partition_names(funames, **kw)
+
+#############################################################################
+def ScanEnvironment(env, **kw):
+    """Interface to `scan_environment()`."""
+    return scan_environment(env, **kw)
+
+#############################################################################
+def ScanTree(top, **kw):
+    """Interface to `scan_tree()`."""
+    return scan_tree(top, **kw)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,131 @@
+""" SConsGnuVariables.AmNameScannerTests
+
+Unit tests for SConsGnuVariables.AmNameScanner
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from SConsGnuVariables import AmNameScanner
+
+class TestCase(unittest.TestCase):
+    def test_partition_names(self):
+        parts = AmNameScanner.partition_names(['bin_PROGRAMS', 'foo_DATA',
+                                               'include_HEADERS',
+                                               'check_PROGRAMS',
+                                               'bin_PROGRAMS'])
+        self.assertEqual(parts, { 'exec' : ['bin_PROGRAMS'],
+                                  'data' : ['include_HEADERS'],
+                                  'noinst' : ['check_PROGRAMS'],
+                                  'invalid' : ['foo_DATA'] })
+
+    def test_partition_user_names(self):
+        parts = AmNameScanner.partition_names(['plugin_PLUGINS',
+                                               'bin_PLUGINS'],
+                                              primary_names = ['PLUGINS'],
+                                              main_prefixes = ['plugin'])
+        self.assertEqual(parts['data'], ['plugin_PLUGINS'])
+        self.assertEqual(parts['exec'], ['bin_PLUGINS'])
+
+    def test_scan_environment(self):
+        env = { 'bin_PROGRAMS' : ['foo'], 'CC' : 'gcc', 'CPPPATH' : [],
+                'pkgdata_DATA' : [], 'bogus_SCRIPTS' : [] }
+        parts = AmNameScanner.scan_environment(env)
+        self.assertEqual(parts, { 'exec' : ['bin_PROGRAMS'],
+                                  'data' : ['pkgdata_DATA'],
+                                  'noinst' : [],
+                                  'invalid' : ['bogus_SCRIPTS'] })
+
+    def test_scan_environment_scons(self):
+        try:
+            import SCons.Environment
+        except ImportError:
+            self.skipTest('SCons is not available')
+        env = SCons.Environment.Environment(tools = [],
+                                            sbin_SCRIPTS = ['foo.sh'])
+        parts = AmNameScanner.scan_environment(env)
+        self.assertEqual(parts['exec'], ['sbin_SCRIPTS'])
+
+    def test_scan_text(self):
+        text = ("env['bin_PROGRAMS'] = x\n"
+                "lib_LTLIBRARIES = libfoo.la # not lib_LIBRARIES\n"
+                "xbin_PROGRAMSx bin_PROGRAMS\n")
+        self.assertEqual(AmNameScanner.scan_text(text),
+                         ['bin_PROGRAMS', 'lib_LTLIBRARIES', 'lib_LIBRARIES'])
+
+    def test_regex_cache_keyed_by_primary_names(self):
+        first = AmNameScanner._primary_regexes(['PLUGINS', 'THEMES'], True)
+        second = AmNameScanner._primary_regexes(('THEMES', 'PLUGINS'), True)
+        self.assertIs(first[1], second[1])
+        self.assertIsNot(first[1],
+                         AmNameScanner._primary_regexes(None, True)[1])
+        self.assertEqual(AmNameScanner.filter_candidates(['a_THEMES',
+                         'a_PROGRAMS'], ['THEMES'], False), ['a_THEMES'])
+        self.assertEqual(AmNameScanner.filter_candidates(['a_PROGRAMS'],
+                                                         None, False), [])
+
+    def test_scan_files_and_tree(self):
+        top = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(top, 'src', 'lib'))
+            files = { 'SConstruct' : "env['bin_PROGRAMS'] = ['foo']\n",
+                      'src/Makefile.am' : "include_HEADERS = foo.h\n"
+                                          "bin_PROGRAMS += bar\n",
+                      'src/lib/SConscript' : "env.Append(lib_LIBRARIES"
+                                             " = ['libfoo.a'])\n",
+                      'src/lib/README' : "man_MANS\n" }
+            for name, text in files.items():
+                with open(os.path.join(top, name), 'w') as f:
+                    f.write(text)
+            paths = AmNameScanner.find_files(top)
+            self.assertEqual(paths, [os.path.join(top, name) for name in
+                                     ('SConstruct', 'src/Makefile.am',
+                                      'src/lib/SConscript')])
+            parts = AmNameScanner.scan_files(paths[1:])
+            self.assertEqual(parts['data'], ['include_HEADERS'])
+            self.assertEqual(parts['exec'], ['bin_PROGRAMS',
+                                             'lib_LIBRARIES'])
+            parts = AmNameScanner.scan_tree(top)
+            self.assertEqual(parts['exec'], ['bin_PROGRAMS',
+                                             'lib_LIBRARIES'])
+            parts = AmNameScanner.scan_tree(top, file_names = ['README'])
+            self.assertEqual(parts['data'], ['man_MANS'])
+        finally:
+            shutil.rmtree(top)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,768 @@
+"""SConsGnuVariables.AmScheme
+
+Compiled configurations of the automake uniform naming scheme.
+
+The functions of `SConsGnuVariables.AmUniformNames` take the configuration
+(user-defined primary names, main and additional prefixes, tables of allowed
+and forbidden combinations and the ``use_std_*`` flags) as loose lists and
+dictionaries, and merge it with the standard tables on every call. A `Scheme`
+does it once: it keeps the merged suffix indexes (sets of primary names and
+prefixes), the allowed and forbidden combinations and the install category
+of every main prefix, and memoizes decomposed names.
+
+A `Scheme` is pickle-friendly. Its state is a compact, versioned dictionary
+holding the compiled indexes, so unpickling (e.g. in a worker process, or
+when loaded from a cache file) does not compile anything again. The
+`Scheme.content_hash()` is a stable digest of that state, equal in all
+processes for equal configurations, so it may be used as a cache key.
+
+Hierarchical builds may derive a scheme for a subdirectory from its parent's
+one with `Scheme.derive()`. The derived scheme is a thin layer holding only
+the additions (e.g. a ``plugin`` main prefix); lookups fall through to the
+parent's indexes and memoized results. A derived scheme is pickled as a flat
+one, with the layers merged.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import AmScheme
+    scheme = AmScheme.Scheme(primary_names = ['PLUGINS'],
+                             main_prefixes = ['plugin'])
+    scheme.decompose('nobase_plugin_PLUGINS') # (['nobase'], 'plugin', 'PLUGINS')
+    scheme.install_category('plugin')         # 'data'
+    scheme.decompose_names(names, workers = 4)
+    # in a sub-SConscript
+    sub = scheme.derive(main_prefixes = ['ext'], categories = {'ext' : 'exec'})
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import hashlib
+
+from SConsGnuVariables import AmUniformNames
+
+# Version of the pickled state, see `Scheme.__getstate__()`.
+_state_version = 1
+
+# Install categories of main prefixes.
+_categories = ('exec', 'data', 'noinst')
+
+# Names of the compiled sets and tables, in the order they are hashed.
+_set_names = ('primary_names', 'main_prefixes', 'add_prefixes')
+_table_names = ('primary_main_prefixes', 'forbid_primary_main_prefixes',
+                'forbid_primary_add_prefixes', 'forbid_main_add_prefixes')
+
+# Maximum number of memoized decompositions per scheme; the memo is cleared
+# when it's full.
+_memo_max = 1 << 16
+
+#############################################################################
+def _merge_table(table, std_table):
+    """Merge user-defined ``{ key : sequence }`` table with standard one.
+
+    Returns dictionary ``{ key : frozenset }`` without empty entries.
+    """
+    merged = {}
+    for source in (std_table, table):
+        if not source:
+            continue
+        for key, values in source.items():
+            if values:
+                merged[key] = merged.get(key, frozenset()).union(values)
+    return merged
+
+#############################################################################
+def _compile_categories(main_prefixes, user_main_prefixes,
+                        use_std_main_prefixes):
+    """Compute install category of every known main prefix."""
+    index = AmUniformNames._std_index()
+    candidates = set(main_prefixes) | index['noinst_prefixes']
+    if use_std_main_prefixes:
+        candidates |= index['install_exec'] | index['install_data']
+    categories = {}
+    for prefix in candidates:
+        category = AmUniformNames.install_category(prefix, user_main_prefixes,
+                                                   use_std_main_prefixes)
+        if category is not None:
+            categories[prefix] = category
+    return categories
+
+#############################################################################
+def _user_category(prefix):
+    """Install category of user-defined main ``prefix``."""
+    return AmUniformNames.install_category(prefix, (prefix,), False)
+
+#############################################################################
+def _check_categories(categories):
+    for prefix, category in categories.items():
+        if category not in _categories:
+            raise ValueError("invalid install category %r of main prefix %r"
+                             % (category, prefix))
+
+#############################################################################
+def _pack_table(table):
+    return tuple(sorted((key, tuple(sorted(values)))
+                        for key, values in table.items()))
+
+#############################################################################
+class _LayeredSet(object):
+    """Read-only union of sets, the lookups fall through the layers."""
+    __slots__ = ('layers',)
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    def __contains__(self, item):
+        for layer in self.layers:
+            if item in layer:
+                return True
+        return False
+
+    def __iter__(self):
+        seen = set()
+        for layer in self.layers:
+            for item in layer:
+                if item not in seen:
+                    seen.add(item)
+                    yield item
+
+#############################################################################
+class _LayeredTable(object):
+    """Read-only union of ``{ key : frozenset }`` tables."""
+    __slots__ = ('layers',)
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    def get(self, key, default=None):
+        values = [layer[key] for layer in self.layers if key in layer]
+        if not values:
+            return default
+        if len(values) == 1:
+            return values[0]
+        return _LayeredSet(values)
+
+    def items(self):
+        keys = set()
+        for layer in self.layers:
+            keys.update(layer)
+        return [(key, frozenset(self.get(key))) for key in keys]
+
+#############################################################################
+def _names_key(names):
+    return tuple(sorted(set(names or ())))
+
+#############################################################################
+def _table_key(table):
+    return tuple(sorted((key, _names_key(values))
+                        for key, values in (table or {}).items()))
+
+#############################################################################
+class Scheme(object):
+    """Compiled configuration of uniform naming scheme.
+
+    The methods behave as functions of `SConsGnuVariables.AmUniformNames`
+    with same configuration passed to each call.
+
+    :Ivariables:
+        parent : `Scheme` | None
+            the scheme this one was derived from (see `derive()`)
+    """
+
+    def __init__(self, primary_names=None, main_prefixes=None,
+                 add_prefixes=None, primary_main_prefixes=None,
+                 forbid_primary_main_prefixes=None,
+                 forbid_primary_add_prefixes=None,
+                 forbid_main_add_prefixes=None,
+                 use_std_primary_names=True,
+                 use_std_main_prefixes=True,
+                 use_std_add_prefixes=True,
+                 use_std_primary_main_prefixes=True,
+                 use_std_forbid_primary_main_prefixes=True,
+                 use_std_forbid_primary_add_prefixes=True,
+                 use_std_forbid_main_add_prefixes=True):
+        """Compile the configuration.
+
+        The arguments are same as of `AmUniformNames.ensure_name_sanity()
+        <SConsGnuVariables.AmUniformNames.ensure_name_sanity>`.
+        """
+        std_pm, std_pa, std_ma = AmUniformNames._std_forbid_tables()
+        std_predefined = AmUniformNames.standard_primary_main_prefixes()
+        self.primary_names = AmUniformNames._prepare_primary_names_list(
+                primary_names, use_std_primary_names)
+        self.main_prefixes = AmUniformNames._prepare_main_prefixes_list(
+                main_prefixes, use_std_main_prefixes)
+        self.add_prefixes = AmUniformNames._prepare_add_prefixes_list(
+                add_prefixes, use_std_add_prefixes)
+        self.primary_main_prefixes = _merge_table(primary_main_prefixes,
+                use_std_primary_main_prefixes and std_predefined)
+        self.forbid_primary_main_prefixes = _merge_table(
+                forbid_primary_main_prefixes,
+                use_std_forbid_primary_main_prefixes and std_pm)
+        self.forbid_primary_add_prefixes = _merge_table(
+                forbid_primary_add_prefixes,
+                use_std_forbid_primary_add_prefixes and std_pa)
+        self.forbid_main_add_prefixes = _merge_table(
+                forbid_main_add_prefixes,
+                use_std_forbid_main_add_prefixes and std_ma)
+        self.categories = _compile_categories(self.main_prefixes,
+                                              main_prefixes,
+                                              use_std_main_prefixes)
+        self.parent = None
+        self._own = dict((name, [getattr(self, name)])
+                         for name in _set_names + _table_names)
+        self._registered = {}
+        self._added = ()
+        self._children = {}
+        self._hash = None
+        self._state = None
+        self._clear_memo()
+
+    #########################################################################
+    # Layering
+    #########################################################################
+    def derive(self, primary_names=None, main_prefixes=None,
+               add_prefixes=None, primary_main_prefixes=None,
+               forbid_primary_main_prefixes=None,
+               forbid_primary_add_prefixes=None,
+               forbid_main_add_prefixes=None, categories=None):
+        """Return scheme extending this one with user-defined names.
+
+        The new scheme is a layer on top of this one: it keeps only the
+        additions, and its lookups fall through to this scheme's indexes,
+        so nothing is compiled again. Names not containing any of the added
+        primary names and prefixes are decomposed by this scheme, so its
+        memoized results are shared by all derived schemes.
+
+        Layers are memoized by their additions, so, for example, every call
+        made from one ``SConscript`` with same additions gets the same
+        layer (and its memoized results)::
+
+            top = AmScheme.standard_scheme()
+            sub = top.derive(primary_names = ['PLUGINS'],
+                             main_prefixes = ['plugin'],
+                             primary_main_prefixes = {
+                                 'LTLIBRARIES' : ['plugin'] },
+                             categories = { 'plugin' : 'exec' })
+
+        :Parameters:
+            primary_names, main_prefixes, add_prefixes
+                names to add to the indexes
+            primary_main_prefixes, forbid_primary_main_prefixes,
+            forbid_primary_add_prefixes, forbid_main_add_prefixes
+                combinations to add to the tables, see `Scheme.__init__()`
+            categories : dict | None
+                install categories (``'exec'``, ``'data'`` or ``'noinst'``)
+                of main prefixes; new main prefixes which are not listed
+                here are classified as `AmUniformNames.install_category()
+                <SConsGnuVariables.AmUniformNames.install_category>` does
+                for user-defined prefixes
+        """
+        key = (_names_key(primary_names), _names_key(main_prefixes),
+               _names_key(add_prefixes), _table_key(primary_main_prefixes),
+               _table_key(forbid_primary_main_prefixes),
+               _table_key(forbid_primary_add_prefixes),
+               _table_key(forbid_main_add_prefixes),
+               tuple(sorted((categories or {}).items())))
+        try:
+            return self._children[key]
+        except KeyError:
+            pass
+        child = Scheme.__new__(Scheme)
+        child.parent = self
+        child._own = {}
+        for name, names in zip(_set_names, key[:3]):
+            child._own[name] = [frozenset(names)] if names else []
+        for name, table in zip(_table_names, (primary_main_prefixes,
+                                              forbid_primary_main_prefixes,
+                                              forbid_primary_add_prefixes,
+                                              forbid_main_add_prefixes)):
+            table = _merge_table(table, None)
+            child._own[name] = [table] if table else []
+        for name in _set_names + _table_names:
+            child._bind(name)
+        own = {}
+        for prefix in key[1]:
+            if self.install_category(prefix) is None:
+                own[prefix] = _user_category(prefix)
+        if categories:
+            _check_categories(categories)
+            own.update(categories)
+        child.categories = own
+        child._registered = {}
+        child._added = key[0] + key[1] + key[2]
+        child._children = {}
+        child._hash = None
+        child._state = None
+        child._clear_memo()
+        self._children[key] = child
+        return child
+
+    def _layers(self, name):
+        layers = tuple(self._own[name])
+        if self.parent is not None:
+            layers += self.parent._layers(name)
+        return layers
+
+    def _bind(self, name):
+        """Set the view of index ``name`` over all layers."""
+        layers = self._layers(name)
+        if len(layers) == 1:
+            view = layers[0]
+        elif name in _set_names:
+            view = _LayeredSet(layers)
+        else:
+            view = _LayeredTable(layers)
+        setattr(self, name, view)
+
+    def _descendants(self):
+        """Yield this scheme and all schemes derived from it."""
+        yield self
+        for child in self._children.values():
+            for scheme in child._descendants():
+                yield scheme
+
+    #########################################################################
+    # Registration
+    #########################################################################
+    def _registry(self, name):
+        """Return mutable top layer of index ``name``, creating it (and
+        rebinding the views of derived schemes) on first use."""
+        try:
+            return self._registered[name]
+        except KeyError:
+            pass
+        layer = set() if name in _set_names else {}
+        self._registered[name] = layer
+        self._own[name].insert(0, layer)
+        for scheme in self._descendants():
+            scheme._bind(name)
+        return layer
+
+    def _register_name(self, index, name):
+        """Add ``name`` to set ``index``; drop results it may change."""
+        if name in getattr(self, index):
+            return
+        self._registry(index).add(name)
+        self._added += (name,)
+        for scheme in self._descendants():
+            scheme._forget_containing(name)
+            scheme._hash = scheme._state = None
+
+    def _register_pairs(self, index, key, values):
+        """Add ``values`` to table ``index`` under ``key``."""
+        table = getattr(self, index)
+        values = [v for v in values if v not in table.get(key, ())]
+        if not values:
+            return
+        self._registry(index).setdefault(key, set()).update(values)
+        for scheme in self._descendants():
+            scheme._hash = scheme._state = None
+
+    def register_primary(self, name, main_prefixes=None):
+        """Add user-defined primary name.
+
+        The indexes are updated in place, and only the memoized results of
+        names containing ``name`` are dropped (in this scheme and in all
+        schemes derived from it).
+
+        :Parameters:
+            name : str
+                the primary name, e.g. ``'PLUGINS'``
+            main_prefixes : sequence | None
+                main prefixes allowed with ``name``
+        """
+        self._register_name('primary_names', name)
+        if main_prefixes:
+            self._register_pairs('primary_main_prefixes', name, main_prefixes)
+
+    def register_main_prefix(self, name, category=None, primary_names=None):
+        """Add user-defined main prefix, see `register_primary()`.
+
+        :Parameters:
+            name : str
+                the main prefix, e.g. ``'plugin'``
+            category : str | None
+                install category, ``'exec'``, ``'data'`` or ``'noinst'``;
+                if ``None``, the category is kept if the prefix is already
+                known, otherwise it's ``'exec'`` for names containing
+                ``exec`` and ``'data'`` for others
+            primary_names : sequence | None
+                primary names allowed with ``name``
+        """
+        if category is not None:
+            _check_categories({ name : category })
+        self._register_name('main_prefixes', name)
+        if category is None and self.install_category(name) is None:
+            category = _user_category(name)
+        if category is not None and category != self.install_category(name):
+            self.categories[name] = category
+            for scheme in self._descendants():
+                scheme._hash = scheme._state = None
+        for primary in primary_names or ():
+            self._register_pairs('primary_main_prefixes', primary, (name,))
+
+    def register_add_prefix(self, name):
+        """Add user-defined additional prefix, see `register_primary()`."""
+        self._register_name('add_prefixes', name)
+
+    def forbid(self, primary=None, main_prefix=None, add_prefix=None):
+        """Forbid combination of two parts of uniform names.
+
+        Exactly two of the arguments must be given. Only the sanity checks
+        (`ensure_sanity()`) are affected, no memoized result is dropped.
+
+        **Example**:
+
+        .. python::
+
+            scheme.forbid(main_prefix = 'plugin', add_prefix = 'nobase')
+        """
+        if primary and main_prefix and not add_prefix:
+            self._register_pairs('forbid_primary_main_prefixes', primary,
+                                 (main_prefix,))
+        elif primary and add_prefix and not main_prefix:
+            self._register_pairs('forbid_primary_add_prefixes', primary,
+                                 (add_prefix,))
+        elif main_prefix and add_prefix and not primary:
+            self._register_pairs('forbid_main_add_prefixes', main_prefix,
+                                 (add_prefix,))
+        else:
+            raise ValueError("exactly two of primary, main_prefix and " \
+                             "add_prefix must be given")
+
+    #########################################################################
+    # Serialization
+    #########################################################################
+    def __getstate__(self):
+        """Return compact, versioned state of the compiled scheme.
+
+        Sets become sorted tuples, tables become sorted tuples of ``(key,
+        values)`` pairs; the memoized results are not included.
+        """
+        state = { 'version' : _state_version, 'hash' : self.content_hash() }
+        state.update(self._packed())
+        return state
+
+    def __setstate__(self, state):
+        version = state.get('version')
+        if version != _state_version:
+            raise ValueError("unsupported Scheme state version %r" % version)
+        for name in _set_names:
+            setattr(self, name, frozenset(state[name]))
+        for name in _table_names:
+            setattr(self, name, dict((key, frozenset(values))
+                                     for key, values in state[name]))
+        self.categories = dict(state['categories'])
+        self.parent = None
+        self._own = dict((name, [getattr(self, name)])
+                         for name in _set_names + _table_names)
+        self._registered = {}
+        self._added = ()
+        self._children = {}
+        self._hash = state['hash']
+        self._state = dict((k, v) for k, v in state.items()
+                           if k not in ('version', 'hash'))
+        self._clear_memo()
+
+    def _packed(self):
+        """Return the compiled indexes as sorted tuples, computed once."""
+        if self._state is None:
+            packed = {}
+            for name in _set_names:
+                packed[name] = tuple(sorted(getattr(self, name)))
+            for name in _table_names:
+                packed[name] = _pack_table(getattr(self, name))
+            packed['categories'] = tuple(sorted(self._all_categories().items()))
+            self._state = packed
+        return self._state
+
+    def content_hash(self):
+        """Return stable hash (hex string) of the compiled configuration.
+
+        Schemes compiled from equivalent configurations have equal hashes,
+        in any process and under any Python's hash seed.
+        """
+        if self._hash is None:
+            packed = self._packed()
+            text = repr([(name, packed[name]) for name in
+                         _set_names + _table_names + ('categories',)])
+            self._hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        return self._hash
+
+    #########################################################################
+    # Memoization
+    #########################################################################
+    def _clear_memo(self):
+        # funame -> (ok, value)
+        self._memo = {}
+        # word of funame (part between underscores) -> set of funames
+        self._memo_index = {}
+
+    def _remember(self, funame, result):
+        if len(self._memo) >= _memo_max:
+            self._clear_memo()
+        self._memo[funame] = result
+        index = self._memo_index
+        for word in set(funame.split('_')):
+            try:
+                index[word].add(funame)
+            except KeyError:
+                index[word] = set([funame])
+
+    def _forget_containing(self, name):
+        """Drop memoized results of names containing ``name``.
+
+        Names and prefixes are matched between underscores only, so the
+        results that may change contain every word of ``name``; only the
+        names indexed under its longest word are checked.
+        """
+        word = max(name.split('_'), key = len)
+        if word:
+            candidates = self._memo_index.get(word, ())
+        else:
+            candidates = self._memo
+        index = self._memo_index
+        for funame in [f for f in candidates if name in f]:
+            del self._memo[funame]
+            for word in set(funame.split('_')):
+                funames = index[word]
+                funames.discard(funame)
+                if not funames:
+                    del index[word]
+
+    #########################################################################
+    # Queries
+    #########################################################################
+    def _split(self, funame):
+        """Split ``funame`` into ``(rest, main_prefix, primary)``."""
+        rsplit = AmUniformNames._rsplit_longest_suffix_set
+        prefix, primary = rsplit(funame, self.primary_names)
+        if primary is None:
+            raise ValueError("can't recognize primary name in %r" % funame)
+        if prefix is None:
+            raise ValueError("malformed uniform name %r" % funame)
+        prefix, main_prefix = rsplit(prefix, self.main_prefixes)
+        if main_prefix is None:
+            raise ValueError("can't recognize main prefix in %r" % funame)
+        return prefix, main_prefix, primary
+
+    def _decompose(self, funame):
+        rsplit = AmUniformNames._rsplit_longest_suffix_set
+        prefix, main_prefix, primary = self._split(funame)
+        prefix_list = []
+        while prefix is not None:
+            prefix, add_prefix = rsplit(prefix, self.add_prefixes)
+            if add_prefix is None:
+                raise ValueError("unknown prefix %r in uniform name %r" \
+                                 % (prefix, funame))
+            prefix_list.insert(0, add_prefix)
+        return tuple(prefix_list), main_prefix, primary
+
+    def _lookup(self, funame):
+        """Return memoized ``(ok, value)`` decomposition of ``funame``."""
+        try:
+            return self._memo[funame]
+        except KeyError:
+            pass
+        if self.parent is not None:
+            for name in self._added:
+                if name in funame:
+                    break
+            else:
+                # the additions can't match, so the parent's result holds
+                return self.parent._lookup(funame)
+        try:
+            result = (True, self._decompose(funame))
+        except ValueError as e:
+            result = (False, str(e))
+        self._remember(funame, result)
+        return result
+
+    def decompose(self, funame):
+        """Decompose full uniform name, see `AmUniformNames.decompose_name()
+        <SConsGnuVariables.AmUniformNames.decompose_name>`.
+
+        The results (and errors) are memoized per name.
+        """
+        ok, value = self._lookup(funame)
+        if not ok:
+            raise ValueError(value)
+        return list(value[0]), value[1], value[2]
+
+    def ensure_sanity(self, funame):
+        """Perform sanity checks on full uniform name, see
+        `AmUniformNames.ensure_name_sanity()
+        <SConsGnuVariables.AmUniformNames.ensure_name_sanity>`."""
+        prefixes, main_prefix, primary = self.decompose(funame)
+        if main_prefix in self.forbid_primary_main_prefixes.get(primary, ()):
+            raise ValueError("fobidden combination of prefix %r " \
+                "and primary name %r in uniform name %r"
+                % (main_prefix, primary, funame) )
+        forbidden = self.forbid_primary_add_prefixes.get(primary, ())
+        for prefix in prefixes:
+            if prefix in forbidden:
+                raise ValueError("fobidden combination of additional " \
+                    "prefix %r and primary name %r in uniform name %r"
+                    % (prefix, primary, funame) )
+        forbidden = self.forbid_main_add_prefixes.get(main_prefix, ())
+        for prefix in prefixes:
+            if prefix in forbidden:
+                raise ValueError("fobidden combination of additional " \
+                    "prefix %r and main prefix %r in uniform name %r"
+                    % (prefix, main_prefix, funame) )
+        if main_prefix not in self.primary_main_prefixes.get(primary, ()):
+            raise ValueError("unsupported combination of main prefix %r " \
+                             "and primary name %r in uniform name %r" \
+                             % (main_prefix, primary, funame))
+        return True
+
+    def _all_categories(self):
+        if self.parent is None:
+            return self.categories
+        categories = dict(self.parent._all_categories())
+        categories.update(self.categories)
+        return categories
+
+    def install_category(self, prefix):
+        """Return ``'exec'``, ``'data'``, ``'noinst'`` or ``None``, see
+        `AmUniformNames.install_category()
+        <SConsGnuVariables.AmUniformNames.install_category>`."""
+        scheme = self
+        while scheme is not None:
+            category = scheme.categories.get(prefix)
+            if category is not None:
+                return category
+            scheme = scheme.parent
+        return None
+
+    def name_category(self, funame):
+        """Return install category of full uniform name ``funame``."""
+        return self.install_category(self._split(funame)[1])
+
+    def is_install_exec_name(self, funame):
+        """See `AmUniformNames.is_install_exec_name()
+        <SConsGnuVariables.AmUniformNames.is_install_exec_name>`."""
+        return self.name_category(funame) == 'exec'
+
+    def is_install_data_name(self, funame):
+        """See `AmUniformNames.is_install_data_name()
+        <SConsGnuVariables.AmUniformNames.is_install_data_name>`."""
+        return self.name_category(funame) == 'data'
+
+    #########################################################################
+    # Batch queries
+    #########################################################################
+    def decompose_results(self, funames, workers=None):
+        """Decompose many names, reporting failures instead of raising.
+
+        This is the batch entry point for callers which keep the results,
+        failures included (e.g. `SharedCache.decompose_names()
+        <SConsGnuVariables.SharedCache.decompose_names>`).
+
+        :Parameters:
+            funames : sequence
+                uniform names to decompose
+            workers : int | None
+                see `decompose_names()`
+        :Returns:
+            list of ``(ok, value)`` pairs in order of ``funames``; ``value``
+            is the result of `decompose()` if ``ok``, the error message
+            otherwise
+        """
+        return AmUniformNames._run_batch('scheme', funames,
+                                         (self, 'decompose'), workers)
+
+    def decompose_names(self, funames, workers=None, ignore_errors=False):
+        """Decompose many names, see `AmUniformNames.decompose_names()
+        <SConsGnuVariables.AmUniformNames.decompose_names>`.
+
+        With ``workers``, the scheme is pickled once for each worker
+        process, and is not compiled there again.
+        """
+        results = self.decompose_results(funames, workers)
+        return AmUniformNames._batch_results(results, ignore_errors, None)
+
+    def ensure_names_sanity(self, funames, workers=None,
+                            ignore_errors=False):
+        """See `AmUniformNames.ensure_names_sanity()
+        <SConsGnuVariables.AmUniformNames.ensure_names_sanity>`."""
+        results = AmUniformNames._run_batch('scheme', funames,
+                                            (self, 'ensure_sanity'), workers)
+        if ignore_errors:
+            return [ok for ok, value in results]
+        AmUniformNames._batch_results(results, False, None)
+        return True
+
+#############################################################################
+_standard_scheme = None
+
+def standard_scheme():
+    """Return shared `Scheme`, compiled once.
+
+    It starts with standard names only, and collects the names added with
+    `register_primary()`, `register_main_prefix()`, `register_add_prefix()`
+    and `forbid()`. It's the natural root for schemes derived per directory
+    (see `Scheme.derive()`).
+    """
+    global _standard_scheme
+    if _standard_scheme is None:
+        _standard_scheme = Scheme()
+    return _standard_scheme
+
+#############################################################################
+def register_primary(name, main_prefixes=None):
+    """Register primary name in `standard_scheme()`, see
+    `Scheme.register_primary()`"""
+    standard_scheme().register_primary(name, main_prefixes)
+
+#############################################################################
+def register_main_prefix(name, category=None, primary_names=None):
+    """Register main prefix in `standard_scheme()`, see
+    `Scheme.register_main_prefix()`"""
+    standard_scheme().register_main_prefix(name, category, primary_names)
+
+#############################################################################
+def register_add_prefix(name):
+    """Register additional prefix in `standard_scheme()`, see
+    `Scheme.register_add_prefix()`"""
+    standard_scheme().register_add_prefix(name)
+
+#############################################################################
+def forbid(primary=None, main_prefix=None, add_prefix=None):
+    """Forbid combination in `standard_scheme()`, see `Scheme.forbid()`"""
+    standard_scheme().forbid(primary, main_prefix, add_prefix)
+
+#############################################################################
+def CompileScheme(**kw):
+    """Interface to `Scheme`, keywords are the arguments of
+    `Scheme.__init__()`"""
+    return Scheme(**kw)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
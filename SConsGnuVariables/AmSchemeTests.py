@@ -0,0 +1,167 @@
+""" SConsGnuVariables.AmSchemeTests
+
+Unit tests for SConsGnuVariables.AmScheme
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import pickle
+import random
+import unittest
+
+from SConsGnuVariables import AmScheme
+from SConsGnuVariables import AmUniformNames
+
+def _outcome(function, *args, **kw):
+    try:
+        return function(*args, **kw)
+    except ValueError as e:
+        return (ValueError, str(e))
+
+def _sample_names(count, extra_words=()):
+    """Return ``count`` random names, valid and invalid ones."""
+    rnd = random.Random(1234)
+    adds = list(AmUniformNames.standard_add_prefixes()) + list(extra_words)
+    mains = list(AmUniformNames.standard_main_prefixes()) + list(extra_words)
+    primaries = list(AmUniformNames.standard_primary_names()) \
+              + [w.upper() for w in extra_words]
+    words = adds + mains + primaries + ['foo', 'BAR', '']
+    names = []
+    for i in range(count):
+        if i % 4 == 3:
+            parts = [rnd.choice(words) for j in range(rnd.randint(1, 4))]
+        else:
+            parts = rnd.sample(adds, rnd.randint(0, 2)) \
+                  + [rnd.choice(mains), rnd.choice(primaries)]
+        names.append('_'.join(parts))
+    return names
+
+class TestCase(unittest.TestCase):
+    def test_decompose_same_as_AmUniformNames(self):
+        scheme = AmScheme.Scheme()
+        for name in _sample_names(3000):
+            self.assertEqual(_outcome(scheme.decompose, name),
+                             _outcome(AmUniformNames.decompose_name, name),
+                             name)
+
+    def test_decompose_user_names_same_as_AmUniformNames(self):
+        kw = { 'primary_names' : ['PLUGINS'],
+               'main_prefixes' : ['plugin', 'my_ext'],
+               'add_prefixes' : ['geez'] }
+        scheme = AmScheme.Scheme(**kw)
+        names = _sample_names(3000, ['plugin', 'my_ext', 'geez', 'plugins'])
+        for name in names:
+            self.assertEqual(_outcome(scheme.decompose, name),
+                             _outcome(AmUniformNames.decompose_name, name,
+                                      **kw), name)
+
+    def test_ensure_sanity_same_as_AmUniformNames(self):
+        scheme = AmScheme.Scheme()
+        for name in _sample_names(2000):
+            self.assertEqual(_outcome(scheme.ensure_sanity, name),
+                             _outcome(AmUniformNames.ensure_name_sanity,
+                                      name), name)
+
+    def test_decompose_names_same_as_decompose(self):
+        scheme = AmScheme.Scheme()
+        names = [n for n in _sample_names(500)
+                 if _outcome(scheme.decompose, n)[0] is not ValueError]
+        self.assertTrue(len(names) > 100)
+        self.assertEqual(scheme.decompose_names(names),
+                         [scheme.decompose(n) for n in names])
+
+    def test_decompose_results(self):
+        scheme = AmScheme.Scheme()
+        names = _sample_names(200)
+        results = scheme.decompose_results(names)
+        self.assertEqual(len(results), len(names))
+        for name, (ok, value) in zip(names, results):
+            if ok:
+                self.assertEqual(value, scheme.decompose(name))
+            else:
+                self.assertEqual(_outcome(scheme.decompose, name),
+                                 (ValueError, value))
+
+    def test_derive_same_as_flat_scheme(self):
+        top = AmScheme.Scheme()
+        sub = top.derive(primary_names = ['PLUGINS'],
+                         main_prefixes = ['plugin'])
+        flat = AmScheme.Scheme(primary_names = ['PLUGINS'],
+                               main_prefixes = ['plugin'])
+        for name in _sample_names(2000, ['plugin']):
+            self.assertEqual(_outcome(sub.decompose, name),
+                             _outcome(flat.decompose, name), name)
+        self.assertEqual(sub.content_hash(), flat.content_hash())
+        self.assertIs(top.derive(main_prefixes = ['plugin'],
+                                 primary_names = ['PLUGINS']), sub)
+
+    def test_register_primary_drops_affected_results_only(self):
+        scheme = AmScheme.Scheme()
+        self.assertRaises(ValueError, scheme.decompose, 'bin_FOO_BAR')
+        scheme.decompose('bin_PROGRAMS')
+        scheme.register_primary('FOO_BAR')
+        self.assertEqual(scheme.decompose('bin_FOO_BAR'),
+                         ([], 'bin', 'FOO_BAR'))
+        self.assertIn('bin_PROGRAMS', scheme._memo)
+
+    def test_register_propagates_to_derived_schemes(self):
+        top = AmScheme.Scheme()
+        sub = top.derive(add_prefixes = ['geez'])
+        self.assertRaises(ValueError, sub.decompose, 'geez_plugin_DATA')
+        top.register_main_prefix('plugin', 'exec')
+        self.assertEqual(sub.decompose('geez_plugin_DATA'),
+                         (['geez'], 'plugin', 'DATA'))
+        self.assertEqual(sub.install_category('plugin'), 'exec')
+
+    def test_memo_is_bounded(self):
+        saved = AmScheme._memo_max
+        AmScheme._memo_max = 10
+        try:
+            scheme = AmScheme.Scheme()
+            for i in range(100):
+                scheme.decompose('bin_DATA')
+                _outcome(scheme.decompose, 'bin_X%d' % i)
+                self.assertTrue(len(scheme._memo) <= 10)
+            words = set(w for f in scheme._memo for w in f.split('_'))
+            self.assertEqual(set(scheme._memo_index), words)
+        finally:
+            AmScheme._memo_max = saved
+
+    def test_pickle_round_trip(self):
+        scheme = AmScheme.Scheme(primary_names = ['PLUGINS'],
+                                 main_prefixes = ['plugin'])
+        copy = pickle.loads(pickle.dumps(scheme))
+        self.assertEqual(copy.content_hash(), scheme.content_hash())
+        self.assertEqual(copy.decompose('nobase_plugin_PLUGINS'),
+                         (['nobase'], 'plugin', 'PLUGINS'))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
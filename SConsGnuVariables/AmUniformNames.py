@@ -80,16 +80,33 @@ For related automake information see
 
 __docformat__ = 'restructuredText'
 
+try:
+    from types import MappingProxyType as _frozendict
+except ImportError:
+    # Python 2 has no public read-only dictionary view
+    class _frozendict(dict):
+        """Dictionary which refuses modifications (Python 2 replacement for
+        ``types.MappingProxyType``)"""
+        def _readonly(self, *args, **kw):
+            raise TypeError("%r object does not support item assignment"
+                            % self.__class__.__name__)
+        __setitem__ = __delitem__ = _readonly
+        clear = pop = popitem = setdefault = update = _readonly
+
 #############################################################################
-__std_add_prefixes = [
+__std_add_prefixes = (
     'dist',
     'nodist',
     'nobase',
     'notrans'
-]
+)
+
+#############################################################################
+__std_man_sections = ('0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
+                      'n', 'l')
 
 #############################################################################
-__std_main_prefixes = [
+__std_main_prefixes = (
     'bin',
     'sbin',
     'libexec',
@@ -116,18 +133,21 @@ __std_main_prefixes = [
     'pkglibexec',
 # not directory prefixes,
     'noinst',
-    'check'
-]
+    'check',
+# manX directory prefixes (one per standard man section)
+    'man0', 'man1', 'man2', 'man3', 'man4', 'man5', 'man6', 'man7', 'man8',
+    'man9', 'mann', 'manl'
+)
 
 # main prefixes that prohibit installation
 #############################################################################
-__std_noinst_main_prefixes = [
+__std_noinst_main_prefixes = (
     'noinst',
     'check'
-]
+)
 
 #############################################################################
-__std_primary_names = [
+__std_primary_names = (
     'PROGRAMS',
     'LIBRARIES',
     'LTLIBRARIES',
@@ -139,102 +159,124 @@ __std_primary_names = [
     'HEADERS',
     'MANS',
     'TEXINFOS'
-]
-
-#############################################################################
-__std_primary_main_prefixes = {
-    'PROGRAMS'    : ['bin', 'sbin', 'libexec', 'pkglibexec'],
-    'LIBRARIES'   : ['lib', 'pkglib'],
-    'LTLIBRARIES' : ['lib', 'pkglib'],
-    'LISP'        : ['lisp'],
-    'PYTHON'      : ['python', 'pkgpython'],
-    'JAVA'        : [],
-    'SCRIPTS'     : ['bin', 'sbin', 'libexec', 'pkglibexec', 'pkgdata'],
-    'DATA'        : ['data', 'sysconf', 'sharedstate', 'localstate', 'pkgdata'],
-    'HEADERS'     : ['include', 'oldinclude', 'pkginclude'],
-    'MANS'        : ['man'],
-    'TEXINFOS'    : ['info']
-}
+)
+
+# The 'noinst' and 'check' prefixes go with every primary name.
+#############################################################################
+__std_primary_main_prefixes = _frozendict({
+    'PROGRAMS'    : ('bin', 'sbin', 'libexec', 'pkglibexec', 'noinst',
+                     'check'),
+    'LIBRARIES'   : ('lib', 'pkglib', 'noinst', 'check'),
+    'LTLIBRARIES' : ('lib', 'pkglib', 'noinst', 'check'),
+    'LISP'        : ('lisp', 'noinst', 'check'),
+    'PYTHON'      : ('python', 'pkgpython', 'noinst', 'check'),
+    'JAVA'        : ('noinst', 'check'),
+    'SCRIPTS'     : ('bin', 'sbin', 'libexec', 'pkglibexec', 'pkgdata',
+                     'noinst', 'check'),
+    'DATA'        : ('data', 'sysconf', 'sharedstate', 'localstate',
+                     'pkgdata', 'noinst', 'check'),
+    'HEADERS'     : ('include', 'oldinclude', 'pkginclude', 'noinst',
+                     'check'),
+    'MANS'        : ('man', 'man0', 'man1', 'man2', 'man3', 'man4', 'man5',
+                     'man6', 'man7', 'man8', 'man9', 'mann', 'manl',
+                     'noinst', 'check'),
+    'TEXINFOS'    : ('info', 'noinst', 'check')
+})
 
 # certain forbidden combinations
 #############################################################################
-__std_forbid_primary_main_prefixes = {
-    'PROGRAMS'      : [],
-    'LIBRARIES'     : [],
-    'LTLIBRARIES'   : [],
-    'LISP'          : [],
-    'PYTHON'        : [],
-    'JAVA'          : [],
-    'SCRIPTS'       : [],
-    'DATA'          : [],
-    'HEADERS'       : [],
-    'MANS'          : [],
-    'TEXINFOS'      : [],
-}
+__std_forbid_primary_main_prefixes = _frozendict({
+    'PROGRAMS'      : (),
+    'LIBRARIES'     : (),
+    'LTLIBRARIES'   : (),
+    'LISP'          : (),
+    'PYTHON'        : (),
+    'JAVA'          : (),
+    'SCRIPTS'       : (),
+    'DATA'          : (),
+    'HEADERS'       : (),
+    'MANS'          : (),
+    'TEXINFOS'      : (),
+})
 
 #############################################################################
-__std_forbid_primary_add_prefixes = {
-    'PROGRAMS'      : [],
-    'LIBRARIES'     : [],
-    'LTLIBRARIES'   : [],
-    'LISP'          : [],
-    'PYTHON'        : [],
-    'JAVA'          : [],
-    'SCRIPTS'       : [],
-    'DATA'          : [],
-    'HEADERS'       : [],
-    'MANS'          : [],
-    'TEXINFOS'      : [],
-}
+__std_forbid_primary_add_prefixes = _frozendict({
+    'PROGRAMS'      : (),
+    'LIBRARIES'     : (),
+    'LTLIBRARIES'   : (),
+    'LISP'          : (),
+    'PYTHON'        : (),
+    'JAVA'          : (),
+    'SCRIPTS'       : (),
+    'DATA'          : (),
+    'HEADERS'       : (),
+    'MANS'          : (),
+    'TEXINFOS'      : (),
+})
 
 #############################################################################
-__std_forbid_main_add_prefixes = {
-    'bin'           : [],
-    'sbin'          : [],
-    'libexec'       : [],
-    'dataroot'      : [],
-    'data'          : [],
-    'sysconf'       : [],
-    'sharedstate'   : [],
-    'localstate'    : [],
-    'include'       : [],
-    'oldinclude'    : [],
-    'doc'           : [],
-    'info'          : [],
-    'html'          : [],
-    'dvi'           : [],
-    'pdf'           : [],
-    'ps'            : [],
-    'lib'           : [],
-    'lisp'          : [],
-    'locale'        : [],
-    'man'           : ['nobase'],
-    'pkgdata'       : [],
-    'pkginclude'    : [],
-    'pkglib'        : [],
-    'pkglibexec'    : [],
+__std_forbid_main_add_prefixes = _frozendict({
+    'bin'           : (),
+    'sbin'          : (),
+    'libexec'       : (),
+    'dataroot'      : (),
+    'data'          : (),
+    'sysconf'       : (),
+    'sharedstate'   : (),
+    'localstate'    : (),
+    'include'       : (),
+    'oldinclude'    : (),
+    'doc'           : (),
+    'info'          : (),
+    'html'          : (),
+    'dvi'           : (),
+    'pdf'           : (),
+    'ps'            : (),
+    'lib'           : (),
+    'lisp'          : (),
+    'locale'        : (),
+    'man'           : ('nobase',),
+    'pkgdata'       : (),
+    'pkginclude'    : (),
+    'pkglib'        : (),
+    'pkglibexec'    : (),
 #
-    'noinst'        : ['nobase'],
-    'check'         : []
-}
+    'noinst'        : ('nobase',),
+    'check'         : (),
+#
+    'man0'          : ('nobase',),
+    'man1'          : ('nobase',),
+    'man2'          : ('nobase',),
+    'man3'          : ('nobase',),
+    'man4'          : ('nobase',),
+    'man5'          : ('nobase',),
+    'man6'          : ('nobase',),
+    'man7'          : ('nobase',),
+    'man8'          : ('nobase',),
+    'man9'          : ('nobase',),
+    'mann'          : ('nobase',),
+    'manl'          : ('nobase',),
+})
 
 # According to automake's "The Two Parts of Install"
 # http://www.gnu.org/software/automake/manual/automake.html#The-Two-Parts-of-Install
 #############################################################################
-__std_install_data_prefixes = [ 
+__std_install_data_prefixes = (
     'data',
     'info',
     'man',
     'include',
     'oldinclude',
     'pkgdata',
-    'pkginclude'
-]
+    'pkginclude',
+    'man0', 'man1', 'man2', 'man3', 'man4', 'man5', 'man6', 'man7', 'man8',
+    'man9', 'mann', 'manl'
+)
 
 # According to automake's "The Two Parts of Install"
 # http://www.gnu.org/software/automake/manual/automake.html#The-Two-Parts-of-Install
 #############################################################################
-__std_install_exec_prefixes = [
+__std_install_exec_prefixes = (
     'bin',
     'sbin',
     'libexec',
@@ -242,30 +284,43 @@ __std_install_exec_prefixes = [
     'localstate',
     'lib',
     'pkglib'
-]
+)
 
-__std_man_sections = map(lambda x : str(x), range(0,10)) + ['n', 'l']
+# Hash-based indexes over the above tables. They're built on first use by
+# `_std_index()`, so that importing the module stays cheap.
+#############################################################################
+__std_index = None
 
 #############################################################################
-def __init_module_vars():
-    # generate manX directory prefixes
-    for sec in __std_man_sections:
-        __std_primary_main_prefixes['MANS'].append('man%s' % sec)
-        __std_main_prefixes.append('man%s' % sec)
-        __std_install_data_prefixes.append('man%s' % sec)
-        __std_forbid_main_add_prefixes['man%s' % sec] = \
-            __std_forbid_main_add_prefixes['man']
-    # add 'noinst' and 'check' prefixes where appropriate
-    for primary in __std_primary_main_prefixes.keys():
-        __std_primary_main_prefixes[primary].append('noinst')
-        __std_primary_main_prefixes[primary].append('check')
+def _std_index():
+    """Return a dictionary of frozensets indexing the standard tables.
 
-__init_module_vars()
+    The dictionary is computed once, on first call, and cached.
+    """
+    global __std_index
+    if __std_index is None:
+        __std_index = {
+            'primary_names'     : frozenset(__std_primary_names),
+            'main_prefixes'     : frozenset(__std_main_prefixes),
+            'add_prefixes'      : frozenset(__std_add_prefixes),
+            'noinst_prefixes'   : frozenset(__std_noinst_main_prefixes),
+            'install_exec'      : frozenset(__std_install_exec_prefixes),
+            'install_data'      : frozenset(__std_install_data_prefixes),
+        }
+    return __std_index
+
+#############################################################################
+def _std_forbid_tables():
+    """Return the standard forbid tables as tuple ``(primary_main,
+    primary_add, main_add)``."""
+    return (__std_forbid_primary_main_prefixes,
+            __std_forbid_primary_add_prefixes,
+            __std_forbid_main_add_prefixes)
 
 
 #############################################################################
 def standard_primary_names():
-    """Return list of standard primary names as defined by GNU build system.
+    """Return tuple of standard primary names as defined by GNU build system.
 
     **Note**
     
@@ -273,9 +328,10 @@ def standard_primary_names():
     
     **Description**
 
-    This function returns the list of primary names defined in the automake
+    This function returns the tuple of primary names defined in the automake
     documentation, see `The Uniform Naming Scheme`_ section of automake
-    documentation.
+    documentation. The tuple is shared between calls, it's immutable so it
+    can't be spoiled by the caller.
 
     .. _The Uniform Naming Scheme: http://www.gnu.org/software/automake/manual/html_node/Uniform.html
     """
@@ -283,7 +339,7 @@ def standard_primary_names():
 
 #############################################################################
 def standard_main_prefixes():
-    """Return list of standard main prefixes.
+    """Return tuple of standard main prefixes.
 
     **Note**
     
@@ -291,12 +347,12 @@ def standard_main_prefixes():
     
     **Description**
 
-    This function returns the list of standard prefixes that may go just before
-    PRIMARY names. The list contains directory prefixes based on directory
+    This function returns the tuple of standard prefixes that may go just before
+    PRIMARY names. The tuple contains directory prefixes based on directory
     variables defined in GNU coding standards (see `Variables for Installation
     Directories`_) extended by pkgxxx directory variables defined by `The
     Uniform Naming Scheme`_  (automake) and few other prefixes.  The returned
-    list also contains special prefixes such as ``noinst`` and ``check``.
+    tuple also contains special prefixes such as ``noinst`` and ``check``.
 
     .. _The Uniform Naming Scheme: http://www.gnu.org/software/automake/manual/html_node/Uniform.html
     .. _Variables for Installation Directories: http://www.gnu.org/prep/standards/html_node/Directory-Variables.html#Directory-Variables
@@ -305,7 +361,7 @@ def standard_main_prefixes():
 
 #############################################################################
 def standard_add_prefixes():
-    """Return list of standard additional prefixes
+    """Return tuple of standard additional prefixes
 
     **Note**
     
@@ -313,7 +369,7 @@ def standard_add_prefixes():
     
     **Description**
 
-    This function returns the list of standard prefixes defined in the
+    This function returns the tuple of standard prefixes defined in the
     automake's documentation, i.e. ``nobase``, ``notrans`` and others. See
     `The Uniform Naming Scheme`_ (automake) for details.
 
@@ -323,7 +379,7 @@ def standard_add_prefixes():
 
 #############################################################################
 def standard_primary_main_prefixes(primary = None):
-    """Return list of standard prefixes that may go with particular primary
+    """Return tuple of standard prefixes that may go with particular primary
     name.
 
     **Note**
@@ -332,17 +388,18 @@ def standard_primary_main_prefixes(primary = None):
     
     **Description**
 
-    The function returns, a list of main prefixes that may go together
+    The function returns, a tuple of main prefixes that may go together
     with the given ``primary`` name. So, if, for example, the ``primary`` is
-    ``"PROGRAMS"``, the supported main prefixes will be ``["bin", "sbin",
-    "libexec", "pkglibexec", "noinst", "check"]``. If the ``primary`` is
+    ``"PROGRAMS"``, the supported main prefixes will be ``("bin", "sbin",
+    "libexec", "pkglibexec", "noinst", "check")``. If the ``primary`` is
     ``None``, then entire dictionary describing allowed combinations is
     returned. The dictionary has form::
 
-        { 'PROGRAMS' : ["bin","sbin","libexec","pkglibexec","noinst","check"],
-          'LIBRARIES' : ["lib","pkglib","noinst","check"], ... },
+        { 'PROGRAMS' : ("bin","sbin","libexec","pkglibexec","noinst","check"),
+          'LIBRARIES' : ("lib","pkglib","noinst","check"), ... },
 
-    is returned.
+    is returned. The dictionary is a read-only view of module's internal
+    table (``types.MappingProxyType``), so it can't be modified by caller.
 
     The lists were developed according to automake's documentation, especially:
 
@@ -372,14 +429,12 @@ def standard_primary_main_prefixes(primary = None):
     """
     if primary is None:
         return __std_primary_main_prefixes
-    elif primary in __std_primary_main_prefixes:
-        return __std_primary_main_prefixes[primary]  
     else:
-        return []
+        return __std_primary_main_prefixes.get(primary, ())
 
 #############################################################################
 def standard_man_sections():
-    """Return list of standard man sections (manpage sections)
+    """Return tuple of standard man sections (manpage sections)
 
     **Note**
     
@@ -387,43 +442,45 @@ def standard_man_sections():
     
     **Description**
 
-    The function returns a list of man page sections as defined in the section
+    The function returns a tuple of man page sections as defined in the section
     `Man pages`_ of automake documentation.
 
     .. _Man pages: http://www.gnu.org/software/automake/manual/automake.html#Man-Pages
     """
     return __std_man_sections
 
+#############################################################################
+def _merge_names(names, std_names):
+    """Merge user-defined ``names`` with standard ones.
+
+    Returns a frozenset. When there is nothing to merge, ``std_names`` (or an
+    empty frozenset) is returned as is, without copying.
+    """
+    if not names:
+        if std_names is None:
+            return frozenset()
+        return std_names
+    if std_names is None:
+        return frozenset(names)
+    return std_names.union(names)
+
 #############################################################################
 def _prepare_primary_names_list(primary_names, use_std_primary_names):
-    if primary_names is None:
-        primary_names = []
-    else:
-        primary_names = list(primary_names)
     if use_std_primary_names:
-        primary_names.extend(standard_primary_names())
-    return list(set(primary_names))
+        return _merge_names(primary_names, _std_index()['primary_names'])
+    return _merge_names(primary_names, None)
 
 #############################################################################
 def _prepare_main_prefixes_list(main_prefixes, use_std_main_prefixes):
-    if main_prefixes is None:
-        main_prefixes = []
-    else:
-        main_prefixes = list(main_prefixes)
     if use_std_main_prefixes:
-        main_prefixes.extend(standard_main_prefixes())
-    return list(set(main_prefixes))
+        return _merge_names(main_prefixes, _std_index()['main_prefixes'])
+    return _merge_names(main_prefixes, None)
 
 #############################################################################
 def _prepare_add_prefixes_list(add_prefixes, use_std_add_prefixes):
-    if add_prefixes is None:
-        add_prefixes = []
-    else:
-        add_prefixes = list(add_prefixes)
     if use_std_add_prefixes:
-        add_prefixes.extend(standard_add_prefixes())
-    return list(set(add_prefixes))
-
+        return _merge_names(add_prefixes, _std_index()['add_prefixes'])
+    return _merge_names(add_prefixes, None)
 
 #############################################################################
 # TODO: revise, test
@@ -484,7 +541,9 @@ def rsplit_longest_suffix(uname, suffixes):
         uname
             the uniform name string to be split
         suffixes
-            list (or other sequence) of suffixes to be matched to ``uname``
+            list (or other sequence) of suffixes to be matched to ``uname``;
+            if it's a ``set`` or ``frozenset``, the lookup is hash-based and
+            doesn't depend on the number of suffixes
     :Returns:
         returns tuple ``(prefix, suffix)`` where ``suffix`` is the best
         matching suffix and ``prefix`` is the part that remains on the left
@@ -493,6 +552,8 @@ def rsplit_longest_suffix(uname, suffixes):
         was split out"; if the longest suffix matches whole ``uname`` then
         returns ``(None, uname)`` what means "no prefix left after splitting";
     """
+    if isinstance(suffixes, (set, frozenset)):
+        return _rsplit_longest_suffix_set(uname, suffixes)
     minindex = len(uname)
     for suffix in suffixes:
         # FIXME: prevent suffix from starting with '_'?
@@ -510,6 +571,28 @@ def rsplit_longest_suffix(uname, suffixes):
     else:
         return uname, None
 
+#############################################################################
+def _rsplit_longest_suffix_set(uname, suffixes):
+    """Same as `rsplit_longest_suffix()`, but ``suffixes`` must be a set.
+
+    Instead of trying every suffix, the candidate tails of ``uname`` (these
+    starting just after an underscore) are looked up in ``suffixes``, from the
+    longest one to the shortest one.
+    """
+    if uname in suffixes:
+        return None, uname
+    length = len(uname)
+    index = uname.find('_')
+    while index >= 0:
+        index += 1
+        if index < length and uname[index:] in suffixes:
+            if index <= 1:
+                return None, uname[index:]
+            else:
+                return uname[:index-1], uname[index:]
+        index = uname.find('_', index)
+    return uname, None
+
 #############################################################################
 def rsplit_primary_name(uname, primary_names=None, use_std_primary_names=True):
     """Split uniform name into prefix and primary name.
@@ -931,7 +1014,7 @@ def ensure_name_sanity(funame, primary_names=None,
 
 #############################################################################
 def is_noinst_main_prefix(prefix):
-    return prefix in __std_noinst_main_prefixes
+    return prefix in _std_index()['noinst_prefixes']
 
 #############################################################################
 def is_install_exec_prefix2(prefix, main_prefixes):
@@ -984,9 +1067,10 @@ def is_install_exec_prefix(prefix, main_prefixes=None,
             if True, then standard main prefixes are taken into account
     """
     if use_std_main_prefixes:
-        if prefix in __std_install_exec_prefixes: return True
-        if prefix in __std_install_data_prefixes: return False
-        if is_install_exec_prefix2(prefix,standard_main_prefixes()):
+        index = _std_index()
+        if prefix in index['install_exec']: return True
+        if prefix in index['install_data']: return False
+        if is_install_exec_prefix2(prefix,index['main_prefixes']):
             return True
     return is_install_exec_prefix2(prefix,main_prefixes)
 
@@ -1009,12 +1093,51 @@ def is_install_data_prefix(prefix, main_prefixes=None,
             if True, then standard directory prefixes are taken into account
     """
     if use_std_main_prefixes:
-        if prefix in __std_install_data_prefixes: return True
-        if prefix in __std_install_exec_prefixes: return False
-        if is_install_data_prefix2(prefix,standard_main_prefixes()): 
+        index = _std_index()
+        if prefix in index['install_data']: return True
+        if prefix in index['install_exec']: return False
+        if is_install_data_prefix2(prefix,index['main_prefixes']):
             return True
     return is_install_data_prefix2(prefix,main_prefixes)
 
+#############################################################################
+def install_category(prefix, main_prefixes=None, use_std_main_prefixes=True):
+    """Classify main prefix by the part of install that handles it.
+
+    **Note**
+
+    You may wish to use `InstallCategory()` instead.
+
+    **Examples**:
+
+        >>> from SConsGnuVariables.AmUniformNames import install_category
+        >>> install_category('bin')
+        'exec'
+        >>> install_category('pkginclude')
+        'data'
+        >>> install_category('check')
+        'noinst'
+
+    :Parameters:
+        prefix : str
+            main prefix to classify, e.g. ``bin`` or ``pkglib``
+        main_prefixes : sequence
+            additional user-defined main prefixes
+        use_std_main_prefixes : boolean
+            if True, then standard main prefixes are taken into account
+    :Returns:
+        ``'exec'`` for install-exec prefixes, ``'data'`` for install-data
+        prefixes, ``'noinst'`` for prefixes that prohibit installation (i.e.
+        ``noinst`` and ``check``) and ``None`` for unknown prefixes
+    """
+    if is_noinst_main_prefix(prefix):
+        return 'noinst'
+    if is_install_exec_prefix(prefix, main_prefixes, use_std_main_prefixes):
+        return 'exec'
+    if is_install_data_prefix(prefix, main_prefixes, use_std_main_prefixes):
+        return 'data'
+    return None
+
 #############################################################################
 def is_install_exec_name(funame, primary_names=None, main_prefixes=None,
                          use_std_primary_names=True,
@@ -1119,6 +1242,268 @@ def is_install_data_name(funame, primary_names=None, main_prefixes=None,
     return is_install_data_prefix(main_prefix, main_prefixes,
                                   use_std_main_prefixes)
 
+#############################################################################
+# Batch processing
+#
+# The batch functions below apply one of the single-name functions to many
+# names. Large inputs may be processed by a pool of worker processes. The
+# configuration (user-defined names and prefixes, use_std_* flags) is sent to
+# each worker only once, when the worker starts, and then the names are sent
+# in chunks.
+#############################################################################
+
+# Inputs shorter than this are processed serially (a process pool costs more
+# than it saves on small inputs).
+_min_parallel_names = 20000
+
+# Number of chunks per worker, more chunks give better load balancing.
+_chunks_per_worker = 4
+
+# Configuration of the current worker process, see `_init_batch_worker()`.
+_batch_state = None
+
+#############################################################################
+def _pack_batch_args(args):
+    """Convert batch arguments to compact, picklable form.
+
+    Lists become tuples and dictionaries become sorted tuples of
+    ``(key, tuple(values))`` pairs.
+    """
+    packed = []
+    for arg in args:
+        if isinstance(arg, dict):
+            arg = tuple(sorted((k, tuple(v)) for k, v in arg.items()))
+        elif isinstance(arg, (list, tuple, set, frozenset)):
+            arg = tuple(arg)
+        packed.append(arg)
+    return tuple(packed)
+
+#############################################################################
+def _unpack_batch_args(op, packed):
+    """Reverse of `_pack_batch_args()`."""
+    dict_args = _batch_dict_args[op]
+    return tuple(dict(arg) if (i in dict_args and arg is not None) else arg
+                 for i, arg in enumerate(packed))
+
+#############################################################################
+def _scheme_method(funame, scheme, method):
+    """Apply ``method`` of compiled scheme (see `SConsGnuVariables.AmScheme`)
+    to ``funame``; the scheme is sent to workers once, as any other
+    configuration."""
+    return getattr(scheme, method)(funame)
+
+#############################################################################
+def _batch_function(op):
+    return { 'decompose'    : decompose_name,
+             'sanity'       : ensure_name_sanity,
+             'exec'         : is_install_exec_name,
+             'data'         : is_install_data_name,
+             'scheme'       : _scheme_method }[op]
+
+# Positions of dictionary arguments, by operation.
+_batch_dict_args = {
+    'decompose' : (),
+    'sanity'    : (3, 4, 5, 6),
+    'exec'      : (),
+    'data'      : (),
+    'scheme'    : (),
+}
+
+# Positions of ``(names, use_std_names)`` argument pairs and the functions
+# merging them, by operation.
+_batch_name_args = {
+    'decompose' : ((0, 3, _prepare_primary_names_list),
+                   (1, 4, _prepare_main_prefixes_list),
+                   (2, 5, _prepare_add_prefixes_list)),
+    'sanity'    : ((0, 7, _prepare_primary_names_list),
+                   (1, 8, _prepare_main_prefixes_list),
+                   (2, 9, _prepare_add_prefixes_list)),
+    'exec'      : ((0, 2, _prepare_primary_names_list),),
+    'data'      : ((0, 2, _prepare_primary_names_list),),
+    'scheme'    : (),
+}
+
+#############################################################################
+def _prepare_batch_args(op, args):
+    """Merge user-defined names with standard ones once per batch.
+
+    The merged set replaces user-defined names and the corresponding
+    ``use_std_*`` flag is cleared, so the single-name functions don't build
+    the same union again for every name.
+    """
+    args = list(args)
+    for names, use_std, prepare in _batch_name_args[op]:
+        if args[names]:
+            args[names] = prepare(args[names], args[use_std])
+            args[use_std] = False
+    return tuple(args)
+
+#############################################################################
+def _init_batch_worker(op, packed):
+    global _batch_state
+    args = _unpack_batch_args(op, packed)
+    _batch_state = (op, _prepare_batch_args(op, args))
+
+#############################################################################
+def _run_batch_chunk(chunk):
+    """Process a chunk of names in worker process.
+
+    Returns list of ``(ok, value)`` pairs, where ``value`` is either the
+    function's result or the error message.
+    """
+    op, args = _batch_state
+    return _run_batch_serial(_batch_function(op), chunk, args)
+
+#############################################################################
+def _run_batch_serial(function, funames, args):
+    results = []
+    for funame in funames:
+        try:
+            results.append((True, function(funame, *args)))
+        except ValueError as e:
+            results.append((False, str(e)))
+    return results
+
+#############################################################################
+def _run_batch(op, funames, args, workers):
+    """Apply operation ``op`` to every name in ``funames``.
+
+    Returns list of ``(ok, value)`` pairs, in same order as ``funames``.
+    """
+    if not isinstance(funames, (list, tuple)):
+        funames = list(funames)
+    if workers and workers > 1:
+        import multiprocessing
+        # more processes than CPUs only add overhead
+        workers = min(workers, multiprocessing.cpu_count())
+    if not workers or workers <= 1 or len(funames) < _min_parallel_names:
+        return _run_batch_serial(_batch_function(op), funames,
+                                 _prepare_batch_args(op, args))
+    size = max(1, len(funames) // (workers * _chunks_per_worker))
+    chunks = [funames[i:i+size] for i in range(0, len(funames), size)]
+    pool = multiprocessing.Pool(workers, _init_batch_worker,
+                                (op, _pack_batch_args(args)))
+    try:
+        parts = pool.map(_run_batch_chunk, chunks, 1)
+    finally:
+        pool.close()
+        pool.join()
+    results = []
+    for part in parts:
+        results.extend(part)
+    return results
+
+#############################################################################
+def _batch_results(results, ignore_errors, default):
+    values = []
+    for ok, value in results:
+        if ok:
+            values.append(value)
+        elif ignore_errors:
+            values.append(default)
+        else:
+            raise ValueError(value)
+    return values
+
+#############################################################################
+def decompose_names(funames, primary_names=None, main_prefixes=None,
+                    add_prefixes=None,
+                    use_std_primary_names=True,
+                    use_std_main_prefixes=True,
+                    use_std_add_prefixes=True,
+                    workers=None, ignore_errors=False):
+    """Decompose many uniform names at once.
+
+    **Note**
+
+    You may wish to use `DecomposeNames()` instead.
+
+    **Description**
+
+    Same as calling `decompose_name()` for every name in ``funames``. If
+    ``workers`` is greater than one and the input is large enough, the names
+    are processed in chunks by a pool of ``workers`` processes (see
+    ``multiprocessing``). The results are always in same order as
+    ``funames``.
+
+    :Parameters:
+        funames : sequence
+            full uniform names to be decomposed
+        workers : int | None
+            number of worker processes; ``None`` (default), ``0`` or ``1``
+            mean serial processing in the current process; the number is
+            limited to the number of CPUs
+        ignore_errors : boolean
+            if ``False`` (default), ``ValueError`` is raised for the first
+            (in input order) name that can't be decomposed; if ``True``,
+            ``None`` is put in place of its result
+        [others]
+            see `decompose_name()`
+    :Returns:
+        list of ``(prefix_list, main_prefix, primary)`` tuples
+    """
+    args = (primary_names, main_prefixes, add_prefixes,
+            use_std_primary_names, use_std_main_prefixes,
+            use_std_add_prefixes)
+    results = _run_batch('decompose', funames, args, workers)
+    return _batch_results(results, ignore_errors, None)
+
+#############################################################################
+def ensure_names_sanity(funames, primary_names=None,
+                        main_prefixes=None,
+                        add_prefixes=None,
+                        primary_main_prefixes=None,
+                        forbid_primary_main_prefixes=None,
+                        forbid_primary_add_prefixes=None,
+                        forbid_main_add_prefixes=None,
+                        use_std_primary_names=True,
+                        use_std_main_prefixes=True,
+                        use_std_add_prefixes=True,
+                        use_std_primary_main_prefixes=True,
+                        use_std_forbid_primary_main_prefixes=True,
+                        use_std_forbid_primary_add_prefixes=True,
+                        use_std_forbid_main_add_prefixes=True,
+                        workers=None, ignore_errors=False):
+    """Perform sanity checks on many uniform names at once.
+
+    **Note**
+
+    You may wish to use `EnsureNamesSanity()` instead.
+
+    **Description**
+
+    Same as calling `ensure_name_sanity()` for every name in ``funames``,
+    optionally with a pool of ``workers`` processes (see
+    `decompose_names()`).
+
+    :Parameters:
+        funames : sequence
+            full uniform names to be checked
+        workers : int | None
+            number of worker processes, see `decompose_names()`
+        ignore_errors : boolean
+            if ``False`` (default), ``ValueError`` is raised for the first
+            (in input order) name that fails the checks; if ``True``, the
+            function returns list of booleans, one for each name
+        [others]
+            see `ensure_name_sanity()`
+    :Returns:
+        ``True``, or list of booleans if ``ignore_errors`` is ``True``
+    """
+    args = (primary_names, main_prefixes, add_prefixes, primary_main_prefixes,
+            forbid_primary_main_prefixes, forbid_primary_add_prefixes,
+            forbid_main_add_prefixes, use_std_primary_names,
+            use_std_main_prefixes, use_std_add_prefixes,
+            use_std_primary_main_prefixes,
+            use_std_forbid_primary_main_prefixes,
+            use_std_forbid_primary_add_prefixes,
+            use_std_forbid_main_add_prefixes)
+    results = _run_batch('sanity', funames, args, workers)
+    if ignore_errors:
+        return [ok for ok, value in results]
+    _batch_results(results, False, None)
+    return True
+
 #############################################################################
 def StandardPrimaryNames(**kw):
     """Return standard PRIMARY names known from automake"""
@@ -1205,6 +1590,50 @@ def EnsureNameSanity(funame,**kw):
     except KeyError: args +=(True,)
     return ensure_name_sanity(funame, *args)
 
+#############################################################################
+def DecomposeNames(funames, **kw):
+    """Interface to `decompose_names()`."""
+    args = ()
+    try:                args += (kw['primary_names'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['main_prefixes'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['add_prefixes'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['use_std_primary_names'],)
+    except KeyError:    args += (True,)
+    try:                args += (kw['use_std_main_prefixes'],)
+    except KeyError:    args += (True,)
+    try:                args += (kw['use_std_add_prefixes'],)
+    except KeyError:    args += (True,)
+    try:                args += (kw['workers'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['ignore_errors'],)
+    except KeyError:    args += (False,)
+    return decompose_names(funames, *args)
+
+#############################################################################
+def EnsureNamesSanity(funames, **kw):
+    """Interface to `ensure_names_sanity()`"""
+    args = ()
+    for key in ('primary_names', 'main_prefixes', 'add_prefixes',
+                'primary_main_prefixes', 'forbid_primary_main_prefixes',
+                'forbid_primary_add_prefixes', 'forbid_main_add_prefixes'):
+        try:             args += (kw[key],)
+        except KeyError: args += (None,)
+    for key in ('use_std_primary_names', 'use_std_main_prefixes',
+                'use_std_add_prefixes', 'use_std_primary_main_prefixes',
+                'use_std_forbid_primary_main_prefixes',
+                'use_std_forbid_primary_add_prefixes',
+                'use_std_forbid_main_add_prefixes'):
+        try:             args += (kw[key],)
+        except KeyError: args += (True,)
+    try:             args += (kw['workers'],)
+    except KeyError: args += (None,)
+    try:             args += (kw['ignore_errors'],)
+    except KeyError: args += (False,)
+    return ensure_names_sanity(funames, *args)
+
 #############################################################################
 def RSplitMainPrefix(uname, **kw):
     """Interface to `rsplit_main_prefix()`."""
@@ -1245,6 +1674,16 @@ def IsInstallDataPrefix(prefix, **kw):
     except KeyError:    args += (True,)
     return is_install_data_prefix(prefix, *args)
 
+#############################################################################
+def InstallCategory(prefix, **kw):
+    """Interface to `install_category()`."""
+    args = ()
+    try:                args += (kw['main_prefixes'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['use_std_main_prefixes'],)
+    except KeyError:    args += (True,)
+    return install_category(prefix, *args)
+
 #############################################################################
 def IsInstallExecName(funame, **kw):
     """Interface to `is_install_exec_name()`."""
@@ -1273,6 +1712,25 @@ def IsInstallDataName(funame, **kw):
     except KeyError:    args += (True,)
     return is_install_data_name(funame, *args)
 
+#############################################################################
+def _filter_names(op, funames, kw):
+    """Common part of `FilterInstallExecNames()` and
+    `FilterInstallDataNames()`."""
+    args = ()
+    try:                args += (kw['primary_names'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['main_prefixes'],)
+    except KeyError:    args += (None,)
+    try:                args += (kw['use_std_primary_names'],)
+    except KeyError:    args += (True,)
+    try:                args += (kw['use_std_main_prefixes'],)
+    except KeyError:    args += (True,)
+    if not isinstance(funames, (list, tuple)):
+        funames = list(funames)
+    results = _run_batch(op, funames, args, kw.get('workers'))
+    flags = _batch_results(results, False, None)
+    return [funame for funame, flag in zip(funames, flags) if flag]
+
 #############################################################################
 def FilterInstallExecNames(funames,**kw):
     """Filter uniform names and return only these which are to be handled by
@@ -1299,12 +1757,15 @@ def FilterInstallExecNames(funames,**kw):
             use also standard predefined primary names (default: True)
         use_std_main_prefixes : boolean
             use also standard predefined directory prefixes (default: True)
+        workers : int
+            number of worker processes, see `decompose_names()` (default:
+            None)
 
     :Return:
         returns list of variable names that should be handled by
         ``install-exec``
     """
-    return [funame for funame in funames if IsInstallExecName(funame,**kw)]
+    return _filter_names('exec', funames, kw)
   
 #############################################################################
 def FilterInstallDataNames(funames,**kw):
@@ -1324,6 +1785,9 @@ def FilterInstallDataNames(funames,**kw):
             use also standard predefined primary names (default: True)
         use_std_main_prefixes : boolean
             use also standard predefined directory prefixes (default: True)
+        workers : int
+            number of worker processes, see `decompose_names()` (default:
+            None)
     
     :Return:
         returns list of variable names that should be handled by
@@ -1337,7 +1801,7 @@ def FilterInstallDataNames(funames,**kw):
         >>> FilterInstallDataNames(funames)
         ['nobase_include_HEADERS']
     """
-    return [funame for funame in funames if IsInstallDataName(funame,**kw)]
+    return _filter_names('data', funames, kw)
 
 # Local Variables:
 # # tab-width:4
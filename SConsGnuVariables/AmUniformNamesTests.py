@@ -0,0 +1,139 @@
+""" SConsGnuVariables.AmUniformNamesTests
+
+Unit tests for SConsGnuVariables.AmUniformNames
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import multiprocessing
+import unittest
+
+from SConsGnuVariables import AmUniformNames
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        # Make small inputs reach the process pool, even on one CPU.
+        self.saved = (AmUniformNames._min_parallel_names,
+                      multiprocessing.cpu_count, multiprocessing.Pool)
+        self.pools = []
+        def pool(processes, *args, **kw):
+            self.pools.append(processes)
+            return self.saved[2](processes, *args, **kw)
+        AmUniformNames._min_parallel_names = 10
+        multiprocessing.cpu_count = lambda : 4
+        multiprocessing.Pool = pool
+
+    def tearDown(self):
+        (AmUniformNames._min_parallel_names, multiprocessing.cpu_count,
+         multiprocessing.Pool) = self.saved
+
+    def _names(self):
+        names = ['bin_PROGRAMS', 'geez_plugin_FOO', 'bogus', 'nobase_FOO',
+                 'nobase_dist_data_DATA', 'plugin_DATA', 'check_FOO']
+        return [n for i in range(20) for n in names]
+
+    def test_standard_tables_are_read_only(self):
+        def assign(table):
+            table['PROGRAMS'] = ('bogus',)
+        table = AmUniformNames.standard_primary_main_prefixes()
+        self.assertRaises(TypeError, assign, table)
+        self.assertRaises(TypeError, assign,
+                          AmUniformNames._std_forbid_tables()[0])
+        self.assertEqual(AmUniformNames.standard_primary_main_prefixes(
+                         'PROGRAMS')[0], 'bin')
+
+    def test_decompose_names_workers(self):
+        names = self._names()
+        kw = { 'primary_names' : ['FOO'], 'main_prefixes' : ['plugin'],
+               'add_prefixes' : ['geez'] }
+        expected = []
+        for name in names:
+            try:
+                expected.append(AmUniformNames.decompose_name(name, **kw))
+            except ValueError:
+                expected.append(None)
+        result = AmUniformNames.decompose_names(names, workers = 2,
+                                                ignore_errors = True, **kw)
+        self.assertEqual(self.pools, [2])
+        self.assertEqual(result, expected)
+        self.assertEqual(AmUniformNames.decompose_names(names, **dict(kw,
+                         ignore_errors = True)), expected)
+
+    def test_decompose_names_workers_first_error(self):
+        names = self._names()
+        try:
+            AmUniformNames.decompose_names(names, workers = 2)
+        except ValueError as e:
+            message = str(e)
+        self.assertEqual(self.pools, [2])
+        self.assertIn('geez_plugin_FOO', message)
+        self.assertEqual(AmUniformNames.decompose_names(['data_DATA'] * 20,
+                         workers = 2), [([], 'data', 'DATA')] * 20)
+
+    def test_ensure_names_sanity_workers(self):
+        names = self._names()
+        kw = { 'primary_names' : ['FOO'], 'main_prefixes' : ['plugin'],
+               'add_prefixes' : ['geez'],
+               'primary_main_prefixes' : { 'FOO' : ['plugin', 'check'] },
+               'forbid_primary_add_prefixes' : { 'FOO' : ['nobase'] } }
+        expected = []
+        for name in names:
+            try:
+                expected.append(AmUniformNames.ensure_name_sanity(name, **kw))
+            except ValueError:
+                expected.append(False)
+        result = AmUniformNames.ensure_names_sanity(names, workers = 2,
+                                                    ignore_errors = True,
+                                                    **kw)
+        self.assertEqual(self.pools, [2])
+        self.assertEqual(result, expected)
+        self.assertIn(True, result)
+        self.assertIn(False, result)
+
+    def test_pack_batch_args(self):
+        args = (['FOO'], None, ('geez',), { 'FOO' : ['plugin'] }, None, None,
+                None, True, False, True, True, True, True, True)
+        packed = AmUniformNames._pack_batch_args(args)
+        self.assertEqual(packed[:4], (('FOO',), None, ('geez',),
+                                      (('FOO', ('plugin',)),)))
+        unpacked = AmUniformNames._unpack_batch_args('sanity', packed)
+        self.assertEqual(unpacked[3], { 'FOO' : ('plugin',) })
+        prepared = AmUniformNames._prepare_batch_args('sanity', unpacked)
+        self.assertIn('PROGRAMS', prepared[0])
+        self.assertIn('FOO', prepared[0])
+        self.assertEqual(prepared[1], None)
+        self.assertTrue(set(['geez', 'nobase']) <= prepared[2])
+        self.assertEqual(prepared[7:10], (False, False, False))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
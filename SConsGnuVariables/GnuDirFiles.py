@@ -0,0 +1,328 @@
+"""SConsGnuVariables.GnuDirFiles
+
+Generation of files that carry GNU directory values to other tools.
+
+Three kinds of files are supported:
+
+    - C header with ``#define BINDIR "/usr/local/bin"`` and alike
+      (`render_config_header()`),
+    - pkg-config ``.pc`` file (`render_pkg_config()`),
+    - shell fragment with ``bindir='/usr/local/bin'`` and alike, to be
+      sourced by scripts (`render_shell()`).
+
+The files are rendered from resolved directories (see
+`GnuDirVariables.ResolveVariables()
+<SConsGnuVariables.GnuDirVariables.ResolveVariables>`) and written with
+`write_if_changed()`, which leaves the file (and its timestamp) untouched if
+its content would not change. The files may thus be regenerated each time
+the ``SConstruct`` is read, and the targets depending on them are rebuilt
+only when the directories actually change.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import GnuDirFiles
+    overrides = {'prefix' : ARGUMENTS.get('prefix', '/usr/local'),
+                 'package' : 'foo'}
+    GnuDirFiles.WriteConfigHeader('src/dirs.h', overrides,
+                                  names = ['bindir', 'pkgdatadir'])
+    GnuDirFiles.WriteShellFragment('scripts/dirs.sh', overrides)
+    GnuDirFiles.WritePkgConfig('foo.pc', { 'Name' : 'foo',
+                                           'Description' : 'The foo library',
+                                           'Version' : '1.0',
+                                           'Libs' : '-L${libdir} -lfoo' },
+                               overrides)
+
+or, with the directories taken from SCons environment (see
+`GnuDirVariables.AddToSConsEnvironment()
+<SConsGnuVariables.GnuDirVariables.AddToSConsEnvironment>`):
+
+.. python::
+
+    GnuDirFiles.WriteConfigHeader('src/dirs.h', env = env)
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import hashlib
+
+from SConsGnuVariables import GnuDirVariables
+
+_header_comment = 'Generated by SConsGnuVariables, do not edit.'
+
+# Variables written to ``.pc`` files by default.
+_pkg_config_variables = ('prefix', 'exec_prefix', 'libdir', 'includedir')
+
+# Fields of ``.pc`` files, in the order they are written.
+_pkg_config_fields = ('Name', 'Description', 'URL', 'Version', 'Requires',
+                      'Requires.private', 'Conflicts', 'Cflags', 'Libs',
+                      'Libs.private')
+_pkg_config_required = ('Name', 'Description', 'Version')
+
+#############################################################################
+def _shell_string(value):
+    """Return ``value`` quoted for POSIX shell."""
+    return "'%s'" % value.replace("'", "'\\''")
+
+#############################################################################
+def _selected_names(dirs, names):
+    if names is None:
+        names = [n for n in GnuDirVariables.SupportedVariables() if n in dirs]
+    return names
+
+#############################################################################
+def render_config_header(dirs, names=None, macro_prefix='', guard=None):
+    """Render C header defining GNU directories as string macros.
+
+    **Example**:
+
+        >>> from SConsGnuVariables.GnuDirFiles import render_config_header
+        >>> print(render_config_header({'bindir' : '/usr/bin'}))
+        /* Generated by SConsGnuVariables, do not edit. */
+        #define BINDIR "/usr/bin"
+        <BLANKLINE>
+
+    :Parameters:
+        dirs : dict
+            resolved directories ``{ name : value }``
+        names : sequence | None
+            variables to define, all from ``dirs`` by default
+        macro_prefix : str
+            prefix of the macro names (e.g. ``'FOO_'`` for ``FOO_BINDIR``)
+        guard : str | None
+            name of the include guard macro, no guard if ``None``
+    :Returns:
+        the content of the header
+    """
+    lines = ['/* %s */' % _header_comment]
+    if guard:
+        lines += ['#ifndef %s' % guard, '#define %s' % guard]
+    c_string = GnuDirVariables._c_string
+    for name in _selected_names(dirs, names):
+        lines.append('#define %s%s %s' % (macro_prefix, name.upper(),
+                                          c_string(dirs[name])))
+    if guard:
+        lines.append('#endif /* %s */' % guard)
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def render_shell(dirs, names=None, export=False):
+    """Render shell fragment assigning GNU directories to shell variables.
+
+    :Parameters:
+        dirs : dict
+            resolved directories ``{ name : value }``
+        names : sequence | None
+            variables to assign, all from ``dirs`` by default
+        export : boolean
+            if ``True``, the variables are exported
+    :Returns:
+        the content of the fragment
+    """
+    lines = ['# %s' % _header_comment]
+    names = _selected_names(dirs, names)
+    for name in names:
+        lines.append('%s=%s' % (name, _shell_string(dirs[name])))
+    if export and names:
+        lines.append('export %s' % ' '.join(names))
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def render_pkg_config(dirs, fields, variables=None):
+    """Render pkg-config ``.pc`` file.
+
+    The GNU directories are written as ``.pc`` variables. Each variable is
+    expressed relative to the preceding one it lies under (e.g. ``libdir`` as
+    ``${exec_prefix}/lib``), so the file remains relocatable with
+    ``pkg-config --define-prefix``.
+
+    :Parameters:
+        dirs : dict
+            resolved directories ``{ name : value }``
+        fields : dict
+            ``.pc`` fields (``Name``, ``Description``, ``Version``, ``Libs``,
+            ...), the first three are required; values are written verbatim
+            so they may refer to the variables (``-L${libdir}``)
+        variables : sequence | None
+            GNU directories written as variables, by default ``prefix``,
+            ``exec_prefix``, ``libdir`` and ``includedir``
+    :Returns:
+        the content of the file
+    """
+    missing = [f for f in _pkg_config_required if not fields.get(f)]
+    if missing:
+        raise ValueError("missing pkg-config fields: %s" % ', '.join(missing))
+    unknown = sorted(set(fields) - set(_pkg_config_fields))
+    if unknown:
+        raise ValueError("unknown pkg-config fields: %s" % ', '.join(unknown))
+    if variables is None:
+        variables = _pkg_config_variables
+    templates = GnuDirVariables._compiled_templates()
+    lines = ['# %s' % _header_comment]
+    written = []
+    for name in variables:
+        value = dirs[name]
+        # prefer the longest base; on ties, the one the default refers to
+        refs = GnuDirVariables._template_dependencies(templates.get(name, ()))
+        base = None
+        for other, other_value in written:
+            if value != other_value and \
+               not value.startswith(other_value.rstrip('/') + '/'):
+                continue
+            rank = (len(other_value), other in refs)
+            if base is None or rank > base[2]:
+                base = (other, other_value, rank)
+        if base is None:
+            escaped = value.replace('$', '$$')
+        else:
+            escaped = '${%s}%s' % (base[0],
+                                   value[len(base[1]):].replace('$', '$$'))
+        lines.append('%s=%s' % (name, escaped))
+        written.append((name, value))
+    lines.append('')
+    for field in _pkg_config_fields:
+        if fields.get(field):
+            lines.append('%s: %s' % (field, fields[field]))
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def write_if_changed(path, content):
+    """Write ``content`` to file ``path`` unless it already has it.
+
+    The existing file is compared by size and content hash; if they match,
+    the file is not touched at all (so its timestamp is preserved). Otherwise
+    the content is written to a temporary file in same directory, which then
+    atomically replaces ``path``, so readers never see a partial file.
+
+    :Parameters:
+        path : str
+            the file to write
+        content : str | bytes
+            new content of the file, strings are encoded as UTF-8
+    :Returns:
+        ``True`` if the file was written, ``False`` if it was up to date
+    """
+    import tempfile
+    if not isinstance(content, bytes):
+        content = content.encode('utf-8')
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    if st is not None and st.st_size == len(content):
+        with open(path, 'rb') as f:
+            old = hashlib.sha1(f.read()).digest()
+        if old == hashlib.sha1(content).digest():
+            return False
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir = dirname,
+                               prefix = '.%s.' % os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        if st is not None:
+            os.chmod(tmp, st.st_mode & 0o7777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+    return True
+
+#############################################################################
+def _resolve(overrides, env):
+    if overrides is None and env is not None:
+        overrides = GnuDirVariables._environment_overrides(env)
+    return GnuDirVariables.ResolveVariables(overrides)
+
+#############################################################################
+def WriteConfigHeader(path, overrides=None, env=None, **kw):
+    """Write C header with GNU directories if it changed.
+
+    :Parameters:
+        path : str
+            the header file
+        overrides : dict | None
+            see `GnuDirVariables.ResolveVariables()
+            <SConsGnuVariables.GnuDirVariables.ResolveVariables>`
+        env
+            SCons environment; if given and ``overrides`` is ``None``, the
+            values of GNU directory variables defined in ``env`` (e.g. set
+            with ``prefix=...`` on command line, see
+            `GnuDirVariables.AddToSConsEnvironment()
+            <SConsGnuVariables.GnuDirVariables.AddToSConsEnvironment>`) are
+            used
+    :Keywords:
+        names, macro_prefix, guard
+            see `render_config_header()`
+    :Returns:
+        ``True`` if the file was written, see `write_if_changed()`
+    """
+    dirs = _resolve(overrides, env)
+    return write_if_changed(path, render_config_header(dirs, **kw))
+
+#############################################################################
+def WriteShellFragment(path, overrides=None, env=None, **kw):
+    """Write shell fragment with GNU directories if it changed.
+
+    :Parameters:
+        overrides, env
+            see `WriteConfigHeader()`
+    :Keywords:
+        names, export
+            see `render_shell()`
+    :Returns:
+        ``True`` if the file was written, see `write_if_changed()`
+    """
+    dirs = _resolve(overrides, env)
+    return write_if_changed(path, render_shell(dirs, **kw))
+
+#############################################################################
+def WritePkgConfig(path, fields, overrides=None, env=None, **kw):
+    """Write pkg-config file if it changed.
+
+    :Parameters:
+        fields
+            see `render_pkg_config()`
+        overrides, env
+            see `WriteConfigHeader()`
+    :Keywords:
+        variables
+            see `render_pkg_config()`
+    :Returns:
+        ``True`` if the file was written, see `write_if_changed()`
+    """
+    dirs = _resolve(overrides, env)
+    return write_if_changed(path, render_pkg_config(dirs, fields, **kw))
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
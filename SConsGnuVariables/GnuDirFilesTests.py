@@ -0,0 +1,170 @@
+""" SConsGnuVariables.GnuDirFilesTests
+
+Unit tests for SConsGnuVariables.GnuDirFiles
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from SConsGnuVariables import GnuDirFiles
+from SConsGnuVariables import GnuDirVariables
+
+_fields = { 'Name' : 'foo', 'Description' : 'The foo library',
+            'Version' : '1.0', 'Libs' : '-L${libdir} -lfoo' }
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.top = tempfile.mkdtemp()
+        self.path = os.path.join(self.top, 'dirs.h')
+
+    def tearDown(self):
+        shutil.rmtree(self.top)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_write_if_changed_keeps_unchanged_file(self):
+        self.assertTrue(GnuDirFiles.write_if_changed(self.path, 'one\n'))
+        os.utime(self.path, (1000000000, 1000000000))
+        inode = os.stat(self.path).st_ino
+        self.assertFalse(GnuDirFiles.write_if_changed(self.path, b'one\n'))
+        st = os.stat(self.path)
+        self.assertEqual((st.st_mtime, st.st_ino), (1000000000, inode))
+
+    def test_write_if_changed_replaces_file(self):
+        GnuDirFiles.write_if_changed(self.path, 'one\n')
+        os.chmod(self.path, 0o640)
+        os.utime(self.path, (1000000000, 1000000000))
+        reader = open(self.path)
+        try:
+            # same size, different content
+            self.assertTrue(GnuDirFiles.write_if_changed(self.path, 'two\n'))
+            # the file is replaced, not rewritten in place
+            self.assertEqual(reader.read(), 'one\n')
+        finally:
+            reader.close()
+        st = os.stat(self.path)
+        self.assertNotEqual(st.st_mtime, 1000000000)
+        self.assertEqual(stat.S_IMODE(st.st_mode), 0o640)
+        self.assertEqual(self._read(self.path), 'two\n')
+        self.assertEqual(os.listdir(self.top), ['dirs.h'])
+
+    def test_render_config_header(self):
+        header = GnuDirFiles.render_config_header({ 'bindir' : '/a "b"',
+                                                    'libdir' : '/lib' },
+                                                  names = ['bindir'],
+                                                  macro_prefix = 'X_',
+                                                  guard = 'DIRS_H')
+        self.assertEqual(header.splitlines()[1:], [
+            '#ifndef DIRS_H', '#define DIRS_H',
+            '#define X_BINDIR "/a \\"b\\""', '#endif /* DIRS_H */' ])
+
+    def test_render_shell(self):
+        fragment = GnuDirFiles.render_shell({ 'bindir' : "/it's",
+                                              'libdir' : '/lib' },
+                                            export = True)
+        self.assertEqual(fragment.splitlines()[1:], [
+            "bindir='/it'\\''s'", "libdir='/lib'", 'export bindir libdir' ])
+
+    def test_render_pkg_config_rebases(self):
+        dirs = GnuDirVariables.ResolveVariables({ 'prefix' : '/opt/a$$b',
+                                                  'package' : 'foo',
+                                                  'libdir' : '/usr/lib64' })
+        content = GnuDirFiles.render_pkg_config(dirs, _fields,
+            ['prefix', 'exec_prefix', 'libdir', 'includedir',
+             'pkgincludedir'])
+        self.assertEqual(content.splitlines()[1:], [
+            'prefix=/opt/a$$b',
+            'exec_prefix=${prefix}',
+            'libdir=/usr/lib64',
+            'includedir=${prefix}/include',
+            'pkgincludedir=${includedir}/foo',
+            '',
+            'Name: foo',
+            'Description: The foo library',
+            'Version: 1.0',
+            'Libs: -L${libdir} -lfoo' ])
+
+    def test_render_pkg_config_fields(self):
+        dirs = GnuDirVariables.ResolveVariables()
+        self.assertRaises(ValueError, GnuDirFiles.render_pkg_config, dirs,
+                          { 'Name' : 'foo' })
+        self.assertRaises(ValueError, GnuDirFiles.render_pkg_config, dirs,
+                          dict(_fields, Bogus = 'x'))
+
+    def test_write_functions(self):
+        overrides = { 'prefix' : '/usr' }
+        self.assertTrue(GnuDirFiles.WriteConfigHeader(self.path, overrides,
+                                                      names = ['bindir']))
+        self.assertFalse(GnuDirFiles.WriteConfigHeader(self.path, overrides,
+                                                       names = ['bindir']))
+        self.assertIn('#define BINDIR "/usr/bin"', self._read(self.path))
+        path = os.path.join(self.top, 'dirs.sh')
+        GnuDirFiles.WriteShellFragment(path, overrides, names = ['libdir'])
+        self.assertIn("libdir='/usr/lib'", self._read(path))
+        path = os.path.join(self.top, 'foo.pc')
+        GnuDirFiles.WritePkgConfig(path, _fields, overrides)
+        self.assertIn('prefix=/usr\n', self._read(path))
+
+    def test_write_functions_with_environment(self):
+        try:
+            import SCons.Environment
+        except ImportError:
+            self.skipTest('SCons is not available')
+        env = SCons.Environment.Environment(tools = [])
+        GnuDirVariables.AddToSConsEnvironment(env)
+        env['ROOT'] = '/opt/x'
+        env['prefix'] = '${ROOT}/usr'
+        GnuDirFiles.WriteConfigHeader(self.path, env = env,
+                                      names = ['bindir'])
+        self.assertIn('#define BINDIR "/opt/x/usr/bin"',
+                      self._read(self.path))
+        path = os.path.join(self.top, 'dirs.sh')
+        GnuDirFiles.WriteShellFragment(path, env = env, names = ['libdir'])
+        self.assertIn("libdir='/opt/x/usr/lib'", self._read(path))
+        path = os.path.join(self.top, 'foo.pc')
+        GnuDirFiles.WritePkgConfig(path, _fields, env = env)
+        self.assertIn('prefix=/opt/x/usr\n', self._read(path))
+        # explicit overrides win
+        GnuDirFiles.WriteShellFragment(path, { 'prefix' : '/usr' }, env,
+                                       names = ['libdir'])
+        self.assertIn("libdir='/usr/lib'", self._read(path))
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,208 @@
+"""SConsGnuVariables.GnuDirTrie
+
+Reverse lookup of installed paths to GNU directory variables.
+
+Given resolved GNU directories (see `GnuDirVariables.ResolveVariables()
+<SConsGnuVariables.GnuDirVariables.ResolveVariables>`), a `DirectoryTrie`
+answers the question "which is the most specific GNU directory containing
+this path?" (e.g. ``/usr/local/include/foo/bar.h`` belongs to
+``pkgincludedir`` if ``package`` is ``foo``). The directories are stored in a
+trie of path components, so the lookup takes time proportional to the depth
+of the path, regardless of the number of directories. Whole manifests may be
+classified in one streaming pass with `DirectoryTrie.classify()`.
+
+Several variables may resolve to same directory (e.g. ``datarootdir`` and
+``datadir`` by default). Such ties are resolved in favor of variables which
+are not plain aliases of other variables (``datadir`` defaults to
+``${datarootdir}``, so ``datarootdir`` wins), then by the order of
+`GnuDirVariables.SupportedVariables()
+<SConsGnuVariables.GnuDirVariables.SupportedVariables>`. The ``priority``
+argument may be used to prefer other variables.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import GnuDirTrie
+    trie = GnuDirTrie.BuildDirectoryTrie({'prefix' : '/usr',
+                                          'package' : 'foo'})
+    trie.lookup('/usr/include/foo/bar.h')   # ('pkgincludedir', 'bar.h')
+    for path, name, rel in trie.classify(open('manifest.txt')):
+        ...
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import posixpath
+
+from SConsGnuVariables import GnuDirVariables
+
+# Key under which trie nodes keep the name of the variable that ends there.
+# Path components are strings, so they never collide with it.
+_TERMINAL = None
+
+#############################################################################
+def _components(path):
+    return [c for c in path.split('/') if c and c != '.']
+
+#############################################################################
+class DirectoryTrie(object):
+    """Trie of path components mapping directories to variable names.
+
+    :Ivariables:
+        directories : dict
+            the ``{ name : directory }`` dictionary the trie was built from
+    """
+
+    def __init__(self, directories, priority=None, overrides=None):
+        """Build trie from ``directories``.
+
+        :Parameters:
+            directories : dict
+                dictionary ``{ name : directory }``, e.g. as returned by
+                `GnuDirVariables.ResolveVariables()
+                <SConsGnuVariables.GnuDirVariables.ResolveVariables>`;
+                empty and relative directories are ignored
+            priority : sequence | None
+                names of variables that win ties (when several variables
+                have same directory), in order of preference
+            overrides : dict | None
+                overrides the ``directories`` were resolved with, used to
+                recognize aliases when breaking ties
+        """
+        self.directories = directories
+        self._root = {}
+        ranks = self._ranks(priority, overrides)
+        owners = {}
+        for name, directory in directories.items():
+            if not directory or not directory.startswith('/'):
+                continue
+            path = posixpath.normpath(directory)
+            rank = ranks.get(name, (3, 0, name))
+            if path in owners and owners[path][0] <= rank:
+                continue
+            owners[path] = (rank, name)
+        for path, (rank, name) in owners.items():
+            node = self._root
+            for component in _components(path):
+                node = node.setdefault(component, {})
+            node[_TERMINAL] = name
+
+    @staticmethod
+    def _ranks(priority, overrides):
+        """Return ``{ name : rank }``, lower ranks win ties."""
+        compiled = GnuDirVariables._effective_templates(overrides)
+        ranks = {}
+        for index, name in enumerate(GnuDirVariables.SupportedVariables()):
+            parts = compiled.get(name, ())
+            alias = len(parts) == 1 and isinstance(parts[0], tuple)
+            ranks[name] = (2 if alias else 1, index, name)
+        if priority:
+            for index, name in enumerate(priority):
+                ranks[name] = (0, index, name)
+        return ranks
+
+    def lookup(self, path, normalize=True):
+        """Find the most specific directory containing ``path``.
+
+        :Parameters:
+            path : str
+                absolute path of a file or directory
+            normalize : boolean
+                if ``True`` (default), ``path`` is normalized first (``..``
+                are resolved); pass ``False`` for already normalized paths
+        :Returns:
+            tuple ``(name, relpath)``, where ``name`` is the name of variable
+            and ``relpath`` is the part of ``path`` relative to the
+            variable's directory (empty string if ``path`` is the directory
+            itself); ``(None, path)`` if no directory contains ``path``
+        """
+        if normalize:
+            path = posixpath.normpath(path)
+        components = _components(path)
+        node = self._root
+        best = node.get(_TERMINAL)
+        depth = 0
+        for index, component in enumerate(components):
+            node = node.get(component)
+            if node is None:
+                break
+            name = node.get(_TERMINAL)
+            if name is not None:
+                best = name
+                depth = index + 1
+        if best is None:
+            return None, path
+        return best, '/'.join(components[depth:])
+
+    def classify(self, paths, normalize=True):
+        """Classify stream of paths.
+
+        This is a generator, so arbitrarily long manifests may be processed
+        in constant memory. Trailing newlines are stripped from ``paths``,
+        so an open manifest file may be passed directly.
+
+        :Parameters:
+            paths : iterable
+                paths to classify
+            normalize : boolean
+                see `lookup()`
+        :Returns:
+            generator of ``(path, name, relpath)`` tuples, see `lookup()`
+        """
+        lookup = self.lookup
+        for path in paths:
+            path = path.rstrip('\n')
+            if not path:
+                continue
+            name, rel = lookup(path, normalize)
+            yield path, name, rel
+
+#############################################################################
+def BuildDirectoryTrie(overrides=None, priority=None, **kw):
+    """Build `DirectoryTrie` from GNU directories resolved for
+    ``overrides``.
+
+    :Parameters:
+        overrides : dict | None
+            see `GnuDirVariables.ResolveVariables()
+            <SConsGnuVariables.GnuDirVariables.ResolveVariables>`
+        priority : sequence | None
+            see `DirectoryTrie.__init__()`
+    :Keywords:
+        only, exclude
+            see `GnuDirVariables.ResolveVariables()
+            <SConsGnuVariables.GnuDirVariables.ResolveVariables>`
+    """
+    resolved = GnuDirVariables.ResolveVariables(overrides, **kw)
+    directories = dict((name, resolved[name])
+                       for name in GnuDirVariables.DirectoryVariables()
+                       if name in resolved)
+    return DirectoryTrie(directories, priority, overrides)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
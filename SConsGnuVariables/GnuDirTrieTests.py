@@ -0,0 +1,81 @@
+""" SConsGnuVariables.GnuDirTrieTests
+
+Unit tests for SConsGnuVariables.GnuDirTrie
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import unittest
+
+from SConsGnuVariables import GnuDirTrie
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.trie = GnuDirTrie.BuildDirectoryTrie({ 'prefix' : '/usr',
+                                                    'package' : 'foo' })
+
+    def test_lookup_most_specific(self):
+        lookup = self.trie.lookup
+        self.assertEqual(lookup('/usr/include/foo/bar.h'),
+                         ('pkgincludedir', 'bar.h'))
+        self.assertEqual(lookup('/usr/include/bar.h'),
+                         ('includedir', 'bar.h'))
+        self.assertEqual(lookup('/usr/lib/foo/sub/x.so'),
+                         ('pkglibdir', 'sub/x.so'))
+        self.assertEqual(lookup('/usr/etc'), ('sysconfdir', ''))
+
+    def test_lookup_prefers_non_aliases(self):
+        # datadir defaults to ${datarootdir}
+        self.assertEqual(self.trie.lookup('/usr/share/x'),
+                         ('datarootdir', 'x'))
+
+    def test_lookup_priority(self):
+        trie = GnuDirTrie.BuildDirectoryTrie({ 'prefix' : '/usr' },
+                                             priority = ['datadir'])
+        self.assertEqual(trie.lookup('/usr/share/x'), ('datadir', 'x'))
+
+    def test_lookup_normalizes(self):
+        self.assertEqual(self.trie.lookup('/usr/bin/../include//a.h'),
+                         ('includedir', 'a.h'))
+
+    def test_lookup_outside(self):
+        self.assertEqual(self.trie.lookup('/opt/a'), (None, '/opt/a'))
+
+    def test_classify(self):
+        lines = ['/usr/bin/foo\n', '\n', '/opt/x\n']
+        self.assertEqual(list(self.trie.classify(lines)),
+                         [('/usr/bin/foo', 'bindir', 'foo'),
+                          ('/opt/x', None, '/opt/x')])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -109,9 +109,16 @@ Supported variables:
 
 __docformat__ = 'restructuredText'
 
-from os import path
+import re
+import posixpath
 
-_variable_templates = [
+try:
+    from types import MappingProxyType as _frozendict
+except ImportError:
+    # Python 2 has no public read-only dictionary view
+    from SConsGnuVariables.AmUniformNames import _frozendict
+
+_variable_templates = (
   ( 'prefix', 
     'Installation prefix', 
     '/usr/local' ),
@@ -204,12 +211,33 @@ _variable_templates = [
   ( 'pkglibexecdir',
     'The directory for installing executable programs to be run by other'
   + ' programs rather than by users.',
-    '${libexecdir}/${package}' )
-]
-
-for sec in map(lambda x : str(x), range(0,10)) + ['l', 'n']:
-    _variable_templates.append( ('man%sdir' % sec, '', '${prefix}/man/man%s' %sec) )
-    _variable_templates.append( ('man%sext' % sec, '', '.%s' %sec) )
+    '${libexecdir}/${package}' ),
+# man section directories and extensions
+  ( 'man0dir', '', '${prefix}/man/man0' ),
+  ( 'man0ext', '', '.0' ),
+  ( 'man1dir', '', '${prefix}/man/man1' ),
+  ( 'man1ext', '', '.1' ),
+  ( 'man2dir', '', '${prefix}/man/man2' ),
+  ( 'man2ext', '', '.2' ),
+  ( 'man3dir', '', '${prefix}/man/man3' ),
+  ( 'man3ext', '', '.3' ),
+  ( 'man4dir', '', '${prefix}/man/man4' ),
+  ( 'man4ext', '', '.4' ),
+  ( 'man5dir', '', '${prefix}/man/man5' ),
+  ( 'man5ext', '', '.5' ),
+  ( 'man6dir', '', '${prefix}/man/man6' ),
+  ( 'man6ext', '', '.6' ),
+  ( 'man7dir', '', '${prefix}/man/man7' ),
+  ( 'man7ext', '', '.7' ),
+  ( 'man8dir', '', '${prefix}/man/man8' ),
+  ( 'man8ext', '', '.8' ),
+  ( 'man9dir', '', '${prefix}/man/man9' ),
+  ( 'man9ext', '', '.9' ),
+  ( 'manldir', '', '${prefix}/man/manl' ),
+  ( 'manlext', '', '.l' ),
+  ( 'manndir', '', '${prefix}/man/mann' ),
+  ( 'mannext', '', '.n' )
+)
 
 def _process_variable_templates(callback, **kw):
     """Feed all predefined GNU variables to callback.
@@ -227,26 +255,32 @@ def _process_variable_templates(callback, **kw):
         exclude : list
             list of variable names to exclude from processing
     """
-    from SCons.Util import is_List
-    try:
-      only = kw['only']
-      if not is_List(only): only = [ only ]
-    except KeyError:
-      only = None
+    for dvt in _selected_templates(**kw):
+        name, desc, default = dvt
+        callback(name, desc, default)
 
-    try:
-      exclude = kw['exclude']
-      if not is_List(exclude): exclude = [ exclude ]
-    except KeyError:
-      exclude = None
+def _name_set(names):
+    """Convert single name or a sequence of names to frozenset."""
+    if names is None:
+        return None
+    if isinstance(names, str):
+        return frozenset([names])
+    return frozenset(names)
 
+def _selected_templates(**kw):
+    """Return list of templates selected by ``only`` and ``exclude`` keywords
+    (see `_process_variable_templates()`)."""
+    only = _name_set(kw.get('only'))
+    exclude = _name_set(kw.get('exclude'))
+    if only is None and exclude is None:
+        return _variable_templates
+    selected = []
     for dvt in _variable_templates:
-        may_process = True
-        name, desc, default = dvt
-        if (only is not None) and (name not in only):   may_process = False
-        if (exclude is not None) and (name in exclude): may_process = False
-        if may_process:
-          callback(name, desc, default)
+        name = dvt[0]
+        if (only is not None) and (name not in only):   continue
+        if (exclude is not None) and (name in exclude): continue
+        selected.append(dvt)
+    return selected
 
 def AddToSConsVariables(variables, **kw):
     """Add GNU directory variables to SCons command line variables.
@@ -332,7 +366,6 @@ def AddToSConsOptions(**kw):
     """
     from SCons.Script.Main import AddOption
     def _add_option(name, desc, default):
-        import re
         AddOption('--%s' % re.sub('_','-',name), dest=name, type='string', 
                   nargs=1, action='store', metavar='DIR', help=desc,
                   default=default) 
@@ -341,8 +374,8 @@ def AddToSConsOptions(**kw):
 def AddToSConsEnvironment(env, **kw):
     """Add GNU directory variables to SCons construction variables.
      
-    This function calls ``env.SetDefault(name = default)`` for each processed
-    GNU directory variable, where ``name`` is name of the variable and 
+    This function calls ``env.SetDefault(**{name : default})`` for each
+    processed GNU directory variable, where ``name`` is name of the variable and 
     ``default`` is its default value.
 
     :Parameters:
@@ -368,7 +401,7 @@ def AddToSConsEnvironment(env, **kw):
         exec_prefix2 = env['exec_prefix']
     """
     def _add_variable(name, desc, default):
-        env.SetDefault(name = default)
+        env.SetDefault(**{name : default})
     _process_variable_templates(_add_variable, **kw)
 
 
@@ -396,10 +429,901 @@ def AsSConsVariables(files = [], args = {}, is_global = 1, **kw):
 
 def SupportedVariables():
     """Return the names of supported GNU dir variables"""
-    variables = []
-    for v in  _variable_templates:
-        variables.append(v[0])
-    return variables
+    return [v[0] for v in _variable_templates]
+
+def DirectoryVariables():
+    """Return the names of supported GNU dir variables that denote
+    directories (i.e. all but ``man1ext`` .. ``man8ext`` and alike)"""
+    return [v[0] for v in _variable_templates if not _is_extension(v[0])]
+
+def _is_extension(name):
+    return name.startswith('man') and name.endswith('ext')
+
+#############################################################################
+# Resolution of directory variables without SCons
+#############################################################################
+
+_reference_re = re.compile(r'\$(?:(\$)|\{(\w+)\}|(\w+))')
+
+# Parsed templates, see `_compiled_templates()`.
+_compiled_templates_cache = None
+
+# Results of `ResolveVariables()`, keyed by configuration.
+_resolve_cache = {}
+_resolve_cache_max = 256
+_resolve_cache_stats = [0, 0]       # hits, misses
+
+def _compile_template(template):
+    """Split template string into a tuple of parts.
+
+    Each part is either a literal string or a 1-tuple ``(name,)`` referring
+    to a variable. The ``$$`` sequence denotes literal ``$``. References to
+    variables are written as ``${name}`` or ``$name``.
+    """
+    parts = []
+    pos = 0
+    for match in _reference_re.finditer(template):
+        if match.start() > pos:
+            parts.append(template[pos:match.start()])
+        dollar, braced, plain = match.groups()
+        if dollar:
+            parts.append('$')
+        else:
+            parts.append((braced or plain,))
+        pos = match.end()
+    if pos < len(template):
+        parts.append(template[pos:])
+    return tuple(parts)
+
+def _compiled_templates():
+    """Return dictionary mapping variable names to their compiled default
+    values (see `_compile_template()`).
+
+    The dictionary is built on first use and cached.
+    """
+    global _compiled_templates_cache
+    if _compiled_templates_cache is None:
+        _compiled_templates_cache = dict((name, _compile_template(default))
+                                   for name, desc, default in _variable_templates)
+    return _compiled_templates_cache
+
+def _effective_templates(overrides):
+    """Return compiled templates with ``overrides`` applied."""
+    compiled = _compiled_templates()
+    if overrides:
+        compiled = compiled.copy()
+        for name, value in overrides.items():
+            compiled[name] = _compile_template(value)
+    return compiled
+
+def _template_dependencies(parts):
+    """Return names of variables referred to by compiled template."""
+    return [p[0] for p in parts if isinstance(p, tuple)]
+
+def _resolve(compiled, names):
+    """Resolve variables ``names`` given ``compiled`` templates.
+
+    :Parameters:
+        compiled : dict
+            compiled templates for all known variables, keyed by name
+        names : sequence
+            names of the variables to resolve
+    :Returns:
+        dictionary with resolved values of all ``names`` (and the variables
+        they depend on); undefined variables expand to empty string, as in
+        ``env.subst()``
+    """
+    resolved = {}
+    active = set()
+    def resolve(name):
+        try:
+            return resolved[name]
+        except KeyError:
+            pass
+        try:
+            parts = compiled[name]
+        except KeyError:
+            return ''
+        if name in active:
+            raise ValueError("circular reference to variable %r" % name)
+        active.add(name)
+        value = ''.join(p if not isinstance(p, tuple) else resolve(p[0])
+                        for p in parts)
+        active.discard(name)
+        resolved[name] = value
+        return value
+    for name in names:
+        resolve(name)
+    return resolved
+
+def _config_key(overrides, **kw):
+    """Return hashable key identifying configuration."""
+    if overrides:
+        okey = tuple(sorted(overrides.items()))
+    else:
+        okey = ()
+    only = _name_set(kw.get('only'))
+    exclude = _name_set(kw.get('exclude'))
+    return (okey,
+            None if only is None else tuple(sorted(only)),
+            None if exclude is None else tuple(sorted(exclude)))
+
+def ResolveVariables(overrides=None, **kw):
+    """Resolve GNU directory variables without SCons.
+
+    The default values of the GNU directory variables (e.g.
+    ``${exec_prefix}/bin`` for ``bindir``) are expanded in same way as
+    ``env.subst()`` would do it, after replacing some of them with
+    ``overrides``. Results are cached per configuration, so repeated calls
+    with same arguments are cheap. The returned dictionary is shared between
+    such calls, so it's a read-only view (``types.MappingProxyType``); use
+    ``dict(result)`` to get a modifiable copy.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import GnuDirVariables
+        dirs = GnuDirVariables.ResolveVariables({'prefix' : '/usr'})
+        print dirs['bindir']  # /usr/bin
+
+    :Parameters:
+        overrides : dict | None
+            values that replace defaults; they may also define variables
+            that have no defaults (e.g. ``package``) and they may refer to
+            other variables (e.g. ``{'libdir' : '${exec_prefix}/lib64'}``)
+    :Keywords:
+        only : list
+            list of variable names to resolve, others are not returned
+        exclude : list
+            list of variable names to exclude from result
+    :Returns:
+        dictionary ``{ name : value }`` for the selected GNU directory
+        variables
+    """
+    key = _config_key(overrides, **kw)
+    try:
+        result = _resolve_cache[key]
+        _resolve_cache_stats[0] += 1
+        return result
+    except KeyError:
+        _resolve_cache_stats[1] += 1
+    compiled = _effective_templates(overrides)
+    names = [t[0] for t in _selected_templates(**kw)]
+    resolved = _resolve(compiled, names)
+    result = _frozendict(dict((name, resolved[name]) for name in names))
+    if len(_resolve_cache) >= _resolve_cache_max:
+        _resolve_cache.clear()
+    _resolve_cache[key] = result
+    return result
+
+#############################################################################
+# Preprocessor definitions
+#############################################################################
+
+# Results of `CppDefines()`, keyed by configuration.
+_cppdefines_cache = {}
+_cppdefines_cache_stats = [0, 0]    # hits, misses
+
+_c_escapes = { '\\' : '\\\\', '"' : '\\"', '\n' : '\\n', '\t' : '\\t',
+               '?' : '\\?' }
+
+# Characters that must be backslash-escaped for POSIX shell, both within and
+# outside double quotes.
+_shell_escapes = { '\\' : '\\\\', '"' : '\\"' }
+
+# Characters special to POSIX shell outside double quotes only (they can't be
+# backslash-escaped for both cases), and to SCons substitution; they're
+# written as C octal escapes.
+_shell_specials = frozenset(" \t'();&|<>*?[]#~{}!$`")
+
+def _c_string(value):
+    """Return ``value`` as C string literal."""
+    return '"%s"' % ''.join(_c_escapes.get(c, c) for c in value)
+
+def _shell_c_string(value):
+    """Return ``value`` as C string literal escaped for the command line.
+
+    The result survives the POSIX shell, regardless of whether SCons puts it
+    in double quotes (which it does for arguments containing spaces) or not,
+    and SCons substitution: characters special outside double quotes
+    (spaces, ``'``, ``;``, ``&``, ``|``, ``<``, ``>``, parentheses, ...),
+    ``$`` and backquotes are written as C octal escapes (e.g. ``\\040``),
+    backslashes and double quotes are backslash-escaped.
+    """
+    literal = '"%s"' % ''.join(_c_escapes.get(c) or
+                               ('\\%03o' % ord(c) if c in _shell_specials
+                                else c) for c in value)
+    return ''.join(_shell_escapes.get(c, c) for c in literal)
+
+def _environment_value(env, name):
+    """Return value of construction variable ``name`` substituted by
+    ``env.subst()``, as template of literal text (``$`` doubled)."""
+    return env.subst('${%s}' % name).replace('$', '$$')
+
+def _environment_overrides(env):
+    """Return values of GNU directory variables (and variables they refer
+    to, e.g. ``package``) defined in SCons environment ``env``.
+
+    The values are raw templates, so they're resolved (and cached) in same
+    way as the defaults. Values using substitution features other than plain
+    references to variables, and other construction variables referred to
+    (e.g. ``ROOT`` in ``${ROOT}/usr``), are substituted by ``env.subst()``
+    instead, so the result is same as ``env.subst()`` would give.
+    """
+    names = set(SupportedVariables())
+    for parts in _compiled_templates().values():
+        names.update(_template_dependencies(parts))
+    overrides = {}
+    foreign = set()
+    for name in names:
+        if name not in env:
+            continue
+        value = env[name]
+        if not isinstance(value, str) or \
+           '$' in _reference_re.sub('', value):
+            overrides[name] = _environment_value(env, name)
+            continue
+        overrides[name] = value
+        foreign.update(_template_dependencies(_compile_template(value)))
+    for name in foreign.difference(names):
+        if name in env:
+            overrides[name] = _environment_value(env, name)
+    return overrides
+
+def CppDefines(names=None, overrides=None, **kw):
+    """Return GNU directories as preprocessor definitions.
+
+    The definitions are ready to be appended to ``CPPDEFINES``, with values
+    being C string literals, e.g. ``('BINDIR', '\\"/usr/local/bin\\"')``,
+    which results with ``-DBINDIR=\\"/usr/local/bin\\"`` on the command line.
+    The definitions are computed once per configuration, further calls with
+    same arguments return copies of the cached result.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import GnuDirVariables
+        env.Append(CPPDEFINES = GnuDirVariables.CppDefines(
+                                    ['bindir', 'pkgdatadir'],
+                                    {'prefix' : '/usr', 'package' : 'foo'}))
+
+    :Parameters:
+        names : sequence | None
+            variables to define, by default all directory variables
+            (see `DirectoryVariables()`)
+        overrides : dict | None
+            see `ResolveVariables()`
+    :Keywords:
+        macro_prefix : str
+            prefix of the macro names, e.g. ``'FOO_'`` for ``FOO_BINDIR``
+        form : str
+            ``'list'`` (default) for list of ``(macro, value)`` tuples,
+            ``'dict'`` for dictionary ``{ macro : value }``
+        quote : str
+            ``'shell'`` (default) if values are to be passed through POSIX
+            shell command line (as SCons does), ``'c'`` for plain C string
+            literals
+    :Returns:
+        list or dictionary of definitions
+    """
+    macro_prefix = kw.get('macro_prefix', '')
+    form = kw.get('form', 'list')
+    quote = kw.get('quote', 'shell')
+    if form not in ('list', 'dict'):
+        raise ValueError("invalid form %r" % form)
+    if quote not in ('shell', 'c'):
+        raise ValueError("invalid quote %r" % quote)
+    if names is None:
+        names = DirectoryVariables()
+    elif isinstance(names, str):
+        names = [names]
+    key = (_config_key(overrides), tuple(names), macro_prefix, quote)
+    try:
+        defines = _cppdefines_cache[key]
+        _cppdefines_cache_stats[0] += 1
+    except KeyError:
+        _cppdefines_cache_stats[1] += 1
+        resolved = _resolve(_effective_templates(overrides), names)
+        escape = _shell_c_string if quote == 'shell' else _c_string
+        defines = tuple((macro_prefix + name.upper(), escape(resolved[name]))
+                        for name in names)
+        if len(_cppdefines_cache) >= _resolve_cache_max:
+            _cppdefines_cache.clear()
+        _cppdefines_cache[key] = defines
+    if form == 'dict':
+        return dict(defines)
+    return list(defines)
+
+def AppendCppDefines(env, names=None, overrides=None, **kw):
+    """Append GNU directories to ``CPPDEFINES`` of SCons environment.
+
+    :Parameters:
+        env
+            SCons environment to update
+        names
+            see `CppDefines()`
+        overrides : dict | None
+            see `ResolveVariables()`; if ``None``, the values of GNU
+            directory variables defined in ``env`` are used (see
+            `AddToSConsEnvironment()`)
+    :Keywords:
+        macro_prefix, quote
+            see `CppDefines()`
+    """
+    if overrides is None:
+        overrides = _environment_overrides(env)
+    nkw = kw.copy()
+    nkw['form'] = 'list'
+    env.Append(CPPDEFINES = CppDefines(names, overrides, **nkw))
+
+#############################################################################
+# Staged installation (DESTDIR)
+#############################################################################
+
+# Results of `StagedVariables()`, keyed by destdir and configuration.
+_staged_cache = {}
+
+def _stage(destdir, directory):
+    """Rebase ``directory`` onto ``destdir`` (ending with ``/``). Without
+    ``destdir``, relative directories stay relative.
+
+    **Example**:
+
+        >>> from SConsGnuVariables.GnuDirVariables import _stage
+        >>> _stage('/tmp/stage/', '/usr//bin'), _stage('', 'lib/../share')
+        ('/tmp/stage/usr/bin', 'share')
+    """
+    if not directory:
+        return directory
+    if directory.startswith('/'):
+        return (destdir or '/') + posixpath.normpath(directory).lstrip('/')
+    if not destdir:
+        return posixpath.normpath(directory)
+    return posixpath.normpath(posixpath.join(destdir, directory))
+
+def StagedVariables(destdir, overrides=None, **kw):
+    """Return directory variables rebased onto ``destdir``.
+
+    This is the table of directories a staged installation (``make install
+    DESTDIR=...``) writes to, e.g. ``/tmp/stage/usr/local/bin`` for
+    ``bindir``. The directories are normalized and rebased once per
+    configuration; the returned dictionary is cached and shared, so it's a
+    read-only view (see `ResolveVariables()`).
+
+    :Parameters:
+        destdir : str
+            staging directory; empty string means no staging
+        overrides : dict | None
+            see `ResolveVariables()`
+    :Keywords:
+        only, exclude
+            see `ResolveVariables()`; extension variables (``man1ext``
+            and alike) are never included
+    :Returns:
+        dictionary ``{ name : staged_directory }``
+    """
+    key = (destdir, _config_key(overrides, **kw))
+    try:
+        return _staged_cache[key]
+    except KeyError:
+        pass
+    resolved = ResolveVariables(overrides, **kw)
+    if destdir:
+        base = posixpath.normpath(destdir).rstrip('/') + '/'
+    else:
+        base = ''
+    staged = _frozendict(dict((name, _stage(base, resolved[name]))
+                              for name in DirectoryVariables()
+                              if name in resolved))
+    if len(_staged_cache) >= _resolve_cache_max:
+        _staged_cache.clear()
+    _staged_cache[key] = staged
+    return staged
+
+def StagePaths(entries, destdir, overrides=None, **kw):
+    """Map files to their staged install locations.
+
+    Each file is given as a pair ``(name, relpath)``, where ``name`` is the
+    directory variable the file is installed to and ``relpath`` is its path
+    relative to that directory (e.g. ``('pkgdatadir', 'icons/foo.png')``).
+    The staged directories are computed once (see `StagedVariables()`), so
+    mapping a file costs one dictionary lookup and one concatenation. The
+    ``relpath`` must be normalized (no ``..``, no leading or doubled
+    slashes), as the ones returned by `DirectoryTrie.lookup()
+    <SConsGnuVariables.GnuDirTrie.DirectoryTrie.lookup>` are; it is not
+    normalized again.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import GnuDirVariables
+        files = [('bindir', 'foo'), ('pkgdatadir', 'icons/foo.png')]
+        for dest in GnuDirVariables.StagePaths(files, '/tmp/stage',
+                                               {'package' : 'foo'}):
+            print dest  # /tmp/stage/usr/local/bin/foo, ...
+
+    :Parameters:
+        entries : iterable
+            ``(name, relpath)`` pairs; empty ``relpath`` denotes the
+            directory itself
+        destdir, overrides
+            see `StagedVariables()`
+    :Keywords:
+        [all]
+            see `StagedVariables()`
+    :Returns:
+        generator of staged paths, in order of ``entries``
+    """
+    staged = StagedVariables(destdir, overrides, **kw)
+    prefixes = {}
+    for name, directory in staged.items():
+        if directory and not directory.endswith('/'):
+            prefixes[name] = directory + '/'
+        else:
+            prefixes[name] = directory
+    for name, relpath in entries:
+        try:
+            prefix = prefixes[name]
+        except KeyError:
+            raise ValueError("unknown directory variable %r" % name)
+        if relpath:
+            yield prefix + relpath
+        else:
+            yield staged[name]
+
+#############################################################################
+# Relative paths between directories
+#############################################################################
+
+# Relative path tables, keyed by configuration. Each table is a tuple
+# ``(directories, by_name, by_path)``, where ``directories`` maps variable
+# names to their component tuples, ``by_name`` caches results for pairs of
+# names and ``by_path`` for pairs of component tuples (shared by variables
+# that resolve to same directory, e.g. ``datadir`` and ``datarootdir``).
+_relpath_cache = {}
+_relpath_cache_stats = [0, 0]       # hits, misses
+
+def _relpath_table(overrides):
+    key = _config_key(overrides)
+    try:
+        return _relpath_cache[key]
+    except KeyError:
+        pass
+    resolved = ResolveVariables(overrides)
+    directories = {}
+    for name in DirectoryVariables():
+        value = resolved.get(name)
+        if value and value.startswith('/'):
+            directories[name] = tuple(c for c in
+                                      posixpath.normpath(value).split('/') if c)
+    table = (directories, {}, {})
+    if len(_relpath_cache) >= _resolve_cache_max:
+        _relpath_cache.clear()
+    _relpath_cache[key] = table
+    return table
+
+def _relative_components(source, target):
+    """Return relative path from ``source`` to ``target``, both given as
+    component tuples."""
+    common = 0
+    for a, b in zip(source, target):
+        if a != b:
+            break
+        common += 1
+    parts = ['..'] * (len(source) - common) + list(target[common:])
+    return '/'.join(parts) or '.'
+
+def RelativePaths(pairs=None, overrides=None):
+    """Return relative paths between GNU directories.
+
+    For each pair ``(source, target)`` of directory variables, the path of
+    ``target`` relative to ``source`` is computed (e.g. ``../lib`` for
+    ``('bindir', 'libdir')``), as ``os.path.relpath()`` would do. The results
+    are cached per configuration and shared between variables resolving to
+    same directories, so each distinct pair of directories is computed
+    once.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import GnuDirVariables
+        rel = GnuDirVariables.RelativePaths([('bindir', 'libdir')])
+        env.Append(RPATH = ['\\$$ORIGIN/' + rel[('bindir', 'libdir')]])
+
+    :Parameters:
+        pairs : sequence | None
+            pairs ``(source, target)`` of variable names; if ``None``, the
+            full matrix for all directory variables with absolute values is
+            returned
+        overrides : dict | None
+            see `ResolveVariables()`
+    :Returns:
+        dictionary ``{ (source, target) : relpath }``
+    """
+    directories, by_name, by_path = _relpath_table(overrides)
+    if pairs is None:
+        names = sorted(directories)
+        pairs = [(a, b) for a in names for b in names]
+    result = {}
+    for pair in pairs:
+        try:
+            result[pair] = by_name[pair]
+            _relpath_cache_stats[0] += 1
+            continue
+        except KeyError:
+            _relpath_cache_stats[1] += 1
+        try:
+            source, target = directories[pair[0]], directories[pair[1]]
+        except KeyError:
+            raise ValueError("variables %r and %r must both resolve to "
+                             "absolute directories" % pair)
+        try:
+            relpath = by_path[(source, target)]
+        except KeyError:
+            relpath = _relative_components(source, target)
+            by_path[(source, target)] = relpath
+        by_name[pair] = relpath
+        result[pair] = relpath
+    return result
+
+def RelativePath(source, target, overrides=None):
+    """Return path of directory ``target`` relative to ``source``, see
+    `RelativePaths()`."""
+    return RelativePaths([(source, target)], overrides)[(source, target)]
+
+#############################################################################
+# Variant matrices
+#############################################################################
+
+_matrix_stats = [0, 0]              # shared cells, computed cells
+
+#############################################################################
+class DirectoryMatrix(object):
+    """Resolved GNU directories of many configurations (variants).
+
+    Each distinct value is kept once, in `values`. The table itself is a
+    flat array of indices into `values`, with one row per variant.
+
+    :Ivariables:
+        names : tuple
+            names of the resolved variables
+        variants : tuple
+            the overrides of each variant
+        values : list
+            distinct values
+        cells : array
+            value indices, row after row; the position of each variable in
+            a row is given by ``positions[name]``
+        positions : dict
+            ``{ name : position }``
+    """
+
+    def __init__(self, names, variants, values, cells, positions):
+        self.names = names
+        self.variants = variants
+        self.values = values
+        self.cells = cells
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.variants)
+
+    def get(self, index, name):
+        """Return value of variable ``name`` in variant number ``index``."""
+        width = len(self.names)
+        return self.values[self.cells[index * width + self.positions[name]]]
+
+    def variant(self, index):
+        """Return ``{ name : value }`` dictionary of variant ``index``."""
+        base = index * len(self.names)
+        values, cells = self.values, self.cells
+        return dict((name, values[cells[base + position]])
+                    for name, position in self.positions.items())
+
+    def column(self, name):
+        """Return list of values of variable ``name`` in all variants."""
+        values = self.values
+        return [values[i] for i in
+                self.cells[self.positions[name]::len(self.names)]]
+
+#############################################################################
+def _matrix_influences(defaults, compiled_overrides, variants):
+    """Return ``{ name : names }`` mapping each variable to the overridden
+    variables its value may depend on, in any of the ``variants``."""
+    overridden = set()
+    graph = dict((name, set(_template_dependencies(parts)))
+                 for name, parts in defaults.items())
+    for overrides in variants:
+        for name, template in (overrides or {}).items():
+            overridden.add(name)
+            deps = _template_dependencies(compiled_overrides[template])
+            graph.setdefault(name, set()).update(deps)
+    influences = {}
+    for start in graph:
+        seen = set([start])
+        stack = [start]
+        while stack:
+            for dep in graph.get(stack.pop(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        influences[start] = tuple(sorted(seen & overridden))
+    return influences
+
+#############################################################################
+def _matrix_groups(names, influences):
+    """Group ``names`` by the overridden variables they depend on.
+
+    Returns list of ``(influence, group_names)`` pairs.
+    """
+    groups = {}
+    for name in names:
+        groups.setdefault(influences.get(name, ()), []).append(name)
+    return sorted((influence, tuple(group_names))
+                  for influence, group_names in groups.items())
+
+#############################################################################
+def ResolveMatrix(variants, **kw):
+    """Resolve GNU directories for many configurations at once.
+
+    Same as calling `ResolveVariables()` for each of ``variants``, but the
+    templates are compiled once, and the values are shared between variants
+    where possible. The variables are grouped by the overridden variables
+    they depend on (e.g. ``datadir`` depends only on ``prefix`` when the
+    variants override ``prefix``, ``exec_prefix`` and ``libdir``); values of
+    a group are resolved once for each distinct combination of overrides
+    that matter to it. Repeated variants are resolved once.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import GnuDirVariables
+        variants = [{'prefix' : '/usr', 'libdir' : '${exec_prefix}/' + lib}
+                    for lib in ('lib', 'lib32', 'lib64')]
+        matrix = GnuDirVariables.ResolveMatrix(variants)
+        matrix.column('libdir')   # ['/usr/lib', '/usr/lib32', '/usr/lib64']
+        matrix.get(2, 'datadir')  # '/usr/share', same object in all rows
+
+    :Parameters:
+        variants : sequence
+            ``overrides`` dictionaries (see `ResolveVariables()`), or
+            ``None`` for the defaults
+    :Keywords:
+        only, exclude
+            see `ResolveVariables()`
+    :Returns:
+        `DirectoryMatrix`
+    """
+    from array import array
+    variants = tuple(variants)
+    names = tuple(t[0] for t in _selected_templates(**kw))
+    defaults = _compiled_templates()
+    compiled_overrides = {}
+    for overrides in variants:
+        for template in (overrides or {}).values():
+            if template not in compiled_overrides:
+                compiled_overrides[template] = _compile_template(template)
+    influences = _matrix_influences(defaults, compiled_overrides, variants)
+    groups = _matrix_groups(names, influences)
+    # Rows hold the groups one after another, so a row is assembled from
+    # the (shared) value indices of its groups.
+    positions = {}
+    for influence, group_names in groups:
+        for name in group_names:
+            positions[name] = len(positions)
+    cells = array('I')
+    values = []
+    indices = {}
+    shared = {}                 # (influence, templates) -> value indices
+    rows = {}                   # overrides -> row
+    computed = 0
+    for overrides in variants:
+        overrides = overrides or {}
+        variant_key = tuple(sorted(overrides.items()))
+        try:
+            cells.extend(rows[variant_key])
+            continue
+        except KeyError:
+            pass
+        parts = []
+        missing = []
+        for influence, group_names in groups:
+            key = (influence, tuple(overrides.get(n) for n in influence))
+            try:
+                parts.append(shared[key])
+            except KeyError:
+                parts.append(None)
+                missing.append((len(parts) - 1, key, group_names))
+        if missing:
+            compiled = defaults.copy()
+            for name, template in overrides.items():
+                compiled[name] = compiled_overrides[template]
+            resolved = _resolve(compiled, [n for i, k, group_names in missing
+                                           for n in group_names])
+            for i, key, group_names in missing:
+                group_cells = array('I')
+                for name in group_names:
+                    value = resolved[name]
+                    try:
+                        group_cells.append(indices[value])
+                    except KeyError:
+                        indices[value] = len(values)
+                        group_cells.append(len(values))
+                        values.append(value)
+                shared[key] = parts[i] = group_cells
+                computed += len(group_cells)
+        row = array('I')
+        for part in parts:
+            row.extend(part)
+        rows[variant_key] = row
+        cells.extend(row)
+    _matrix_stats[0] += len(variants) * len(names) - computed
+    _matrix_stats[1] += computed
+    return DirectoryMatrix(names, variants, values, cells, positions)
+
+#############################################################################
+# Differences between configurations
+#############################################################################
+
+_default_dependencies_cache = None
+
+#############################################################################
+def _default_dependencies():
+    """Return ``{ name : references }`` for the default templates, built on
+    first use and cached."""
+    global _default_dependencies_cache
+    if _default_dependencies_cache is None:
+        _default_dependencies_cache = dict(
+            (name, tuple(_template_dependencies(parts)))
+            for name, parts in _compiled_templates().items())
+    return _default_dependencies_cache
+
+#############################################################################
+def _dependency_graph(overrides):
+    """Return ``{ name : references }`` for effective templates."""
+    graph = _default_dependencies()
+    if not overrides:
+        return graph
+    graph = graph.copy()
+    for name, template in overrides.items():
+        parts = _compile_template(template)
+        graph[name] = tuple(_template_dependencies(parts))
+    return graph
+
+#############################################################################
+def DiffResolved(old, new, old_overrides=None, new_overrides=None, **kw):
+    """Compare two sets of resolved GNU directories.
+
+    Each changed variable is reported with its cause: the variables it
+    refers to whose values changed too (e.g. ``libdir`` changed because
+    ``exec_prefix`` changed), or the variable itself if none of them did.
+    A variable whose overrides differ is always among its own causes, along
+    with the changed variables its new template refers to (e.g. ``libdir``
+    overridden with ``${exec_prefix}/lib64`` while ``prefix`` changed too).
+    The origins are the variables at the ends of such chains of causes.
+
+    **Example**:
+
+        >>> from SConsGnuVariables.GnuDirVariables import DiffResolved
+        >>> old = {'prefix' : '/usr', 'exec_prefix' : '/usr',
+        ...        'libdir' : '/usr/lib'}
+        >>> new = {'prefix' : '/opt', 'exec_prefix' : '/opt',
+        ...        'libdir' : '/opt/lib'}
+        >>> for d in DiffResolved(old, new):
+        ...     print('%(name)s %(causes)s %(origins)s' % d)
+        prefix ('prefix',) ('prefix',)
+        exec_prefix ('prefix',) ('prefix',)
+        libdir ('exec_prefix',) ('prefix',)
+
+    :Parameters:
+        old, new : dict
+            resolved directories ``{ name : value }``, e.g. from
+            `ResolveVariables()` or a file written by ``python -m
+            SConsGnuVariables dirs --format json``
+        old_overrides, new_overrides : dict | None
+            the overrides ``old`` and ``new`` were resolved with, if known;
+            they refine the references between variables, and variables
+            whose overrides differ are always their own causes
+    :Keywords:
+        only : list
+            list of variable names to report, others are still compared
+            (so that they may be reported as causes)
+        exclude : list
+            list of variable names not to report
+    :Returns:
+        list of dictionaries with keys ``name``, ``status`` (``'changed'``,
+        ``'added'`` or ``'removed'``), ``old`` and ``new`` (values, ``None``
+        if missing), ``causes`` and ``origins`` (tuples of names), ordered
+        as `SupportedVariables()`, then by name
+    """
+    old_graph = _dependency_graph(old_overrides)
+    new_graph = _dependency_graph(new_overrides)
+    old_overrides = old_overrides or {}
+    new_overrides = new_overrides or {}
+    changed = set(name for name in set(old) | set(new)
+                  if old.get(name) != new.get(name))
+    # overridden variables which are not reported (e.g. ``package``) may
+    # still be causes of changes
+    inputs = set(name for name in set(old_overrides) | set(new_overrides)
+                 if name not in old and name not in new and
+                 old_overrides.get(name) != new_overrides.get(name))
+    candidates = changed | inputs
+    causes = {}
+    for name in changed | inputs:
+        if old_overrides.get(name) != new_overrides.get(name):
+            refs = set(new_graph.get(name, ())) & candidates
+            refs.add(name)
+            found = tuple(sorted(refs))
+        elif name in old and name in new:
+            refs = set(old_graph.get(name, ())) | set(new_graph.get(name, ()))
+            found = tuple(sorted(refs & candidates))
+        else:
+            found = ()
+        causes[name] = found or (name,)
+    origins = {}
+    def origin(name, active):
+        try:
+            return origins[name]
+        except KeyError:
+            pass
+        if causes[name] == (name,) or name in active:
+            result = set([name])
+        else:
+            active.add(name)
+            result = set()
+            for cause in causes[name]:
+                if cause == name:
+                    result.add(name)
+                else:
+                    result.update(origin(cause, active))
+            active.discard(name)
+        origins[name] = result
+        return result
+    only = _name_set(kw.get('only'))
+    exclude = _name_set(kw.get('exclude'))
+    reported = changed
+    if only is not None:
+        reported = reported & only
+    if exclude is not None:
+        reported = reported - exclude
+    order = dict((name, i) for i, name in enumerate(SupportedVariables()))
+    result = []
+    for name in sorted(reported, key = lambda n: (order.get(n, len(order)), n)):
+        if name not in old:
+            status = 'added'
+        elif name not in new:
+            status = 'removed'
+        else:
+            status = 'changed'
+        result.append({ 'name'      : name,
+                        'status'    : status,
+                        'old'       : old.get(name),
+                        'new'       : new.get(name),
+                        'causes'    : causes[name],
+                        'origins'   : tuple(sorted(origin(name, set()))) })
+    return result
+
+#############################################################################
+def DiffVariables(old_overrides=None, new_overrides=None, **kw):
+    """Compare GNU directories resolved for two configurations.
+
+    Same as `DiffResolved()` on results of `ResolveVariables()` (which are
+    cached), with the overrides taken into account. All the variables are
+    resolved and compared, so causes and origins of reported changes are
+    complete even if they are not reported themselves.
+
+    :Keywords:
+        only, exclude
+            see `DiffResolved()`
+    """
+    old = ResolveVariables(old_overrides)
+    new = ResolveVariables(new_overrides)
+    return DiffResolved(old, new, old_overrides, new_overrides, **kw)
 
 # Local Variables:
 # # tab-width:4
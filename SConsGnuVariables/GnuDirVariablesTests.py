@@ -0,0 +1,241 @@
+""" SConsGnuVariables.GnuDirVariablesTests
+
+Unit tests for SConsGnuVariables.GnuDirVariables
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import ast
+import random
+import subprocess
+import unittest
+
+from SConsGnuVariables import GnuDirVariables
+
+def _variants(count):
+    rnd = random.Random(4321)
+    choices = [ ('prefix', ['/usr', '/usr/local', '/opt/foo']),
+                ('exec_prefix', ['${prefix}', '/opt/arch']),
+                ('libdir', ['${exec_prefix}/lib', '${exec_prefix}/lib64']),
+                ('datarootdir', ['${prefix}/share', '/srv/share']),
+                ('package', ['foo', 'bar']) ]
+    variants = [None, {}]
+    for i in range(count):
+        variant = {}
+        for name, values in choices:
+            if rnd.random() < 0.5:
+                variant[name] = rnd.choice(values)
+        variants.append(variant)
+    return variants + variants[:5]
+
+class TestCase(unittest.TestCase):
+    def test_resolve_variables(self):
+        dirs = GnuDirVariables.ResolveVariables({ 'prefix' : '/usr',
+                                                  'package' : 'foo' })
+        self.assertEqual(dirs['bindir'], '/usr/bin')
+        self.assertEqual(dirs['pkgdatadir'], '/usr/share/foo')
+        self.assertEqual(dirs['man1dir'], '/usr/man/man1')
+        dirs = GnuDirVariables.ResolveVariables({ 'prefix' : '/usr' },
+                                                only = ['bindir'])
+        self.assertEqual(dict(dirs), { 'bindir' : '/usr/bin' })
+
+    def test_resolve_variables_is_read_only(self):
+        def assign(dirs):
+            dirs['bindir'] = '/elsewhere'
+        dirs = GnuDirVariables.ResolveVariables({ 'prefix' : '/ro' })
+        self.assertRaises(TypeError, assign, dirs)
+        self.assertEqual(GnuDirVariables.ResolveVariables(
+                         { 'prefix' : '/ro' })['bindir'], '/ro/bin')
+        staged = GnuDirVariables.StagedVariables('/stage',
+                                                 { 'prefix' : '/ro' })
+        self.assertRaises(TypeError, assign, staged)
+
+    def test_resolve_matrix_same_as_resolve_variables(self):
+        variants = _variants(300)
+        matrix = GnuDirVariables.ResolveMatrix(variants)
+        self.assertEqual(len(matrix), len(variants))
+        for index, variant in enumerate(variants):
+            expected = dict(GnuDirVariables.ResolveVariables(variant))
+            self.assertEqual(matrix.variant(index), expected, variant)
+        self.assertEqual(matrix.column('libdir'),
+                         [GnuDirVariables.ResolveVariables(v)['libdir']
+                          for v in variants])
+
+    def test_resolve_matrix_only(self):
+        variants = _variants(20)
+        matrix = GnuDirVariables.ResolveMatrix(variants,
+                                               only = ['libdir', 'datadir'])
+        for index, variant in enumerate(variants):
+            expected = GnuDirVariables.ResolveVariables(variant,
+                only = ['libdir', 'datadir'])
+            self.assertEqual(matrix.variant(index), dict(expected))
+
+    def test_resolve_matrix_shares_values(self):
+        variants = [{ 'prefix' : '/usr', 'libdir' : '${exec_prefix}/' + lib }
+                    for lib in ('lib', 'lib32', 'lib64')]
+        variants.append(variants[0])
+        matrix = GnuDirVariables.ResolveMatrix(variants)
+        self.assertEqual(matrix.column('libdir'),
+                         ['/usr/lib', '/usr/lib32', '/usr/lib64', '/usr/lib'])
+        datadir = matrix.get(0, 'datadir')
+        for index in range(len(matrix)):
+            self.assertTrue(matrix.get(index, 'datadir') is datadir)
+        # each distinct value is stored once, the repeated variant reuses
+        # the first row
+        distinct = set()
+        for variant in variants:
+            distinct.update(GnuDirVariables.ResolveVariables(variant).values())
+        self.assertEqual(sorted(matrix.values), sorted(distinct))
+        width = len(matrix.names)
+        self.assertEqual(matrix.cells[:width], matrix.cells[3 * width:])
+
+    def _diff(self, old, new, **kw):
+        return dict((d['name'], d) for d in
+                    GnuDirVariables.DiffVariables(old, new, **kw))
+
+    def test_diff_variables_causes(self):
+        diff = self._diff({ 'prefix' : '/usr' }, { 'prefix' : '/opt' })
+        self.assertEqual(diff['prefix']['causes'], ('prefix',))
+        self.assertEqual(diff['exec_prefix']['causes'], ('prefix',))
+        self.assertEqual(diff['libdir']['causes'], ('exec_prefix',))
+        self.assertEqual(diff['libdir']['origins'], ('prefix',))
+        self.assertEqual(diff['htmldir']['causes'], ('docdir',))
+        self.assertEqual(diff['libdir']['status'], 'changed')
+        self.assertEqual((diff['libdir']['old'], diff['libdir']['new']),
+                         ('/usr/lib', '/opt/lib'))
+
+    def test_diff_variables_causes_with_only(self):
+        diff = self._diff({ 'prefix' : '/usr' }, { 'prefix' : '/opt' },
+                          only = ['libdir', 'datadir'])
+        self.assertEqual(sorted(diff), ['datadir', 'libdir'])
+        self.assertEqual(diff['libdir']['causes'], ('exec_prefix',))
+        self.assertEqual(diff['libdir']['origins'], ('prefix',))
+        self.assertEqual(diff['datadir']['causes'], ('datarootdir',))
+        self.assertEqual(diff['datadir']['origins'], ('prefix',))
+        diff = self._diff({ 'prefix' : '/usr' }, { 'prefix' : '/opt' },
+                          exclude = ['prefix'])
+        self.assertNotIn('prefix', diff)
+        self.assertEqual(diff['bindir']['origins'], ('prefix',))
+
+    def test_diff_variables_overrides(self):
+        diff = self._diff({ 'prefix' : '/usr' },
+                          { 'prefix' : '/usr', 'package' : 'foo',
+                            'libdir' : '${exec_prefix}/lib64' })
+        self.assertEqual(diff['libdir']['causes'], ('libdir',))
+        self.assertEqual(diff['pkglibdir']['causes'], ('libdir', 'package'))
+        self.assertNotIn('bindir', diff)
+        self.assertEqual(GnuDirVariables.DiffVariables({ 'prefix' : '/a' },
+                                                       { 'prefix' : '/a' }),
+                         [])
+
+    def test_diff_resolved_added_removed(self):
+        diff = GnuDirVariables.DiffResolved({ 'a' : '1', 'bindir' : '/b' },
+                                            { 'b' : '2', 'bindir' : '/b' })
+        self.assertEqual([(d['name'], d['status']) for d in diff],
+                         [('a', 'removed'), ('b', 'added')])
+
+    def test_diff_variables_override_with_changed_dependency(self):
+        diff = self._diff({ 'prefix' : '/usr' },
+                          { 'prefix' : '/opt',
+                            'libdir' : '${exec_prefix}/lib64' })
+        self.assertEqual(diff['libdir']['causes'], ('exec_prefix', 'libdir'))
+        self.assertEqual(diff['libdir']['origins'], ('libdir', 'prefix'))
+        self.assertEqual(diff['pkglibdir']['causes'], ('libdir',))
+        self.assertEqual(diff['pkglibdir']['origins'], ('libdir', 'prefix'))
+        # an override referring to nothing that changed is its only cause
+        diff = self._diff({ 'prefix' : '/usr' },
+                          { 'prefix' : '/opt', 'libdir' : '/lib64' })
+        self.assertEqual(diff['libdir']['causes'], ('libdir',))
+        self.assertEqual(diff['libdir']['origins'], ('libdir',))
+
+    def test_default_dependencies(self):
+        graph = GnuDirVariables._default_dependencies()
+        self.assertEqual(sorted(graph),
+                         sorted(GnuDirVariables.SupportedVariables()))
+        self.assertEqual(graph['libdir'], ('exec_prefix',))
+        self.assertEqual(graph['prefix'], ())
+        graph = GnuDirVariables._dependency_graph({ 'libdir' : '${prefix}/x' })
+        self.assertEqual(graph['libdir'], ('prefix',))
+        self.assertEqual(GnuDirVariables._default_dependencies()['libdir'],
+                         ('exec_prefix',))
+
+    def test_staged_variables(self):
+        staged = GnuDirVariables.StagedVariables('/tmp/stage/',
+                                                 { 'prefix' : '/usr' })
+        self.assertEqual(staged['bindir'], '/tmp/stage/usr/bin')
+        staged = GnuDirVariables.StagedVariables('', { 'prefix' : 'rel' })
+        self.assertEqual(staged['bindir'], 'rel/bin')
+        staged = GnuDirVariables.StagedVariables('', { 'prefix' : '/usr' })
+        self.assertEqual(staged['bindir'], '/usr/bin')
+
+    def test_cpp_defines(self):
+        defines = GnuDirVariables.CppDefines(['bindir'], { 'prefix' : '/usr' },
+                                             quote = 'c', macro_prefix = 'X_')
+        self.assertEqual(defines, [('X_BINDIR', '"/usr/bin"')])
+        defines = GnuDirVariables.CppDefines('bindir', { 'prefix' : '/usr' },
+                                             form = 'dict')
+        self.assertEqual(defines, { 'BINDIR' : '\\"/usr/bin\\"' })
+
+    def test_cpp_defines_survive_shell(self):
+        value = "/a b/it's (x) & y; c|d <e> \"q\" \\ $HOME `z` *[#]~{}!"
+        defines = GnuDirVariables.CppDefines(['prefix'],
+                                             { 'prefix' : value.replace('$',
+                                                                        '$$') })
+        argument = defines[0][1]
+        self.assertNotIn('$', argument)
+        for command in ('printf %%s %s' % argument,
+                        'printf %%s "%s"' % argument):
+            try:
+                output = subprocess.check_output(['sh', '-c', command])
+            except OSError:
+                self.skipTest('no POSIX shell')
+            self.assertEqual(ast.literal_eval(output.decode('utf-8')), value)
+
+    def test_environment_overrides(self):
+        try:
+            import SCons.Environment
+        except ImportError:
+            self.skipTest('SCons is not available')
+        env = SCons.Environment.Environment(tools = [])
+        env['ROOT'] = '/opt/x'
+        env['prefix'] = '${ROOT}/usr'
+        env['package'] = 'foo'
+        overrides = GnuDirVariables._environment_overrides(env)
+        dirs = GnuDirVariables.ResolveVariables(overrides)
+        self.assertEqual(dirs['bindir'], '/opt/x/usr/bin')
+        self.assertEqual(dirs['pkgdatadir'], '/opt/x/usr/share/foo')
+        GnuDirVariables.AppendCppDefines(env, ['bindir'], quote = 'c')
+        self.assertIn(('BINDIR', '"/opt/x/usr/bin"'), env['CPPDEFINES'])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
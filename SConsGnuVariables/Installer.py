@@ -0,0 +1,882 @@
+"""SConsGnuVariables.Installer
+
+Installation of files, with a persistent cache that skips redundant copies.
+
+Re-running an installation (e.g. after cleaning SCons' signature database, or
+into a fresh ``DESTDIR`` staging area populated from a previous run) would
+normally copy all the files again. `InstallCache` keeps, for every installed
+file, the size and modification time of its source and destination and the
+content hash of the installed data. A file is copied only if the destination
+does not already hold the same content:
+
+    - if the destination is missing or differs in size, the file is copied,
+    - if both files are exactly as recorded after the last copy, the copy is
+      skipped without reading any data,
+    - otherwise (e.g. files touched, or not recorded yet) the content hashes
+      are compared.
+
+The files are hashed only in the last case, copying a file does not hash
+it.
+
+The cache may be used directly with `install_file()` or hooked into SCons'
+``Install()`` builder with `UseInstallCache()`.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import Installer
+    Installer.UseInstallCache(env, '.install-cache')
+    env.Install('$bindir', program)
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import stat
+import errno
+import shutil
+import hashlib
+import threading
+
+# Version of the cache file format.
+_cache_version = 2
+
+# Size of blocks read when hashing files.
+_hash_block_size = 1 << 20
+
+#############################################################################
+def file_digest(path):
+    """Return hexadecimal SHA-1 digest of the content of file ``path``."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(_hash_block_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+#############################################################################
+def _signature(st):
+    return (st.st_size, st.st_mtime_ns)
+
+#############################################################################
+def copy_file(source, dest):
+    """Copy file ``source`` to ``dest`` as SCons' ``Install()`` does.
+
+    The data, modification time and permission bits are copied, and the
+    destination is made writable by its owner.
+    """
+    shutil.copy2(source, dest)
+    st = os.stat(source)
+    os.chmod(dest, stat.S_IMODE(st.st_mode) | stat.S_IWRITE)
+
+#############################################################################
+# Copy methods
+#############################################################################
+
+# Copy methods, in the order tried by ``'auto'``. The ``'hardlink'`` method
+# is never chosen automatically, as the installed file then shares inode
+# (and permissions) with the source.
+copy_methods = ('reflink', 'copy_file_range', 'sendfile', 'copy')
+
+# ioctl request cloning a file on copy-on-write filesystems (linux/fs.h).
+_FICLONE = 0x40049409
+
+# Errors meaning "not supported here", after which the next method is tried.
+_unsupported_errors = frozenset(getattr(errno, name) for name in
+                                ('EXDEV', 'EOPNOTSUPP', 'ENOTSUP', 'EINVAL',
+                                 'ENOSYS', 'ENOTTY', 'EPERM', 'EMLINK')
+                                if hasattr(errno, name))
+
+# Support of copy methods, ``{ (method, source_dev, dest_dev) : bool }``.
+_method_support = {}
+
+#############################################################################
+def _copy_metadata(source, dest):
+    shutil.copystat(source, dest)
+    st = os.stat(source)
+    os.chmod(dest, stat.S_IMODE(st.st_mode) | stat.S_IWRITE)
+
+#############################################################################
+def _transfer(source, dest, function):
+    with open(source, 'rb') as fsrc:
+        with open(dest, 'wb') as fdst:
+            function(fsrc.fileno(), fdst.fileno(),
+                     os.fstat(fsrc.fileno()).st_size)
+    _copy_metadata(source, dest)
+
+#############################################################################
+def _reflink(src, dst, size):
+    import fcntl
+    fcntl.ioctl(dst, _FICLONE, src)
+
+#############################################################################
+def _copy_file_range(src, dst, size):
+    copied = 0
+    while copied < size:
+        n = os.copy_file_range(src, dst, size - copied)
+        if n == 0:
+            raise OSError(errno.EINVAL, "copy_file_range() stopped early")
+        copied += n
+
+#############################################################################
+def _sendfile(src, dst, size):
+    offset = 0
+    while offset < size:
+        n = os.sendfile(dst, src, offset, size - offset)
+        if n == 0:
+            raise OSError(errno.EINVAL, "sendfile() stopped early")
+        offset += n
+
+#############################################################################
+_copy_functions = {
+    'hardlink' : os.link,
+    'reflink' : lambda s, d : _transfer(s, d, _reflink),
+    'copy_file_range' : lambda s, d : _transfer(s, d, _copy_file_range),
+    'sendfile' : lambda s, d : _transfer(s, d, _sendfile),
+    'copy' : copy_file,
+}
+
+#############################################################################
+def _methods_list(methods):
+    if methods is None or methods == 'auto':
+        return copy_methods
+    if isinstance(methods, str):
+        methods = (methods,)
+    unknown = [m for m in methods if m not in _copy_functions]
+    if unknown:
+        raise ValueError("unknown copy methods: %s" % ', '.join(unknown))
+    methods = tuple(methods)
+    if methods[-1] != 'copy':
+        methods += ('copy',)
+    return methods
+
+#############################################################################
+def make_copier(methods='auto'):
+    """Return function ``copy(source, dest)`` using the fastest available
+    copy method.
+
+    The methods are tried in order given, until one succeeds:
+
+        ``'hardlink'``
+            the destination becomes a hard link to the source; no data are
+            written at all, but the files share permissions and any change
+            to one affects the other,
+        ``'reflink'``
+            copy-on-write clone (``FICLONE``, e.g. on btrfs or xfs), no data
+            are copied until one of the files is modified,
+        ``'copy_file_range'``
+            in-kernel copy with ``os.copy_file_range()``,
+        ``'sendfile'``
+            in-kernel copy with ``os.sendfile()``,
+        ``'copy'``
+            ordinary copy, see `copy_file()`; always tried last.
+
+    Whether a method works is remembered for each pair of source and
+    destination filesystems, after its first success or failure, so the
+    unsupported methods are not retried for each file. The existing
+    destination file is removed first.
+
+    :Parameters:
+        methods : str | sequence
+            a method, sequence of methods or ``'auto'``, which tries all
+            but ``'hardlink'`` (see `copy_methods`)
+    :Returns:
+        the copy function
+    """
+    methods = _methods_list(methods)
+    def copy(source, dest):
+        if os.path.lexists(dest):
+            os.unlink(dest)
+        src_dev = os.stat(source).st_dev
+        dst_dev = os.stat(os.path.dirname(os.path.abspath(dest))).st_dev
+        for method in methods:
+            key = (method, src_dev, dst_dev)
+            if _method_support.get(key) is False:
+                continue
+            if method == 'copy':
+                return copy_file(source, dest)
+            try:
+                _copy_functions[method](source, dest)
+            except (OSError, AttributeError, ImportError) as e:
+                if isinstance(e, OSError) and \
+                   e.errno not in _unsupported_errors:
+                    raise
+                _method_support[key] = False
+                if os.path.lexists(dest):
+                    os.unlink(dest)
+                continue
+            _method_support[key] = True
+            return
+    copy.methods = methods
+    return copy
+
+#############################################################################
+def detect_methods(source_dir, dest_dir, methods=None):
+    """Return copy methods supported between two directories.
+
+    Each method is tried on a small temporary file, the outcome is also
+    remembered for `make_copier()`.
+
+    :Parameters:
+        source_dir, dest_dir : str
+            directories on the filesystems to check
+        methods : sequence | None
+            methods to check, all by default
+    :Returns:
+        list of the supported methods
+    """
+    import tempfile
+    if methods is None:
+        methods = ('hardlink',) + copy_methods
+    supported = []
+    fd, source = tempfile.mkstemp(dir = source_dir, prefix = '.probe')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'probe')
+        src_dev = os.stat(source).st_dev
+        dst_dev = os.stat(dest_dir).st_dev
+        for method in methods:
+            dest = os.path.join(dest_dir, '.probe-%s-%d' % (method,
+                                                            os.getpid()))
+            try:
+                _copy_functions[method](source, dest)
+                ok = True
+            except (OSError, AttributeError, ImportError):
+                ok = False
+            finally:
+                if os.path.lexists(dest):
+                    os.unlink(dest)
+            _method_support[(method, src_dev, dst_dev)] = ok
+            if ok:
+                supported.append(method)
+    finally:
+        os.unlink(source)
+    return supported
+
+#############################################################################
+class InstallCache(object):
+    """Persistent record of installed files.
+
+    :Ivariables:
+        path : str | None
+            the cache file; ``None`` for in-memory cache
+        hits : int
+            number of copies skipped
+        misses : int
+            number of files copied
+        hashed : int
+            number of files whose content had to be hashed
+    """
+
+    def __init__(self, path=None):
+        """Create cache, loading records from file ``path`` if it exists."""
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.hashed = 0
+        self._dirty = False
+        self._lock = threading.Lock()   # guards counters, see `_count()`
+        # dest -> (source_signature, dest_signature, digest)
+        self._records = self._load() if path else {}
+
+    def _load(self):
+        import json
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != _cache_version:
+            return {}
+        # JSON has no tuples, signatures are compared as tuples
+        try:
+            return dict((dest, (tuple(src_sig), tuple(dst_sig), digest))
+                        for dest, (src_sig, dst_sig, digest)
+                        in data.get('records', {}).items())
+        except (TypeError, ValueError):
+            return {}
+
+    def save(self):
+        """Atomically write the cache file, if anything changed."""
+        import json
+        import tempfile
+        if not self.path or not self._dirty:
+            return
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir = dirname, prefix = '.instcache')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version' : _cache_version,
+                           'records' : self._records}, f)
+            os.replace(tmp, self.path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+        self._dirty = False
+
+    def _count(self, attribute):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def _digest(self, path):
+        self._count('hashed')
+        return file_digest(path)
+
+    def is_current(self, source, dest):
+        """Return ``True`` if ``dest`` already holds content of ``source``.
+
+        The records of files found to be current are refreshed, so they are
+        recognized without hashing next time.
+        """
+        try:
+            dst = os.stat(dest)
+        except OSError:
+            return False
+        src = os.stat(source)
+        if src.st_size != dst.st_size:
+            return False
+        src_sig, dst_sig = _signature(src), _signature(dst)
+        dest = os.path.abspath(dest)
+        record = self._records.get(dest)
+        if record is not None and record[0] == src_sig and \
+           record[1] == dst_sig:
+            return True
+        if record is not None and record[1] == dst_sig and \
+           record[2] is not None:
+            digest = record[2]
+        else:
+            digest = self._digest(dest)
+        if digest != self._digest(source):
+            return False
+        self._records[dest] = (src_sig, dst_sig, digest)
+        self._dirty = True
+        return True
+
+    def record(self, source, dest, digest=None):
+        """Record that ``dest`` was just copied from ``source``.
+
+        The ``digest`` of the content may be ``None``, the content is then
+        hashed later, only if it's ever needed.
+        """
+        self._records[os.path.abspath(dest)] = (_signature(os.stat(source)),
+                                                _signature(os.stat(dest)),
+                                                digest)
+        self._dirty = True
+
+    def forget(self, dest):
+        """Remove record of ``dest`` (e.g. when it gets uninstalled)."""
+        if self._records.pop(os.path.abspath(dest), None) is not None:
+            self._dirty = True
+
+    def info(self):
+        """Return ``(hits, misses)`` tuple"""
+        return (self.hits, self.misses)
+
+#############################################################################
+def install_file(source, dest, cache=None, copy=None):
+    """Install file ``source`` as ``dest``, unless it's already there.
+
+    :Parameters:
+        source : str
+            file to install
+        dest : str
+            destination path; missing directories are created
+        cache : `InstallCache` | None
+            cache of installed files; without a cache the file is always
+            copied
+        copy : callable | None
+            function ``copy(source, dest)`` used to copy the file,
+            `copy_file()` by default
+    :Returns:
+        ``True`` if the file was copied, ``False`` if the copy was skipped
+    """
+    parent = os.path.dirname(dest)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent)
+    return _install_file(source, dest, cache, copy or _default_copier)
+
+#############################################################################
+def _install_file(source, dest, cache, copy):
+    """Install file to existing directory, see `install_file()`."""
+    if cache is not None:
+        if cache.is_current(source, dest):
+            cache._count('hits')
+            return False
+        cache._count('misses')
+    copy(source, dest)
+    if cache is not None:
+        cache.record(source, dest)
+    return True
+
+_default_copier = make_copier('copy')
+
+#############################################################################
+def _hook_scons_install(env, cache, copy):
+    original = env.get('INSTALL')
+    def install(dest, source, env):
+        # directories and symbolic links are left to SCons, which copies
+        # trees and recreates links rather than their targets
+        if os.path.islink(source) or os.path.isdir(source):
+            if original is None:
+                raise ValueError("can't install %r" % source)
+            return original(dest, source, env)
+        install_file(source, dest, cache, copy)
+        return 0
+    env['INSTALL'] = install
+
+#############################################################################
+# Parallel installation
+#############################################################################
+
+# Number of files copied by single task of `execute_plan()`.
+_files_per_task = 32
+
+#############################################################################
+def _new_category_stats():
+    return { 'files' : 0, 'copied' : 0, 'skipped' : 0, 'bytes' : 0,
+             'seconds' : 0.0, 'files_per_second' : None }
+
+#############################################################################
+def _make_directories(directory, created):
+    """Create ``directory`` and its missing parents, append the created
+    ones to ``created``."""
+    missing = []
+    while directory and not os.path.isdir(directory):
+        missing.append(directory)
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    for directory in reversed(missing):
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            continue
+        created.append(directory)
+
+#############################################################################
+def _install_chunk(chunk, cache, copy):
+    """Install ``(source, dest)`` pairs, return ``(copied, bytes)``."""
+    copied = 0
+    nbytes = 0
+    for source, dest in chunk:
+        if _install_file(source, dest, cache, copy):
+            copied += 1
+            nbytes += os.stat(source).st_size
+    return copied, nbytes
+
+#############################################################################
+def execute_plan(plan, workers=None, cache=None, methods=None, manifest=None):
+    """Install files according to ``plan``, in parallel.
+
+    The destination directories are created first, each one once, then the
+    files are copied by a pool of ``workers`` threads (copying is dominated
+    by system calls, which release the GIL). The categories (e.g. ``exec``
+    and ``data``) are installed one after another, so that throughput of
+    each is measured separately.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import AmInstall, Installer
+        plan = AmInstall.plan_install({'bin_SCRIPTS' : ['foo.sh']},
+                                      {'prefix' : '/usr'}, '/tmp/stage')
+        report = Installer.execute_plan(plan, workers = 8)
+        print report['categories']['exec']['files']
+
+    :Parameters:
+        plan : sequence
+            ``(category, variable, source, dest)`` tuples, where ``variable``
+            is the name of the GNU directory variable ``dest`` belongs to,
+            see `AmInstall.plan_install()
+            <SConsGnuVariables.AmInstall.plan_install>`
+        workers : int | None
+            number of threads; ``None`` means the default of
+            ``concurrent.futures.ThreadPoolExecutor``, ``0`` or ``1``
+            installs in current thread
+        cache : `InstallCache` | None
+            cache of installed files, see `install_file()`
+        methods : str | sequence | None
+            copy methods, see `make_copier()`; ordinary copy by default
+        manifest : str | None
+            if given, the installed files (copied or found up to date) and
+            created directories not recorded yet are appended to this
+            manifest, see `append_manifest()`
+    :Returns:
+        dictionary with keys:
+
+            - ``'manifest'``, sorted list of ``(category, variable, dest)``
+              tuples, same for same plan regardless of the order files were
+              installed in,
+            - ``'directories'``, sorted list of directories created
+              (including the missing parents),
+            - ``'categories'``, dictionary ``{ category : stats }``, where
+              ``stats`` has keys ``'files'``, ``'copied'``, ``'skipped'``,
+              ``'bytes'`` (copied), ``'seconds'`` and ``'files_per_second'``
+    """
+    import time
+    plan = list(plan)
+    copy = make_copier(methods or 'copy')
+    by_category = {}
+    directories = set()
+    for category, variable, source, dest in plan:
+        by_category.setdefault(category, []).append((source, dest))
+        directories.add(os.path.dirname(dest))
+    created = []
+    for directory in sorted(directories):
+        _make_directories(directory, created)
+    stats = {}
+    pool = None
+    if workers is None or workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ThreadPoolExecutor(workers)
+    try:
+        for category in sorted(by_category):
+            files = sorted(by_category[category], key = lambda x : x[1])
+            chunks = [files[i:i + _files_per_task]
+                      for i in range(0, len(files), _files_per_task)]
+            start = time.perf_counter()
+            if pool is None:
+                results = [_install_chunk(c, cache, copy) for c in chunks]
+            else:
+                results = list(pool.map(lambda c : _install_chunk(c, cache,
+                                                                  copy),
+                                         chunks))
+            entry = stats[category] = _new_category_stats()
+            entry['seconds'] = time.perf_counter() - start
+            entry['files'] = len(files)
+            entry['copied'] = sum(r[0] for r in results)
+            entry['skipped'] = entry['files'] - entry['copied']
+            entry['bytes'] = sum(r[1] for r in results)
+            entry['files_per_second'] = (entry['files'] / entry['seconds']
+                                         if entry['seconds'] else None)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    installed = sorted((category, variable, dest)
+                       for category, variable, source, dest in plan)
+    if manifest:
+        append_manifest(manifest, installed, created)
+    return { 'manifest' : installed, 'directories' : sorted(created),
+             'categories' : stats }
+
+#############################################################################
+# Install manifest and uninstallation
+#############################################################################
+
+# First line of manifest files.
+_manifest_header = '# SConsGnuVariables install manifest, version 1\n'
+
+_manifest_escapes = { '\\' : '\\\\', '\t' : '\\t', '\n' : '\\n' }
+
+#############################################################################
+def _escape(path):
+    if '\\' in path or '\t' in path or '\n' in path:
+        return ''.join(_manifest_escapes.get(c, c) for c in path)
+    return path
+
+#############################################################################
+def _unescape(text):
+    if '\\' not in text:
+        return text
+    out = []
+    chars = iter(text)
+    for c in chars:
+        if c == '\\':
+            c = next(chars, '')
+            c = { 't' : '\t', 'n' : '\n' }.get(c, c)
+        out.append(c)
+    return ''.join(out)
+
+#############################################################################
+def append_manifest(path, files, directories=()):
+    """Append installed files and created directories to manifest ``path``.
+
+    The manifest is a text file, extended with each installation. The files
+    are grouped by GNU directory variable, and stored relative to the common
+    directory of the group::
+
+        # SConsGnuVariables install manifest, version 1
+        D   /usr/local/include/foo
+        V   bindir  /usr/local/bin
+        F   foo
+        V   pkgincludedir   /usr/local/include/foo
+        F   foo.h
+        F   detail/bar.h
+
+    where the fields are separated with tabs and ``D`` records denote
+    directories created by the installation (only these are removed by
+    `uninstall()`). Each call appends its records with single write; files
+    and directories already recorded in the manifest are not appended again,
+    so reinstalling the same files leaves the manifest unchanged.
+
+    :Parameters:
+        path : str
+            the manifest file, created if missing
+        files : sequence
+            ``(variable, dest)`` pairs or ``(category, variable, dest)``
+            tuples, e.g. the ``'manifest'`` from `execute_plan()`
+        directories : sequence
+            directories created by the installation
+    """
+    recorded = set()
+    if os.path.exists(path):
+        old_files, old_directories = read_manifest(path)
+        recorded.update(dest for variable, dest in old_files)
+        recorded.update(old_directories)
+    groups = {}
+    for entry in files:
+        variable, dest = entry[-2:]
+        dest = os.path.abspath(dest)
+        if dest not in recorded:
+            groups.setdefault(variable, []).append(dest)
+    lines = []
+    for directory in sorted(set(os.path.abspath(d) for d in directories)):
+        if directory not in recorded:
+            lines.append('D\t%s\n' % _escape(directory))
+    for variable in sorted(groups):
+        dests = sorted(set(groups[variable]))
+        base = os.path.commonpath([os.path.dirname(d) for d in dests])
+        lines.append('V\t%s\t%s\n' % (_escape(variable), _escape(base)))
+        for dest in dests:
+            lines.append('F\t%s\n' % _escape(os.path.relpath(dest, base)))
+    if not lines:
+        return
+    with open(path, 'a') as f:
+        if f.tell() == 0:
+            lines.insert(0, _manifest_header)
+        f.write(''.join(lines))
+
+#############################################################################
+def read_manifest(path):
+    """Read manifest written by `append_manifest()`.
+
+    :Returns:
+        tuple ``(files, directories)``, where ``files`` is a list of
+        ``(variable, dest)`` pairs and ``directories`` is a list of created
+        directories, both in order of first appearance, without duplicates
+    """
+    files = []
+    directories = []
+    seen = set()
+    variable = base = None
+    with open(path) as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            kind = fields[0]
+            if kind == 'F':
+                dest = os.path.join(base, _unescape(fields[1]))
+                if dest not in seen:
+                    seen.add(dest)
+                    files.append((variable, dest))
+            elif kind == 'V':
+                variable, base = _unescape(fields[1]), _unescape(fields[2])
+            elif kind == 'D':
+                directory = _unescape(fields[1])
+                if directory not in seen:
+                    seen.add(directory)
+                    directories.append(directory)
+    return files, directories
+
+#############################################################################
+def remove_installed(files, directories=(), dry_run=False, cache=None):
+    """Remove installed ``files``, then ``directories`` if they're empty.
+
+    The files are removed in one pass, then the directories are removed
+    bottom-up, provided they're empty. Files already missing are ignored,
+    other errors are propagated.
+
+    :Parameters:
+        files : sequence
+            paths of the files to remove
+        directories : sequence
+            paths of the directories to remove if empty
+        dry_run : boolean
+            if ``True``, nothing is removed, only counted
+        cache : `InstallCache` | None
+            cache whose records of removed files are dropped
+    :Returns:
+        dictionary with numbers of ``'files'`` removed, ``'missing'`` files
+        and ``'directories'`` removed
+    """
+    result = { 'files' : 0, 'missing' : 0, 'directories' : 0 }
+    for dest in files:
+        if dry_run:
+            exists = os.path.lexists(dest)
+        else:
+            try:
+                os.unlink(dest)
+                exists = True
+            except FileNotFoundError:
+                exists = False
+            if cache is not None:
+                cache.forget(dest)
+        result['files' if exists else 'missing'] += 1
+    # deepest first, so children go before their parents
+    for directory in sorted(directories, key = lambda d : d.count(os.sep),
+                            reverse = True):
+        if dry_run:
+            result['directories'] += 1
+            continue
+        try:
+            os.rmdir(directory)
+        except OSError:
+            continue
+        result['directories'] += 1
+    return result
+
+#############################################################################
+def uninstall(path, dry_run=False, cache=None):
+    """Remove files and directories recorded in manifest ``path``.
+
+    The files and the directories created by the installations are removed
+    with `remove_installed()`. The manifest itself is removed at the end.
+
+    :Parameters:
+        path : str
+            the manifest file
+        dry_run : boolean
+            if ``True``, nothing is removed, only counted
+        cache : `InstallCache` | None
+            cache whose records of removed files are dropped
+    :Returns:
+        dictionary with numbers of ``'files'`` removed, ``'missing'`` files
+        and ``'directories'`` removed
+    """
+    files, directories = read_manifest(path)
+    result = remove_installed([dest for variable, dest in files],
+                              directories, dry_run, cache)
+    if not dry_run:
+        os.unlink(path)
+    return result
+
+# Caches opened by `UseInstallCache()`, keyed by path.
+_open_caches = {}
+
+#############################################################################
+def UseInstallCache(env, path, methods=None):
+    """Make SCons' ``Install()`` builders of ``env`` use `InstallCache`.
+
+    The ``INSTALL`` construction variable is replaced with a function which
+    skips the files already installed (directories are passed to the
+    original function). The cache is saved to ``path`` at exit. Note that
+    SCons removes outdated targets before rebuilding them, unless they're
+    marked with ``env.Precious()``, which is necessary to benefit from the
+    cache.
+
+    :Parameters:
+        env
+            SCons environment
+        path : str
+            the cache file
+        methods : str | sequence | None
+            copy methods, see `make_copier()`; ordinary copy by default
+    :Returns:
+        the `InstallCache` object
+    """
+    import atexit
+    cache = _open_caches.get(path)
+    if cache is None:
+        cache = InstallCache(path)
+        _open_caches[path] = cache
+        atexit.register(cache.save)
+        from SConsGnuVariables import Instrumentation
+        Instrumentation.register_cache('%s.InstallCache(%s)'
+                                       % (__name__, path), cache.info)
+    _hook_scons_install(env, cache, make_copier(methods or 'copy'))
+    return cache
+
+#############################################################################
+def UseInstallMethods(env, methods):
+    """Make SCons' ``Install()`` builders of ``env`` copy files with
+    ``methods``, see `make_copier()`.
+
+    **Example**:
+
+    .. python::
+
+        from SConsGnuVariables import Installer
+        Installer.UseInstallMethods(env, ['reflink', 'copy_file_range'])
+    """
+    _hook_scons_install(env, None, make_copier(methods))
+
+#############################################################################
+def _missing_directories(directories):
+    """Return set of ``directories`` and their parents that don't exist."""
+    missing = set()
+    for directory in directories:
+        while directory and directory not in missing and \
+              not os.path.isdir(directory):
+            missing.add(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+    return missing
+
+#############################################################################
+def RecordInstallManifest(env, path, variables):
+    """Make SCons' ``Install()`` builders of ``env`` record installed files
+    in manifest ``path`` (see `append_manifest()`).
+
+    The files installed during the SCons run are appended to the manifest
+    at exit, together with the destination directories that didn't exist
+    when this function was called (i.e. these created by the installation).
+
+    :Parameters:
+        env
+            SCons environment
+        path : str
+            the manifest file
+        variables : dict
+            ``{ directory : variable }``, GNU directory variables of the
+            destination directories
+    """
+    import atexit
+    variables = dict((os.path.abspath(d), v) for d, v in variables.items())
+    candidates = _missing_directories(variables)
+    files = []
+    original = env['INSTALL']
+    def install(dest, source, env):
+        status = original(dest, source, env)
+        if not status:
+            dest = os.path.abspath(dest)
+            files.append((variables.get(os.path.dirname(dest)), dest))
+        return status
+    def save():
+        if files:
+            created = [d for d in candidates if os.path.isdir(d)]
+            append_manifest(path, files, created)
+    env['INSTALL'] = install
+    atexit.register(save)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,197 @@
+""" SConsGnuVariables.InstallerTests
+
+Unit tests for SConsGnuVariables.Installer
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from SConsGnuVariables import Installer
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.top = tempfile.mkdtemp()
+        self.src = os.path.join(self.top, 'src')
+        self.stage = os.path.join(self.top, 'stage')
+        self.manifest = os.path.join(self.top, 'manifest.txt')
+        os.mkdir(self.src)
+        self.plan = []
+        for i, (category, variable, subdir) in enumerate([
+                ('exec', 'bindir', 'usr/bin'),
+                ('exec', 'bindir', 'usr/bin'),
+                ('data', 'pkgdatadir', 'usr/share/foo'),
+                ('data', 'pkgdatadir', 'usr/share/foo/sub') ]):
+            source = os.path.join(self.src, 'f%d' % i)
+            with open(source, 'w') as f:
+                f.write('file %d\n' % i)
+            dest = os.path.join(self.stage, subdir, 'f%d' % i)
+            self.plan.append((category, variable, source, dest))
+
+    def tearDown(self):
+        shutil.rmtree(self.top)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_execute_plan_installs(self):
+        report = Installer.execute_plan(self.plan, workers = 4)
+        for category, variable, source, dest in self.plan:
+            self.assertEqual(self._read(dest), self._read(source))
+        self.assertEqual(report['categories']['exec']['copied'], 2)
+        self.assertEqual(report['categories']['data']['files'], 2)
+        self.assertIn(self.stage, report['directories'])
+        self.assertEqual(len(report['manifest']), 4)
+
+    def test_execute_plan_skips_current_files(self):
+        cache = Installer.InstallCache()
+        Installer.execute_plan(self.plan, 1, cache)
+        report = Installer.execute_plan(self.plan, 1, cache)
+        for category in ('exec', 'data'):
+            self.assertEqual(report['categories'][category]['copied'], 0)
+            self.assertEqual(report['categories'][category]['skipped'], 2)
+        self.assertEqual(cache.info(), (4, 4))
+        self.assertEqual(cache.hashed, 0)
+
+    def test_execute_plan_reinstalls_changed_files(self):
+        cache = Installer.InstallCache()
+        Installer.execute_plan(self.plan, 1, cache)
+        source, dest = self.plan[0][2], self.plan[0][3]
+        with open(source, 'w') as f:
+            f.write('changed content\n')
+        report = Installer.execute_plan(self.plan, 1, cache)
+        self.assertEqual(report['categories']['exec']['copied'], 1)
+        self.assertEqual(self._read(dest), 'changed content\n')
+        os.unlink(dest)
+        report = Installer.execute_plan(self.plan, 1, cache)
+        self.assertEqual(report['categories']['exec']['copied'], 1)
+        self.assertTrue(os.path.exists(dest))
+
+    def test_cache_persists(self):
+        path = os.path.join(self.top, 'cache')
+        cache = Installer.InstallCache(path)
+        Installer.execute_plan(self.plan, 1, cache)
+        cache.save()
+        with open(path) as f:
+            data = json.load(f)
+        self.assertEqual(data['version'], Installer._cache_version)
+        self.assertEqual(len(data['records']), 4)
+        cache = Installer.InstallCache(path)
+        report = Installer.execute_plan(self.plan, 1, cache)
+        self.assertEqual(report['categories']['data']['copied'], 0)
+        self.assertEqual(cache.hashed, 0)
+
+    def test_cache_ignores_bad_file(self):
+        path = os.path.join(self.top, 'cache')
+        for content in ('not json', '[]', '{"version": 1, "records": {}}',
+                        '{"version": %d, "records": {"x": 1}}'
+                        % Installer._cache_version):
+            with open(path, 'w') as f:
+                f.write(content)
+            self.assertEqual(Installer.InstallCache(path)._records, {})
+
+    def test_hook_scons_install_leaves_links_to_original(self):
+        calls = []
+        def original(dest, source, env):
+            calls.append((dest, source))
+            return 0
+        env = { 'INSTALL' : original }
+        Installer._hook_scons_install(env, None, Installer.copy_file)
+        source = self.plan[0][2]
+        link = os.path.join(self.src, 'link')
+        os.symlink(source, link)
+        dest = os.path.join(self.top, 'dest')
+        os.mkdir(dest)
+        env['INSTALL'](os.path.join(dest, 'link'), link, env)
+        env['INSTALL'](os.path.join(dest, 'sub'), self.src, env)
+        env['INSTALL'](os.path.join(dest, 'file'), source, env)
+        self.assertEqual(calls, [(os.path.join(dest, 'link'), link),
+                                 (os.path.join(dest, 'sub'), self.src)])
+        self.assertEqual(self._read(os.path.join(dest, 'file')),
+                         self._read(source))
+        env = { }
+        Installer._hook_scons_install(env, None, Installer.copy_file)
+        self.assertRaises(ValueError, env['INSTALL'],
+                          os.path.join(dest, 'link2'), link, env)
+
+    def test_reinstall_keeps_manifest(self):
+        cache = Installer.InstallCache()
+        Installer.execute_plan(self.plan, 1, cache, manifest = self.manifest)
+        first = self._read(self.manifest)
+        Installer.execute_plan(self.plan, 1, cache, manifest = self.manifest)
+        self.assertEqual(self._read(self.manifest), first)
+        files, directories = Installer.read_manifest(self.manifest)
+        self.assertEqual(sorted(f[1] for f in files),
+                         sorted(p[3] for p in self.plan))
+        self.assertIn(self.stage, directories)
+
+    def test_uninstall(self):
+        cache = Installer.InstallCache()
+        Installer.execute_plan(self.plan, 2, cache, manifest = self.manifest)
+        os.unlink(self.plan[0][3])
+        result = Installer.uninstall(self.manifest, dry_run = True)
+        self.assertEqual(result['files'], 3)
+        self.assertEqual(result['missing'], 1)
+        self.assertTrue(os.path.exists(self.plan[1][3]))
+        result = Installer.uninstall(self.manifest, cache = cache)
+        self.assertEqual((result['files'], result['missing']), (3, 1))
+        self.assertFalse(os.path.exists(self.stage))
+        self.assertFalse(os.path.exists(self.manifest))
+        self.assertEqual(cache._records, {})
+
+    def test_uninstall_keeps_foreign_files(self):
+        os.makedirs(os.path.join(self.stage, 'usr', 'bin'))
+        foreign = os.path.join(self.stage, 'usr', 'bin', 'other')
+        with open(foreign, 'w') as f:
+            f.write('not ours\n')
+        Installer.execute_plan(self.plan, 1, manifest = self.manifest)
+        Installer.uninstall(self.manifest)
+        self.assertTrue(os.path.exists(foreign))
+        self.assertFalse(os.path.exists(os.path.join(self.stage, 'usr',
+                                                     'share')))
+
+    def test_copy_methods(self):
+        for methods in ('auto', 'copy', ['hardlink'], ['sendfile']):
+            dest = os.path.join(self.top, 'copy')
+            copy = Installer.make_copier(methods)
+            copy(self.plan[0][2], dest)
+            self.assertEqual(self._read(dest), 'file 0\n')
+        self.assertRaises(ValueError, Installer.make_copier, ['bogus'])
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,422 @@
+"""SConsGnuVariables.Instrumentation
+
+Optional instrumentation of SConsGnuVariables' hot paths.
+
+When enabled, the instrumented functions (e.g. `decompose_name()
+<SConsGnuVariables.AmUniformNames.decompose_name>`) count their calls and
+the cumulative time spent in them. Caches maintained by the package report
+their hit rates. The collected statistics may be retrieved with
+`statistics()`, formatted with `report()` and are dumped at exit, if
+requested.
+
+Instrumentation costs nothing when it's disabled: the instrumented
+functions are listed here, the package modules don't even import this
+module. The `enable()` function imports the listed modules and replaces the
+functions with timing wrappers (`disable()` restores them).
+
+**Limitations**
+
+    - the wrappers replace module attributes, so a function bound with
+      ``from ... import name`` before `enable()` is not counted, use module
+      attributes (``AmUniformNames.decompose_name``) instead,
+    - calls made within worker processes (e.g. `decompose_names()
+      <SConsGnuVariables.AmUniformNames.decompose_names>` with ``workers``)
+      are not counted, only the time of the call in the main process is.
+
+**Enabling**
+
+Either set the ``SCONSGNUVARIABLES_PROFILE`` environment variable before
+SCons starts::
+
+    SCONSGNUVARIABLES_PROFILE=text scons         # text report to stderr
+    SCONSGNUVARIABLES_PROFILE=json:prof.json scons  # JSON report to file
+
+or call `enable()` from your ``SConstruct``:
+
+.. python::
+
+    from SConsGnuVariables import Instrumentation
+    Instrumentation.enable('text')
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import sys
+import threading
+
+# Name of the environment variable that enables instrumentation.
+ENVIRONMENT_VARIABLE = 'SCONSGNUVARIABLES_PROFILE'
+
+# Instrumented functions, ``{ module_name : (function_name, ...) }``, see
+# also `register()`.
+_targets = {
+    'SConsGnuVariables.AmInstall' : (
+        'partition_sources',
+        'plan_install',
+        'group_by_directory',
+        'install_uniform_names',
+    ),
+    'SConsGnuVariables.AmMakefiles' : (
+        'parse_makefiles',
+        'import_makefiles',
+    ),
+    'SConsGnuVariables.AmNameScanner' : (
+        'partition_names',
+        'scan_environment',
+        'scan_files',
+    ),
+    'SConsGnuVariables.AmScheme' : (
+        'CompileScheme',
+    ),
+    'SConsGnuVariables.AmUniformNames' : (
+        'rsplit_longest_suffix',
+        'decompose_name',
+        'ensure_name_sanity',
+        'is_install_exec_name',
+        'is_install_data_name',
+        'decompose_names',
+        'ensure_names_sanity',
+        'FilterInstallExecNames',
+        'FilterInstallDataNames',
+    ),
+    'SConsGnuVariables.GnuDirFiles' : (
+        'write_if_changed',
+    ),
+    'SConsGnuVariables.GnuDirVariables' : (
+        'AddToSConsVariables',
+        'AddToSConsOptions',
+        'AddToSConsEnvironment',
+        'AsSConsVariables',
+        'ResolveVariables',
+        'CppDefines',
+        'StagedVariables',
+        'RelativePaths',
+        'ResolveMatrix',
+        'DiffResolved',
+    ),
+    'SConsGnuVariables.Installer' : (
+        'file_digest',
+        'install_file',
+        'execute_plan',
+        'uninstall',
+    ),
+    'SConsGnuVariables.SharedCache' : (
+        'decompose_names',
+        'resolve_variables',
+    ),
+    'SConsGnuVariables.Subpackages' : (
+        'BuildSplitter',
+        'WriteFileLists',
+    ),
+}
+
+# Module-level caches, ``{ name : (module_name, attribute) }``, the
+# attributes hold ``[hits, misses]`` counters. Caches of modules that were
+# never imported are not reported.
+_module_caches = {
+    'SConsGnuVariables.AmMakefiles.parse_makefiles' :
+        ('SConsGnuVariables.AmMakefiles', '_cache_stats'),
+    'SConsGnuVariables.GnuDirVariables.ResolveVariables' :
+        ('SConsGnuVariables.GnuDirVariables', '_resolve_cache_stats'),
+    'SConsGnuVariables.GnuDirVariables.CppDefines' :
+        ('SConsGnuVariables.GnuDirVariables', '_cppdefines_cache_stats'),
+    'SConsGnuVariables.GnuDirVariables.RelativePaths' :
+        ('SConsGnuVariables.GnuDirVariables', '_relpath_cache_stats'),
+    'SConsGnuVariables.GnuDirVariables.ResolveMatrix' :
+        ('SConsGnuVariables.GnuDirVariables', '_matrix_stats'),
+}
+
+# Original (not instrumented) functions, ``{ (module, name) : function }``.
+_originals = {}
+
+# Statistics, ``{ 'module.function' : [ calls, seconds ] }``.
+_stats = {}
+
+# Registered caches, ``{ name : callable }``, the callables return
+# ``(hits, misses)`` tuples.
+_caches = {}
+
+# Timers measured with `timer()`, ``{ name : [ count, seconds ] }``.
+_timers = {}
+
+# Guards updates of `_stats` and `_timers` entries; instrumented functions
+# may run in threads (e.g. `Installer.execute_plan()
+# <SConsGnuVariables.Installer.execute_plan>`).
+_lock = threading.Lock()
+
+_enabled = False
+_atexit = None      # (format, path) of the report dumped at exit
+_atexit_registered = False
+
+#############################################################################
+def _clock():
+    import time
+    try:
+        return time.perf_counter
+    except AttributeError:
+        return time.time
+
+#############################################################################
+def _wrap(qualname, function):
+    import functools
+    clock = _clock()
+    entry = _stats.setdefault(qualname, [0, 0.0])
+    @functools.wraps(function)
+    def wrapper(*args, **kw):
+        start = clock()
+        try:
+            return function(*args, **kw)
+        finally:
+            elapsed = clock() - start
+            with _lock:
+                entry[0] += 1
+                entry[1] += elapsed
+    return wrapper
+
+#############################################################################
+def _patch(module_name):
+    import importlib
+    module = importlib.import_module(module_name)
+    for name in _targets[module_name]:
+        key = (module_name, name)
+        if key in _originals:
+            continue
+        function = getattr(module, name)
+        _originals[key] = function
+        setattr(module, name, _wrap('%s.%s' % (module_name, name), function))
+
+#############################################################################
+def _unpatch(module_name):
+    module = sys.modules.get(module_name)
+    for name in _targets[module_name]:
+        function = _originals.pop((module_name, name), None)
+        if function is not None and module is not None:
+            setattr(module, name, function)
+
+#############################################################################
+def register(module_name, names):
+    """Register functions of a module for instrumentation.
+
+    The functions of this package are listed in advance, this is for other
+    modules. If instrumentation is enabled, the functions are instrumented
+    immediately.
+
+    :Parameters:
+        module_name : str
+            name of the module (``__name__``)
+        names : sequence
+            names of module-level functions to instrument
+    """
+    _targets[module_name] = tuple(names)
+    if _enabled:
+        _patch(module_name)
+
+#############################################################################
+def register_cache(name, info):
+    """Register a cache whose hit rate is to be reported.
+
+    :Parameters:
+        name : str
+            name of the cache, as shown in report
+        info : callable
+            function returning ``(hits, misses)`` tuple
+    """
+    _caches[name] = info
+
+#############################################################################
+class timer(object):
+    """Context manager measuring a block of code under given ``name``, when
+    instrumentation is enabled.
+
+    .. python::
+
+        with Instrumentation.timer('cache.load'):
+            load()
+    """
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if _enabled:
+            self.start = _clock()()
+        return self
+
+    def __exit__(self, *exc):
+        if _enabled:
+            elapsed = _clock()() - self.start
+            with _lock:
+                entry = _timers.setdefault(self.name, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+        return False
+
+#############################################################################
+def is_enabled():
+    """Return ``True`` if instrumentation is enabled"""
+    return _enabled
+
+#############################################################################
+def enable(format=None, path=None):
+    """Enable instrumentation.
+
+    The modules with instrumented functions are imported, if they weren't
+    imported yet.
+
+    :Parameters:
+        format : str | None
+            if given (``'text'`` or ``'json'``), the report is dumped in this
+            format at exit
+        path : str | None
+            file to which the report is written at exit; by default the
+            report goes to standard error
+    """
+    global _enabled, _atexit, _atexit_registered
+    _enabled = True
+    for module_name in _targets:
+        _patch(module_name)
+    if format is not None:
+        if not _atexit_registered:
+            import atexit
+            atexit.register(_dump_at_exit)
+            _atexit_registered = True
+        _atexit = (format, path)
+
+#############################################################################
+def disable():
+    """Disable instrumentation and restore original functions.
+
+    Statistics collected so far are kept, see `reset()`.
+    """
+    global _enabled, _atexit
+    _enabled = False
+    _atexit = None
+    for module_name in _targets:
+        _unpatch(module_name)
+
+#############################################################################
+def reset():
+    """Zero all the counters and timers"""
+    with _lock:
+        for entry in list(_stats.values()) + list(_timers.values()):
+            entry[0] = 0
+            entry[1] = 0.0
+
+#############################################################################
+def statistics():
+    """Return collected statistics.
+
+    :Returns:
+        dictionary with keys:
+
+            - ``'functions'``, list of dictionaries with ``name``, ``calls``
+              and ``seconds`` (cumulative), sorted by time, descending;
+              functions that were never called are omitted,
+            - ``'timers'``, list of same form for `timer()` blocks,
+            - ``'caches'``, list of dictionaries with ``name``, ``hits``,
+              ``misses`` and ``hit_rate``, sorted by name.
+    """
+    def entries(table):
+        with _lock:
+            table = [(name, tuple(entry)) for name, entry in table.items()]
+        items = [ { 'name' : name, 'calls' : calls, 'seconds' : seconds }
+                  for name, (calls, seconds) in table if calls ]
+        items.sort(key = lambda x : (-x['seconds'], x['name']))
+        return items
+    counters = [(name, info()) for name, info in _caches.items()]
+    for name, (module_name, attribute) in _module_caches.items():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            counters.append((name, tuple(getattr(module, attribute))))
+    caches = []
+    for name, (hits, misses) in sorted(counters):
+        total = hits + misses
+        caches.append({ 'name' : name, 'hits' : hits, 'misses' : misses,
+                        'hit_rate' : (float(hits) / total) if total else None })
+    return { 'functions' : entries(_stats), 'timers' : entries(_timers),
+             'caches' : caches }
+
+#############################################################################
+def report(format='text'):
+    """Return statistics formatted as ``'text'`` or ``'json'`` string"""
+    stats = statistics()
+    if format == 'json':
+        import json
+        return json.dumps(stats, indent = 2, sort_keys = True)
+    lines = ['%-52s %10s %12s %12s' % ('function', 'calls', 'total [ms]',
+                                        'per call [us]')]
+    for item in stats['functions'] + stats['timers']:
+        lines.append('%-52s %10d %12.3f %12.3f' % (item['name'],
+                     item['calls'], item['seconds'] * 1e3,
+                     item['seconds'] * 1e6 / item['calls']))
+    if stats['caches']:
+        lines.append('')
+        lines.append('%-52s %10s %12s %12s' % ('cache', 'hits', 'misses',
+                                               'hit rate'))
+        for item in stats['caches']:
+            rate = item['hit_rate']
+            lines.append('%-52s %10d %12d %12s' % (item['name'], item['hits'],
+                         item['misses'],
+                         '-' if rate is None else '%.1f%%' % (rate * 100)))
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def dump(format='text', path=None):
+    """Write `report()` to file ``path`` or to standard error"""
+    text = report(format)
+    if path is None:
+        sys.stderr.write(text)
+    else:
+        with open(path, 'w') as f:
+            f.write(text)
+
+#############################################################################
+def _dump_at_exit():
+    if _atexit is not None:
+        dump(*_atexit)
+
+#############################################################################
+def _enable_from_environment():
+    """Enable instrumentation if requested by environment variable.
+
+    The variable's value is ``format[:path]``, where ``format`` is ``text``
+    or ``json``; any other non-empty value (e.g. ``1``) means ``text``.
+    """
+    value = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not value or value == '0':
+        return
+    format, sep, path = value.partition(':')
+    if format not in ('text', 'json'):
+        format = 'text'
+    enable(format, path or None)
+
+_enable_from_environment()
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
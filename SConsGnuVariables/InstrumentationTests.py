@@ -0,0 +1,154 @@
+""" SConsGnuVariables.InstrumentationTests
+
+Unit tests for SConsGnuVariables.Instrumentation
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import subprocess
+import sys
+import threading
+import types
+import unittest
+
+from SConsGnuVariables import AmUniformNames
+from SConsGnuVariables import Instrumentation
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        Instrumentation.disable()
+        Instrumentation.reset()
+
+    def tearDown(self):
+        Instrumentation.disable()
+        Instrumentation.reset()
+
+    def _calls(self, name):
+        for item in Instrumentation.statistics()['functions']:
+            if item['name'] == name:
+                return item['calls']
+        return 0
+
+    def test_patch_unpatch(self):
+        original = AmUniformNames.decompose_name
+        Instrumentation.enable()
+        self.assertTrue(Instrumentation.is_enabled())
+        self.assertIsNot(AmUniformNames.decompose_name, original)
+        self.assertIs(AmUniformNames.decompose_name.__wrapped__, original)
+        Instrumentation.enable()
+        self.assertIs(AmUniformNames.decompose_name.__wrapped__, original)
+        Instrumentation.disable()
+        self.assertFalse(Instrumentation.is_enabled())
+        self.assertIs(AmUniformNames.decompose_name, original)
+
+    def test_counters(self):
+        name = 'SConsGnuVariables.AmUniformNames.decompose_name'
+        AmUniformNames.decompose_name('bin_PROGRAMS')
+        self.assertEqual(self._calls(name), 0)
+        Instrumentation.enable()
+        AmUniformNames.decompose_name('bin_PROGRAMS')
+        self.assertRaises(ValueError, AmUniformNames.decompose_name, 'bogus')
+        self.assertEqual(self._calls(name), 2)
+        Instrumentation.disable()
+        AmUniformNames.decompose_name('bin_PROGRAMS')
+        self.assertEqual(self._calls(name), 2)
+        Instrumentation.reset()
+        self.assertEqual(self._calls(name), 0)
+
+    def test_counters_in_threads(self):
+        Instrumentation.enable()
+        def work():
+            for i in range(2000):
+                AmUniformNames.decompose_name('bin_PROGRAMS')
+                with Instrumentation.timer('test.block'):
+                    pass
+        threads = [threading.Thread(target = work) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self._calls('SConsGnuVariables.AmUniformNames.'
+                                     'decompose_name'), 16000)
+        timers = Instrumentation.statistics()['timers']
+        self.assertEqual([(t['name'], t['calls']) for t in timers],
+                         [('test.block', 16000)])
+
+    def test_timer_disabled(self):
+        with Instrumentation.timer('test.disabled'):
+            pass
+        self.assertEqual(Instrumentation.statistics()['timers'], [])
+
+    def test_register(self):
+        module = types.ModuleType('instrumentation_test_module')
+        module.function = lambda x : x + 1
+        sys.modules[module.__name__] = module
+        try:
+            Instrumentation.register(module.__name__, ('function',))
+            Instrumentation.enable()
+            self.assertEqual(module.function(1), 2)
+            self.assertEqual(self._calls(module.__name__ + '.function'), 1)
+            Instrumentation.disable()
+            self.assertEqual(module.function.__name__, '<lambda>')
+        finally:
+            del Instrumentation._targets[module.__name__]
+            del sys.modules[module.__name__]
+
+    def test_caches_and_report(self):
+        from SConsGnuVariables import GnuDirVariables
+        Instrumentation.register_cache('test.cache', lambda : (3, 1))
+        try:
+            GnuDirVariables.ResolveVariables({ 'prefix' : '/instrumented' })
+            caches = dict((c['name'], c) for c in
+                          Instrumentation.statistics()['caches'])
+            self.assertEqual(caches['test.cache']['hit_rate'], 0.75)
+            self.assertIn('SConsGnuVariables.GnuDirVariables.ResolveVariables',
+                          caches)
+            self.assertIn('test.cache', Instrumentation.report('text'))
+            self.assertIn('"hit_rate": 0.75', Instrumentation.report('json'))
+        finally:
+            del Instrumentation._caches['test.cache']
+
+    def test_not_imported_unless_requested(self):
+        code = ('import sys\n'
+                'from SConsGnuVariables import AmUniformNames, Installer\n'
+                'from SConsGnuVariables import GnuDirVariables, AmInstall\n'
+                'print("SConsGnuVariables.Instrumentation" in sys.modules)\n')
+        for value, expected in (('0', b'False'), ('text:/dev/null', b'True')):
+            env = { 'SCONSGNUVARIABLES_PROFILE' : value,
+                    'PYTHONPATH' : ':'.join(sys.path) }
+            output = subprocess.check_output([sys.executable, '-c', code],
+                                             env = env)
+            self.assertEqual(output.strip(), expected)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,174 @@
+""" SConsGnuVariables.MainTests
+
+Unit tests for SConsGnuVariables.__main__
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from SConsGnuVariables import __main__ as main
+from SConsGnuVariables import Installer
+
+class TestCase(unittest.TestCase):
+    def _run(self, argv, stdin=''):
+        stdout = StringIO()
+        status = main.main(argv, StringIO(stdin), stdout)
+        return status, stdout.getvalue()
+
+    def _error(self, argv):
+        saved = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertRaises(SystemExit, main.main, argv, StringIO(),
+                              StringIO())
+            return sys.stderr.getvalue()
+        finally:
+            sys.stderr = saved
+
+    def test_classify_tsv(self):
+        status, output = self._run(['classify', '--batch-size', '2'],
+                                   'bin_PROGRAMS\n\nnobase_include_HEADERS\n'
+                                   'foo_DATA\ncheck_PROGRAMS\n')
+        self.assertEqual(status, 0)
+        self.assertEqual(output.splitlines(), [
+            'bin_PROGRAMS\texec\t\tbin\tPROGRAMS',
+            'nobase_include_HEADERS\tdata\tnobase\tinclude\tHEADERS',
+            "foo_DATA\tinvalid\tcan't recognize main prefix in 'foo_DATA'",
+            'check_PROGRAMS\tnoinst\t\tcheck\tPROGRAMS' ])
+
+    def test_classify_json_user_names(self):
+        status, output = self._run(['classify', '--format', 'json',
+                                    '--primary-name', 'FOO',
+                                    '--main-prefix', 'plugin',
+                                    '--add-prefix', 'geez'],
+                                   'geez_plugin_FOO\nbin_BAR\n')
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(records[0], { 'name' : 'geez_plugin_FOO',
+                                       'category' : 'data',
+                                       'add_prefixes' : ['geez'],
+                                       'main_prefix' : 'plugin',
+                                       'primary' : 'FOO' })
+        self.assertEqual(records[1]['category'], 'invalid')
+        self.assertIn('error', records[1])
+
+    def test_dirs(self):
+        status, output = self._run(['dirs', 'prefix=/usr', '--only',
+                                    'bindir', '--only', 'libdir'])
+        self.assertEqual((status, output), (0, 'bindir\t/usr/bin\n'
+                                               'libdir\t/usr/lib\n'))
+        status, output = self._run(['dirs', '--format', 'sh', '--only',
+                                    'prefix', "prefix=/it's"])
+        self.assertEqual(output, "prefix='/it'\\''s'\n")
+        status, output = self._run(['dirs', '--format', 'json',
+                                    'prefix=/usr', '--exclude', 'bindir'])
+        resolved = json.loads(output)
+        self.assertEqual(resolved['sbindir'], '/usr/sbin')
+        self.assertNotIn('bindir', resolved)
+        self.assertIn('expected name=value', self._error(['dirs', 'prefix']))
+
+    def test_diff(self):
+        status, output = self._run(['diff', '--old', 'prefix=/usr',
+                                    '--new', 'prefix=/opt',
+                                    '--only', 'libdir'])
+        self.assertEqual((status, output),
+                         (1, 'libdir\tchanged\t/usr/lib\t/opt/lib\t'
+                             'exec_prefix\tprefix\n'))
+        status, output = self._run(['diff', '--old', 'prefix=/usr',
+                                    '--new', 'prefix=/usr'])
+        self.assertEqual((status, output), (0, ''))
+
+    def test_diff_files(self):
+        top = tempfile.mkdtemp()
+        try:
+            paths = []
+            for name, prefix in (('old', '/usr'), ('new', '/opt')):
+                status, output = self._run(['dirs', '--format', 'json',
+                                            'prefix=%s' % prefix])
+                paths.append(os.path.join(top, name + '.json'))
+                with open(paths[-1], 'w') as f:
+                    f.write(output)
+            status, output = self._run(['diff', '--format', 'json',
+                                        '--old-file', paths[0],
+                                        '--new-file', paths[1],
+                                        '--only', 'bindir'])
+            self.assertEqual(status, 1)
+            record = json.loads(output)
+            self.assertEqual((record['name'], record['new'],
+                              record['origins']),
+                             ('bindir', '/opt/bin', ['prefix']))
+            self.assertIn('used together',
+                          self._error(['diff', '--old-file', paths[0]]))
+        finally:
+            shutil.rmtree(top)
+
+    def test_uninstall(self):
+        top = tempfile.mkdtemp()
+        try:
+            source = os.path.join(top, 'foo')
+            with open(source, 'w') as f:
+                f.write('foo\n')
+            dest = os.path.join(top, 'stage', 'bin', 'foo')
+            manifest = os.path.join(top, 'manifest.txt')
+            cache_file = os.path.join(top, 'cache')
+            cache = Installer.InstallCache(cache_file)
+            Installer.execute_plan([('exec', 'bindir', source, dest)], 1,
+                                   cache, manifest = manifest)
+            cache.save()
+            status, output = self._run(['uninstall', '--dry-run', manifest])
+            self.assertEqual(output, '[dry run] 1 files, 2 directories '
+                                     'removed, 0 files missing\n')
+            self.assertTrue(os.path.exists(dest))
+            status, output = self._run(['uninstall', '--install-cache',
+                                        cache_file, manifest])
+            self.assertEqual((status, output), (0, '1 files, 2 directories '
+                                                   'removed, 0 files '
+                                                   'missing\n'))
+            self.assertFalse(os.path.exists(dest))
+            self.assertEqual(Installer.InstallCache(cache_file).info()[0], 0)
+            self.assertIn(manifest, self._error(['uninstall', manifest]))
+        finally:
+            shutil.rmtree(top)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,369 @@
+"""SConsGnuVariables.SharedCache
+
+Cache of results shared between processes.
+
+Concurrent SCons runs (e.g. building sub-projects of a monorepo) derive the
+same decompositions of uniform names and the same GNU directories over and
+over. A `SharedCache` keeps these results in a local SQLite database, opened
+in WAL mode, so that many processes may read it while others write. The
+entries are namespaced by a hash of the configuration that produced them
+(e.g. the user-defined primary names), so processes using different
+configurations never see each other's results. The cached values are pure
+functions of their keys, so concurrent writers may only ever store equal
+values; the first one wins. The values are stored as JSON (never pickled),
+and a database owned by another user is refused, so a planted database file
+can at most spoil the results, not run code in the build.
+
+The cache is optional. Use it explicitly:
+
+.. python::
+
+    from SConsGnuVariables import SharedCache
+    path = os.path.expanduser('~/.cache/scons-gnu-cache.sqlite')
+    cache = SharedCache.SharedCache(path)
+    parts = SharedCache.decompose_names(cache, names)
+    dirs = SharedCache.resolve_variables(cache, {'prefix' : '/usr'})
+
+or set the ``SCONSGNUVARIABLES_CACHE`` environment variable to the database
+path and use `default_cache()`. Hit rates, and the time spent in cold
+(computing) and warm (cache only) calls, are reported by
+`SConsGnuVariables.Instrumentation`.
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import json
+import hashlib
+import threading
+
+from SConsGnuVariables import AmScheme
+from SConsGnuVariables import GnuDirVariables
+
+# Name of the environment variable with path to the default cache.
+ENVIRONMENT_VARIABLE = 'SCONSGNUVARIABLES_CACHE'
+
+# Version of cached data; part of every namespace, so entries written by
+# incompatible versions of this module are never read.
+_cache_version = 3
+
+# Maximum number of keys per single SQL query.
+_max_query_keys = 500
+
+_schema = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID
+"""
+
+#############################################################################
+def config_hash(*parts):
+    """Return stable hash of configuration ``parts``.
+
+    The parts may be nested tuples, lists, sets, dictionaries, strings,
+    numbers, booleans and ``None``; sets and dictionaries are sorted, so
+    equal configurations always give equal hashes.
+    """
+    def normalize(obj):
+        if isinstance(obj, dict):
+            return ('d', tuple(sorted((normalize(k), normalize(v))
+                                      for k, v in obj.items())))
+        if isinstance(obj, (set, frozenset)):
+            return ('s', tuple(sorted(normalize(x) for x in obj)))
+        if isinstance(obj, (list, tuple)):
+            return ('t', tuple(normalize(x) for x in obj))
+        return obj
+    text = repr((_cache_version, normalize(parts)))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+#############################################################################
+def _check_owner(path):
+    """Raise `EnvironmentError` if existing ``path`` isn't owned by current
+    user (on systems with user ids)."""
+    getuid = getattr(os, 'getuid', None)
+    if getuid is None or not os.path.exists(path):
+        return
+    owner = os.stat(path).st_uid
+    if owner != getuid():
+        raise EnvironmentError("%s: cache database owned by another user "
+                               "(uid %d), refusing to use it" % (path, owner))
+
+#############################################################################
+class SharedCache(object):
+    """Key-value store in SQLite database shared by processes.
+
+    Values must be JSON-serializable; tuples are read back as lists.
+
+    :Ivariables:
+        path : str
+            path to the database
+        hits : int
+            number of keys found
+        misses : int
+            number of keys not found
+    """
+
+    def __init__(self, path, timeout=30.0):
+        """Open (or create) the database.
+
+        :Parameters:
+            path : str
+                the database file; if it exists, it must be owned by
+                current user
+            timeout : float
+                seconds to wait for locks held by other processes
+        """
+        import sqlite3
+        _check_owner(path)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout = timeout,
+                                           check_same_thread = False,
+                                           isolation_level = None)
+        try:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            pass    # e.g. on network filesystems; rollback journal then
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(_schema)
+        from SConsGnuVariables import Instrumentation
+        Instrumentation.register_cache('%s.SharedCache(%s)'
+                                       % (__name__, path), self.info)
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._connection.close()
+
+    def get_many(self, namespace, keys):
+        """Return ``{ key : value }`` for ``keys`` found in ``namespace``."""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for i in range(0, len(keys), _max_query_keys):
+                chunk = keys[i:i + _max_query_keys]
+                rows = self._connection.execute(
+                    'SELECT key, value FROM entries WHERE namespace = ? '
+                    'AND key IN (%s)' % ','.join('?' * len(chunk)),
+                    [namespace] + chunk)
+                for key, value in rows:
+                    found[key] = json.loads(value)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, namespace, items):
+        """Store ``(key, value)`` pairs in ``namespace``.
+
+        Existing entries are kept (the values of a key are expected to be
+        equal in all processes), all pairs are written in one transaction.
+        """
+        rows = [(namespace, key, json.dumps(value, separators = (',', ':')))
+                for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            connection = self._connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany('INSERT OR IGNORE INTO entries '
+                                       '(namespace, key, value) '
+                                       'VALUES (?, ?, ?)', rows)
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    def get(self, namespace, key, default=None):
+        """Return value of ``key`` in ``namespace``, or ``default``."""
+        return self.get_many(namespace, [key]).get(key, default)
+
+    def put(self, namespace, key, value):
+        """Store single ``value``, see `put_many()`."""
+        self.put_many(namespace, [(key, value)])
+
+    def clear(self, namespace=None):
+        """Remove all entries, or entries of ``namespace``."""
+        with self._lock:
+            if namespace is None:
+                self._connection.execute('DELETE FROM entries')
+            else:
+                self._connection.execute('DELETE FROM entries '
+                                         'WHERE namespace = ?', (namespace,))
+
+    def info(self):
+        """Return ``(hits, misses)`` tuple"""
+        return (self.hits, self.misses)
+
+#############################################################################
+_default_cache = None
+
+def default_cache():
+    """Return the cache named by ``SCONSGNUVARIABLES_CACHE`` environment
+    variable, or ``None`` if the variable is not set."""
+    global _default_cache
+    if _default_cache is None:
+        path = os.environ.get(ENVIRONMENT_VARIABLE)
+        if path:
+            _default_cache = SharedCache(path)
+    return _default_cache
+
+# Schemes used by `decompose_names()`, keyed by hash of their arguments.
+_schemes = {}
+
+#############################################################################
+def _scheme(args):
+    """Return `AmScheme.Scheme <SConsGnuVariables.AmScheme.Scheme>` for
+    decomposition arguments ``args``, compiled once per configuration."""
+    key = config_hash(*args)
+    try:
+        return _schemes[key]
+    except KeyError:
+        pass
+    primary_names, main_prefixes, add_prefixes = args[:3]
+    use_std_primary_names, use_std_main_prefixes, use_std_add_prefixes = \
+        args[3:]
+    scheme = AmScheme.Scheme(primary_names, main_prefixes, add_prefixes,
+                             use_std_primary_names = use_std_primary_names,
+                             use_std_main_prefixes = use_std_main_prefixes,
+                             use_std_add_prefixes = use_std_add_prefixes)
+    _schemes[key] = scheme
+    return scheme
+
+#############################################################################
+def _batch_result(entry):
+    """Return ``(ok, value)`` pair of `AmScheme.Scheme.decompose_results()
+    <SConsGnuVariables.AmScheme.Scheme.decompose_results>` from its JSON
+    form."""
+    ok, value = entry
+    if ok:
+        value = (list(value[0]), value[1], value[2])
+    return (ok, value)
+
+#############################################################################
+def _batch_values(results, ignore_errors):
+    """Return values of ``(ok, value)`` pairs, ``None`` for failures if
+    ``ignore_errors``, otherwise raise `ValueError` on first failure."""
+    values = []
+    for ok, value in results:
+        if ok:
+            values.append(value)
+        elif ignore_errors:
+            values.append(None)
+        else:
+            raise ValueError(value)
+    return values
+
+#############################################################################
+def decompose_names(cache, funames, primary_names=None, main_prefixes=None,
+                    add_prefixes=None, use_std_primary_names=True,
+                    use_std_main_prefixes=True, use_std_add_prefixes=True,
+                    workers=None, ignore_errors=False):
+    """Decompose uniform names, using shared ``cache``.
+
+    Same as `AmUniformNames.decompose_names()
+    <SConsGnuVariables.AmUniformNames.decompose_names>`, but names found in
+    ``cache`` are not decomposed again, and the results (including
+    failures) of the others are stored in ``cache`` for other processes.
+    The names are decomposed by an `AmScheme.Scheme
+    <SConsGnuVariables.AmScheme.Scheme>`, whose `content_hash()
+    <SConsGnuVariables.AmScheme.Scheme.content_hash>` namespaces the
+    entries.
+
+    :Parameters:
+        cache : `SharedCache` | None
+            the cache; if ``None``, the names are just decomposed
+        [others]
+            see `AmUniformNames.decompose_names()
+            <SConsGnuVariables.AmUniformNames.decompose_names>`
+    """
+    scheme = _scheme((primary_names, main_prefixes, add_prefixes,
+                      use_std_primary_names, use_std_main_prefixes,
+                      use_std_add_prefixes))
+    if cache is None:
+        return scheme.decompose_names(funames, workers, ignore_errors)
+    if not isinstance(funames, (list, tuple)):
+        funames = list(funames)
+    from SConsGnuVariables import Instrumentation
+    namespace = 'decompose:' + config_hash(scheme.content_hash())
+    timer = Instrumentation.timer(__name__ + '.decompose_names.warm')
+    with timer:
+        known = cache.get_many(namespace, set(funames))
+        for funame in known:
+            known[funame] = _batch_result(known[funame])
+        missing = sorted(set(funames).difference(known))
+        if missing:
+            timer.name = __name__ + '.decompose_names.cold'
+            computed = scheme.decompose_results(missing, workers)
+            cache.put_many(namespace, zip(missing, computed))
+            known.update(zip(missing, computed))
+        results = [known[funame] for funame in funames]
+    return _batch_values(results, ignore_errors)
+
+#############################################################################
+def resolve_variables(cache, overrides=None, **kw):
+    """Resolve GNU directory variables, using shared ``cache``.
+
+    Same as `GnuDirVariables.ResolveVariables()
+    <SConsGnuVariables.GnuDirVariables.ResolveVariables>`, which also keeps
+    its own per-process cache.
+
+    :Parameters:
+        cache : `SharedCache` | None
+            the cache; if ``None``, the variables are just resolved
+    """
+    if cache is None:
+        return GnuDirVariables.ResolveVariables(overrides, **kw)
+    key = config_hash(GnuDirVariables._config_key(overrides, **kw),
+                      GnuDirVariables._variable_templates)
+    from SConsGnuVariables import Instrumentation
+    timer = Instrumentation.timer(__name__ + '.resolve_variables.warm')
+    with timer:
+        result = cache.get('dirs', key)
+        if result is None:
+            timer.name = __name__ + '.resolve_variables.cold'
+            result = dict(GnuDirVariables.ResolveVariables(overrides, **kw))
+            cache.put('dirs', key, result)
+    return result
+
+#############################################################################
+def DecomposeNames(funames, **kw):
+    """Interface to `decompose_names()` with `default_cache()`"""
+    return decompose_names(default_cache(), funames, **kw)
+
+#############################################################################
+def ResolveVariables(overrides=None, **kw):
+    """Interface to `resolve_variables()` with `default_cache()`"""
+    return resolve_variables(default_cache(), overrides, **kw)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
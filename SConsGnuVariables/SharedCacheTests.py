@@ -0,0 +1,127 @@
+""" SConsGnuVariables.SharedCacheTests
+
+Unit tests for SConsGnuVariables.SharedCache
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from SConsGnuVariables import SharedCache
+from SConsGnuVariables import AmUniformNames
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.top = tempfile.mkdtemp()
+        self.path = os.path.join(self.top, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.top)
+
+    def test_get_put(self):
+        cache = SharedCache.SharedCache(self.path)
+        cache.put_many('ns', [('a', [1, 'x']), ('b', { 'k' : None })])
+        cache.put('ns', 'a', 'ignored, first value wins')
+        self.assertEqual(cache.get_many('ns', ['a', 'b', 'c']),
+                         { 'a' : [1, 'x'], 'b' : { 'k' : None } })
+        self.assertEqual(cache.get('other', 'a', 'default'), 'default')
+        self.assertEqual(cache.info(), (2, 2))
+        cache.clear('ns')
+        self.assertEqual(cache.get('ns', 'a'), None)
+
+    def test_values_are_json(self):
+        cache = SharedCache.SharedCache(self.path)
+        cache.put('ns', 'a', ['x', 1])
+        connection = sqlite3.connect(self.path)
+        value, = connection.execute('SELECT value FROM entries').fetchone()
+        connection.close()
+        self.assertEqual(value, '["x",1]')
+
+    def test_decompose_names(self):
+        names = ['bin_PROGRAMS', 'nobase_dist_data_DATA', 'bogus']
+        expected = [tuple(AmUniformNames.decompose_name(n)) for n in names[:2]]
+        for i in range(2):
+            cache = SharedCache.SharedCache(self.path)
+            result = SharedCache.decompose_names(cache, names,
+                                                 ignore_errors = True)
+            self.assertEqual([tuple(r) for r in result[:2]], expected)
+            self.assertEqual(result[2], None)
+        self.assertEqual(cache.info(), (3, 0))
+        self.assertRaises(ValueError, SharedCache.decompose_names, cache,
+                          ['bogus'])
+
+    def test_decompose_names_user_config(self):
+        cache = SharedCache.SharedCache(self.path)
+        result = SharedCache.decompose_names(cache, ['bin_FOOS'],
+                                             primary_names = ['FOOS'])
+        self.assertEqual([tuple(r) for r in result], [([], 'bin', 'FOOS')])
+        # same configuration given differently shares the entries
+        SharedCache.decompose_names(cache, ['bin_FOOS'],
+                                    primary_names = set(['FOOS']))
+        self.assertEqual(cache.info(), (1, 1))
+        # other configurations never see them
+        self.assertEqual(SharedCache.decompose_names(cache, ['bin_FOOS'],
+                                                     ignore_errors = True),
+                         [None])
+        self.assertEqual(cache.info(), (1, 2))
+
+    def test_decompose_names_without_cache(self):
+        names = ['bin_PROGRAMS', 'bogus']
+        self.assertEqual(SharedCache.decompose_names(None, names,
+                                                     ignore_errors = True),
+                         AmUniformNames.decompose_names(names,
+                                                        ignore_errors = True))
+        self.assertRaises(ValueError, SharedCache.decompose_names, None,
+                          names)
+
+    def test_resolve_variables(self):
+        cache = SharedCache.SharedCache(self.path)
+        first = SharedCache.resolve_variables(cache, { 'prefix' : '/usr' })
+        second = SharedCache.resolve_variables(cache, { 'prefix' : '/usr' })
+        self.assertEqual(dict(first), second)
+        self.assertEqual(second['bindir'], '/usr/bin')
+
+    def test_refuses_foreign_database(self):
+        if not hasattr(os, 'getuid') or os.getuid() != 0:
+            self.skipTest('needs root to change file owner')
+        SharedCache.SharedCache(self.path).close()
+        os.chown(self.path, 12345, 12345)
+        self.assertRaises(EnvironmentError, SharedCache.SharedCache,
+                          self.path)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,313 @@
+"""SConsGnuVariables.Subpackages
+
+Splitting of installed files into subpackages (e.g. runtime, -devel, -doc).
+
+Each installed file is described by its path and, optionally, the uniform
+name it was installed by (e.g. ``nobase_pkginclude_HEADERS``). A `Splitter`
+assigns every file to a subpackage according to declarative rules. The rules
+are matched against:
+
+    - the GNU directory containing the file (found by
+      `SConsGnuVariables.GnuDirTrie`), e.g. ``includedir``,
+    - the primary name from the uniform name, e.g. ``HEADERS``,
+    - the install category (``exec``, ``data`` or ``noinst``), taken from the
+      uniform name's main prefix, or, for files without uniform name, from
+      the directory (``bindir`` is ``exec``, ``datadir`` is ``data``, ...).
+
+A rule is a dictionary with ``package`` key (the subpackage name) and any of
+``directories``, ``primaries`` and ``categories`` keys (sequences of allowed
+values). A rule matches if all of its criteria match; the first matching rule
+wins, files not matched by any rule go to the default subpackage. For
+example::
+
+    rules = [
+        { 'package' : 'devel', 'primaries' : ['HEADERS'] },
+        { 'package' : 'devel', 'directories' : ['includedir'] },
+        { 'package' : 'doc', 'primaries' : ['MANS', 'TEXINFOS'] },
+        { 'package' : 'arch', 'categories' : ['exec'] },
+    ]
+
+The rules are evaluated once per distinct ``(directory, primary, category)``
+combination and the outcome is kept in a lookup table, so the per-file cost
+is a trie lookup and a dictionary lookup. The `Splitter.split()` generator
+processes file lists of any size in constant memory. Install manifests
+written by `SConsGnuVariables.Installer` are split by
+`Splitter.split_manifest()`, which takes the GNU directory of each file
+from the manifest.
+
+**Example**
+
+.. python::
+
+    from SConsGnuVariables import Subpackages
+    splitter = Subpackages.BuildSplitter(overrides = {'prefix' : '/usr'})
+    pairs = splitter.split_manifest('install-manifest.txt')
+    Subpackages.WriteFileLists(pairs, 'pkg/%s.files')
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+from SConsGnuVariables import AmUniformNames
+from SConsGnuVariables import GnuDirTrie
+
+#############################################################################
+def _man_directories():
+    return tuple(['mandir'] + ['man%sdir' % s
+                 for s in AmUniformNames.standard_man_sections()])
+
+# Rules used when none are given.
+default_rules = (
+    { 'package' : 'devel', 'primaries' : ('HEADERS',) },
+    { 'package' : 'devel',
+      'directories' : ('includedir', 'oldincludedir', 'pkgincludedir') },
+    { 'package' : 'doc', 'primaries' : ('MANS', 'TEXINFOS') },
+    { 'package' : 'doc',
+      'directories' : ('docdir', 'htmldir', 'dvidir', 'pdfdir', 'psdir',
+                       'infodir') + _man_directories() },
+)
+
+# Subpackage of files not matched by any rule, when not given.
+default_package = 'runtime'
+
+_rule_keys = ('directories', 'primaries', 'categories')
+
+#############################################################################
+def _compile_rules(rules):
+    """Validate rules and convert their criteria to frozensets."""
+    compiled = []
+    for rule in rules:
+        try:
+            package = rule['package']
+        except KeyError:
+            raise ValueError("rule %r has no 'package'" % (rule,))
+        unknown = set(rule) - set(_rule_keys) - set(['package'])
+        if unknown:
+            raise ValueError("unknown keys %r in rule %r"
+                             % (sorted(unknown), rule))
+        criteria = tuple((key, frozenset(rule[key])) for key in _rule_keys
+                         if rule.get(key) is not None)
+        compiled.append((package, criteria))
+    return tuple(compiled)
+
+#############################################################################
+def _directory_category(name):
+    """Install category of files placed in directory variable ``name``.
+
+    The directory variable is mapped to main prefix (``bindir`` -> ``bin``).
+    Returns ``None`` for ``prefix``, ``exec_prefix`` and unknown names.
+    """
+    if name is None or not name.endswith('dir'):
+        return None
+    return AmUniformNames.install_category(name[:-3])
+
+#############################################################################
+class Splitter(object):
+    """Assigns installed files to subpackages, see module documentation."""
+
+    def __init__(self, trie, rules=None, default=None, **kw):
+        """Create splitter.
+
+        :Parameters:
+            trie : `GnuDirTrie.DirectoryTrie`
+                trie of resolved GNU directories
+            rules : sequence | None
+                rules (see module documentation); `default_rules` if ``None``
+            default : str | None
+                subpackage for files not matched by any rule;
+                `default_package` if ``None``
+        :Keywords:
+            [all]
+                passed to `decompose_name()
+                <SConsGnuVariables.AmUniformNames.decompose_name>` and
+                `install_category()
+                <SConsGnuVariables.AmUniformNames.install_category>` when
+                processing uniform names (e.g. ``primary_names``)
+        """
+        if rules is None:
+            rules = default_rules
+        if default is None:
+            default = default_package
+        self.trie = trie
+        self.default = default
+        self._rules = _compile_rules(rules)
+        self._kw = kw
+        self._table = {}        # (directory, primary, category) -> package
+        self._names = {}        # uniform name -> (primary, category)
+
+    def _evaluate(self, key):
+        """Evaluate rules for ``(directory, primary, category)`` key."""
+        values = dict(zip(_rule_keys, key))
+        for package, criteria in self._rules:
+            for criterion, allowed in criteria:
+                if values[criterion] not in allowed:
+                    break
+            else:
+                return package
+        return self.default
+
+    def _uniform_name(self, funame):
+        """Return ``(primary, category)`` for uniform name, cached."""
+        try:
+            return self._names[funame]
+        except KeyError:
+            pass
+        kw = self._kw
+        try:
+            prefixes, main_prefix, primary = AmUniformNames.DecomposeName(
+                funame, **kw)
+        except ValueError:
+            info = (None, None)
+        else:
+            category = AmUniformNames.InstallCategory(main_prefix, **kw)
+            info = (primary, category)
+        self._names[funame] = info
+        return info
+
+    def assign(self, path, funame=None, directory=None):
+        """Return subpackage for single file.
+
+        :Parameters:
+            path : str
+                installed path of the file
+            funame : str | None
+                uniform name the file was installed by, if known
+            directory : str | None
+                GNU directory variable the file was installed to, if known;
+                otherwise it's found by looking ``path`` up in the trie
+        :Returns:
+            tuple ``(package, directory)``, where ``directory`` is the name
+            of GNU directory variable containing ``path`` (or ``None``)
+        """
+        if directory is None:
+            directory = self.trie.lookup(path)[0]
+        if funame:
+            primary, category = self._uniform_name(funame)
+            if category is None:
+                category = _directory_category(directory)
+        else:
+            primary, category = None, _directory_category(directory)
+        key = (directory, primary, category)
+        try:
+            package = self._table[key]
+        except KeyError:
+            package = self._evaluate(key)
+            self._table[key] = package
+        return package, directory
+
+    def split(self, entries):
+        """Split stream of manifest entries into subpackages.
+
+        :Parameters:
+            entries : iterable
+                paths, or ``(path, funame)`` pairs; paths may end with
+                newline, so an open file listing one path per line may be
+                passed directly; empty lines are skipped; for install
+                manifests use `split_manifest()`
+        :Returns:
+            generator of ``(package, path)`` pairs, in input order
+        """
+        assign = self.assign
+        for entry in entries:
+            if isinstance(entry, tuple):
+                path, funame = entry
+            else:
+                path, funame = entry.rstrip('\n'), None
+            if not path:
+                continue
+            yield assign(path, funame)[0], path
+
+    def split_manifest(self, manifest):
+        """Split files recorded in install manifest into subpackages.
+
+        :Parameters:
+            manifest : str | tuple
+                path of manifest written by `Installer.append_manifest()
+                <SConsGnuVariables.Installer.append_manifest>`, or
+                ``(files, directories)`` as returned by
+                `Installer.read_manifest()
+                <SConsGnuVariables.Installer.read_manifest>`
+        :Returns:
+            generator of ``(package, path)`` pairs, in manifest order
+        """
+        if isinstance(manifest, str):
+            from SConsGnuVariables import Installer
+            manifest = Installer.read_manifest(manifest)
+        assign = self.assign
+        for directory, path in manifest[0]:
+            yield assign(path, None, directory)[0], path
+
+#############################################################################
+def BuildSplitter(rules=None, default=None, overrides=None, priority=None,
+                  **kw):
+    """Create `Splitter` for GNU directories resolved with ``overrides``.
+
+    :Parameters:
+        rules, default
+            see `Splitter.__init__()`
+        overrides, priority
+            see `GnuDirTrie.BuildDirectoryTrie()
+            <SConsGnuVariables.GnuDirTrie.BuildDirectoryTrie>`
+    :Keywords:
+        [all]
+            see `Splitter.__init__()`
+    """
+    trie = GnuDirTrie.BuildDirectoryTrie(overrides, priority)
+    return Splitter(trie, rules, default, **kw)
+
+#############################################################################
+def WriteFileLists(pairs, pattern):
+    """Write ``(package, path)`` pairs to per-package file lists.
+
+    The lists are written as the pairs arrive, one path per line, so the
+    whole manifest is never held in memory.
+
+    :Parameters:
+        pairs : iterable
+            ``(package, path)`` pairs, e.g. from `Splitter.split()`
+        pattern : str
+            file name pattern with single ``%s``, replaced with package name
+    :Returns:
+        dictionary ``{ package : number_of_files }``
+    """
+    files = {}
+    counts = {}
+    try:
+        for package, path in pairs:
+            try:
+                f = files[package]
+            except KeyError:
+                f = files[package] = open(pattern % package, 'w')
+                counts[package] = 0
+            f.write(path + '\n')
+            counts[package] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
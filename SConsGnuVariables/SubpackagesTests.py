@@ -0,0 +1,139 @@
+""" SConsGnuVariables.SubpackagesTests
+
+Unit tests for SConsGnuVariables.Subpackages
+"""
+
+__docformat__ = "restructuredText"
+
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from SConsGnuVariables import Installer
+from SConsGnuVariables import Subpackages
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.splitter = Subpackages.BuildSplitter(
+            overrides = { 'prefix' : '/usr', 'package' : 'foo' })
+
+    def test_default_rules(self):
+        split = dict((path, package) for package, path in
+                     self.splitter.split(['/usr/bin/foo\n', '\n',
+                                          '/usr/include/foo/a.h\n',
+                                          '/usr/share/man/man1/foo.1',
+                                          '/usr/share/foo/data.txt',
+                                          '/opt/elsewhere']))
+        self.assertEqual(split, { '/usr/bin/foo' : 'runtime',
+                                  '/usr/include/foo/a.h' : 'devel',
+                                  '/usr/share/man/man1/foo.1' : 'doc',
+                                  '/usr/share/foo/data.txt' : 'runtime',
+                                  '/opt/elsewhere' : 'runtime' })
+
+    def test_first_matching_rule_wins(self):
+        rules = [ { 'package' : 'arch-headers', 'primaries' : ['HEADERS'],
+                    'categories' : ['exec'] },
+                  { 'package' : 'devel', 'primaries' : ['HEADERS'] },
+                  { 'package' : 'arch', 'categories' : ['exec'] },
+                  { 'package' : 'never', 'primaries' : ['HEADERS'] } ]
+        splitter = Subpackages.BuildSplitter(rules, 'main',
+                                             { 'prefix' : '/usr' })
+        assign = splitter.assign
+        self.assertEqual(assign('/usr/include/a.h', 'include_HEADERS'),
+                         ('devel', 'includedir'))
+        self.assertEqual(assign('/usr/lib/b.h', 'lib_HEADERS')[0],
+                         'arch-headers')
+        self.assertEqual(assign('/usr/bin/foo', 'bin_PROGRAMS')[0], 'arch')
+        self.assertEqual(assign('/usr/bin/foo')[0], 'arch')
+        self.assertEqual(assign('/usr/share/x')[0], 'main')
+        self.assertEqual(assign('/usr/share/x', 'bogus')[0], 'main')
+
+    def test_lookup_table(self):
+        splitter = self.splitter
+        for i in range(100):
+            splitter.assign('/usr/include/foo/h%d.h' % i, 'pkginclude_HEADERS')
+            splitter.assign('/usr/bin/p%d' % i)
+        self.assertEqual(sorted(splitter._table.items()), [
+            (('bindir', None, 'exec'), 'runtime'),
+            (('pkgincludedir', 'HEADERS', 'data'), 'devel') ])
+        self.assertEqual(list(splitter._names), ['pkginclude_HEADERS'])
+
+    def test_invalid_rules(self):
+        self.assertRaises(ValueError, Subpackages.BuildSplitter,
+                          [{ 'primaries' : ['HEADERS'] }])
+        self.assertRaises(ValueError, Subpackages.BuildSplitter,
+                          [{ 'package' : 'x', 'primary' : ['HEADERS'] }])
+
+    def test_split_manifest(self):
+        top = tempfile.mkdtemp()
+        try:
+            manifest = os.path.join(top, 'manifest.txt')
+            Installer.append_manifest(manifest, [
+                ('bindir', '/usr/bin/foo'),
+                ('pkgincludedir', '/usr/include/foo/detail/a.h'),
+                ('datadir', '/usr/include/foo/not-a-header'),
+                ('man1dir', '/usr/share/man/man1/foo.1') ],
+                ['/usr/include/foo'])
+            # the directory is taken from the manifest, not guessed
+            expected = [ ('runtime', '/usr/bin/foo'),
+                         ('devel', '/usr/include/foo/detail/a.h'),
+                         ('runtime', '/usr/include/foo/not-a-header'),
+                         ('doc', '/usr/share/man/man1/foo.1') ]
+            self.assertEqual(sorted(self.splitter.split_manifest(manifest),
+                                    key = lambda x : x[1]), expected)
+            files = Installer.read_manifest(manifest)
+            self.assertEqual(sorted(self.splitter.split_manifest(files),
+                                    key = lambda x : x[1]), expected)
+        finally:
+            shutil.rmtree(top)
+
+    def test_write_file_lists(self):
+        top = tempfile.mkdtemp()
+        try:
+            pairs = [ ('runtime', '/usr/bin/foo'), ('devel', '/usr/a.h'),
+                      ('runtime', '/usr/bin/bar') ]
+            pattern = os.path.join(top, '%s.files')
+            counts = Subpackages.WriteFileLists(iter(pairs), pattern)
+            self.assertEqual(counts, { 'runtime' : 2, 'devel' : 1 })
+            with open(pattern % 'runtime') as f:
+                self.assertEqual(f.read(), '/usr/bin/foo\n/usr/bin/bar\n')
+            with open(pattern % 'devel') as f:
+                self.assertEqual(f.read(), '/usr/a.h\n')
+            self.assertEqual(sorted(os.listdir(top)),
+                             ['devel.files', 'runtime.files'])
+        finally:
+            shutil.rmtree(top)
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCase)
+    unittest.TextTestRunner(verbosity = 2).run(suite)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -1,3 +1,9 @@
+"""SCons support for GNU variables.
+
+The submodules are not imported together with the package. They're loaded on
+first attribute access instead (e.g. ``SConsGnuVariables.GnuDirVariables``),
+so that ``import SConsGnuVariables`` stays cheap.
+"""
 #
 # Copyright (c) 2012 by Pawel Tomulik
 # 
@@ -18,3 +24,22 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE
+
+__docformat__ = 'restructuredText'
+
+__all__ = [ 'AmInstall', 'AmMakefiles', 'AmNameScanner', 'AmScheme',
+            'AmUniformNames', 'GnuDirFiles', 'GnuDirTrie', 'GnuDirVariables',
+            'Installer', 'Instrumentation', 'SharedCache', 'Subpackages' ]
+
+def __getattr__(name):
+    # Lazy loading of submodules (PEP 562)
+    if name in __all__:
+        import importlib
+        return importlib.import_module('%s.%s' % (__name__, name))
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+# Instrumentation is imported only when requested by the environment
+# variable, see SConsGnuVariables.Instrumentation.
+from os import environ as _environ
+if _environ.get('SCONSGNUVARIABLES_PROFILE', '0') not in ('', '0'):
+    from SConsGnuVariables import Instrumentation
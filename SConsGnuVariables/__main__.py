@@ -0,0 +1,298 @@
+"""Command-line interface to SConsGnuVariables
+
+Gives non-SCons tools (spec file generators, shell installers, ...) the same
+answers as `SConsGnuVariables.AmUniformNames` and
+`SConsGnuVariables.GnuDirVariables`, without running SCons.
+
+**Usage**::
+
+    python -m SConsGnuVariables classify [options] < names.txt
+    python -m SConsGnuVariables dirs [options] [name=value ...]
+    python -m SConsGnuVariables diff [options]
+    python -m SConsGnuVariables uninstall [options] MANIFEST
+
+The ``classify`` subcommand reads uniform names from standard input (one
+per line) and writes one record per name to standard output, either as
+tab-separated values (``--format tsv``, the default)::
+
+    name    category    add_prefixes    main_prefix    primary
+
+or as JSON lines (``--format json``). The category is one of ``exec``,
+``data``, ``noinst`` or ``invalid``; for invalid names the remaining fields
+are replaced with an error message. The input is processed in batches of
+``--batch-size`` lines, so memory usage doesn't depend on input size.
+
+The ``dirs`` subcommand prints GNU directory variables resolved for given
+overrides (e.g. ``prefix=/usr``) as TSV, JSON or shell assignments
+(``--format sh``).
+
+The ``diff`` subcommand compares two configurations, given either as
+overrides (``--old name=value``, ``--new name=value``) or as files written by
+``dirs --format json`` (``--old-file``, ``--new-file``), and prints one
+record per changed, added or removed variable::
+
+    name    status    old    new    causes    origins
+
+where ``causes`` are the variables whose change directly caused the change
+(e.g. ``exec_prefix`` for ``libdir``) and ``origins`` are the variables
+which changed by themselves (see `SConsGnuVariables.GnuDirVariables.DiffResolved`).
+Like ``diff(1)``, it exits with status 1 when the configurations differ.
+
+The ``uninstall`` subcommand removes files and directories recorded in an
+install manifest (see `SConsGnuVariables.Installer.uninstall`), and drops
+their records from the ``--install-cache`` file, if given.
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import sys
+
+#############################################################################
+def _read_batches(stream, size):
+    """Yield lists of at most ``size`` non-empty, stripped lines."""
+    batch = []
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        batch.append(line)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+#############################################################################
+def _classify_batch(names, scheme):
+    """Classify batch of names, yields ``(name, category, decomposition)``
+    triples, where ``decomposition`` is an error message for invalid
+    names."""
+    for name in names:
+        try:
+            value = scheme.decompose(name)
+        except ValueError as e:
+            yield name, 'invalid', str(e)
+            continue
+        yield name, scheme.install_category(value[1]) or 'invalid', value
+
+#############################################################################
+def _classify(args, stdin, stdout):
+    import json
+    from SConsGnuVariables import AmScheme
+    scheme = AmScheme.Scheme(args.primary_names, args.main_prefixes,
+                             args.add_prefixes)
+    write = stdout.write
+    for batch in _read_batches(stdin, args.batch_size):
+        for name, category, value in _classify_batch(batch, scheme):
+            if args.format == 'json':
+                record = { 'name' : name, 'category' : category }
+                if isinstance(value, tuple):
+                    record['add_prefixes'] = value[0]
+                    record['main_prefix'] = value[1]
+                    record['primary'] = value[2]
+                else:
+                    record['error'] = value
+                write(json.dumps(record, sort_keys = True) + '\n')
+            elif isinstance(value, tuple):
+                write('%s\t%s\t%s\t%s\t%s\n' % (name, category,
+                      ','.join(value[0]), value[1], value[2]))
+            else:
+                write('%s\t%s\t%s\n' % (name, category, value))
+    return 0
+
+#############################################################################
+def _parse_overrides(items):
+    overrides = {}
+    for item in items:
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError("expected name=value, got %r" % item)
+        overrides[name] = value
+    return overrides
+
+#############################################################################
+def _shell_quote(value):
+    return "'" + value.replace("'", "'\\''") + "'"
+
+#############################################################################
+def _dirs(args, stdin, stdout):
+    from SConsGnuVariables import GnuDirVariables
+    overrides = _parse_overrides(args.overrides)
+    kw = {}
+    if args.only:
+        kw['only'] = args.only
+    if args.exclude:
+        kw['exclude'] = args.exclude
+    resolved = GnuDirVariables.ResolveVariables(overrides, **kw)
+    names = [n for n in GnuDirVariables.SupportedVariables() if n in resolved]
+    if args.format == 'json':
+        import json
+        json.dump(dict((n, resolved[n]) for n in names), stdout, indent = 2,
+                  sort_keys = True)
+        stdout.write('\n')
+    elif args.format == 'sh':
+        for name in names:
+            stdout.write('%s=%s\n' % (name, _shell_quote(resolved[name])))
+    else:
+        for name in names:
+            stdout.write('%s\t%s\n' % (name, resolved[name]))
+    return 0
+
+#############################################################################
+def _load_resolved(path):
+    import json
+    with open(path) as stream:
+        resolved = json.load(stream)
+    if not isinstance(resolved, dict):
+        raise ValueError("%s: expected JSON object" % path)
+    return resolved
+
+#############################################################################
+def _diff(args, stdin, stdout):
+    from SConsGnuVariables import GnuDirVariables
+    kw = {}
+    if args.only:
+        kw['only'] = args.only
+    if args.exclude:
+        kw['exclude'] = args.exclude
+    if args.old_file or args.new_file:
+        if not (args.old_file and args.new_file):
+            raise ValueError("--old-file and --new-file must be used together")
+        diffs = GnuDirVariables.DiffResolved(_load_resolved(args.old_file),
+                                             _load_resolved(args.new_file),
+                                             **kw)
+    else:
+        diffs = GnuDirVariables.DiffVariables(_parse_overrides(args.old or []),
+                                              _parse_overrides(args.new or []),
+                                              **kw)
+    if args.format == 'json':
+        import json
+        for diff in diffs:
+            stdout.write(json.dumps(diff, sort_keys = True) + '\n')
+    else:
+        for diff in diffs:
+            stdout.write('%s\t%s\t%s\t%s\t%s\t%s\n' % (diff['name'],
+                         diff['status'],
+                         '' if diff['old'] is None else diff['old'],
+                         '' if diff['new'] is None else diff['new'],
+                         ','.join(diff['causes']), ','.join(diff['origins'])))
+    return 1 if diffs else 0
+
+#############################################################################
+def _uninstall(args, stdin, stdout):
+    from SConsGnuVariables import Installer
+    cache = None
+    if args.install_cache:
+        cache = Installer.InstallCache(args.install_cache)
+    result = Installer.uninstall(args.manifest, args.dry_run, cache)
+    if cache is not None:
+        cache.save()
+    stdout.write('%s%d files, %d directories removed, %d files missing\n'
+                 % ('[dry run] ' if args.dry_run else '', result['files'],
+                    result['directories'], result['missing']))
+    return 0
+
+#############################################################################
+def _argument_parser():
+    import argparse
+    parser = argparse.ArgumentParser(prog = 'python -m SConsGnuVariables',
+        description = 'Automake uniform names and GNU directory variables')
+    subparsers = parser.add_subparsers(dest = 'command')
+    subparsers.required = True
+
+    p = subparsers.add_parser('classify',
+        help = 'classify uniform names read from standard input')
+    p.add_argument('--format', choices = ('tsv', 'json'), default = 'tsv')
+    p.add_argument('--primary-name', dest = 'primary_names',
+        action = 'append', metavar = 'NAME',
+        help = 'user-defined primary name (may be repeated)')
+    p.add_argument('--main-prefix', dest = 'main_prefixes',
+        action = 'append', metavar = 'PREFIX',
+        help = 'user-defined main prefix (may be repeated)')
+    p.add_argument('--add-prefix', dest = 'add_prefixes',
+        action = 'append', metavar = 'PREFIX',
+        help = 'user-defined additional prefix (may be repeated)')
+    p.add_argument('--batch-size', type = int, default = 4096,
+        help = 'number of names processed at once (default: 4096)')
+    p.set_defaults(function = _classify)
+
+    p = subparsers.add_parser('dirs',
+        help = 'print resolved GNU directory variables')
+    p.add_argument('overrides', nargs = '*', metavar = 'name=value',
+        help = 'override a variable, e.g. prefix=/usr')
+    p.add_argument('--format', choices = ('tsv', 'json', 'sh'),
+        default = 'tsv')
+    p.add_argument('--only', action = 'append', metavar = 'NAME',
+        help = 'print only this variable (may be repeated)')
+    p.add_argument('--exclude', action = 'append', metavar = 'NAME',
+        help = 'do not print this variable (may be repeated)')
+    p.set_defaults(function = _dirs)
+
+    p = subparsers.add_parser('diff',
+        help = 'compare GNU directory variables of two configurations')
+    p.add_argument('--old', action = 'append', metavar = 'name=value',
+        help = 'override in old configuration (may be repeated)')
+    p.add_argument('--new', action = 'append', metavar = 'name=value',
+        help = 'override in new configuration (may be repeated)')
+    p.add_argument('--old-file', metavar = 'FILE',
+        help = 'old variables, as written by dirs --format json')
+    p.add_argument('--new-file', metavar = 'FILE',
+        help = 'new variables, as written by dirs --format json')
+    p.add_argument('--format', choices = ('tsv', 'json'), default = 'tsv')
+    p.add_argument('--only', action = 'append', metavar = 'NAME',
+        help = 'compare only this variable (may be repeated)')
+    p.add_argument('--exclude', action = 'append', metavar = 'NAME',
+        help = 'do not compare this variable (may be repeated)')
+    p.set_defaults(function = _diff)
+
+    p = subparsers.add_parser('uninstall',
+        help = 'remove files recorded in install manifest')
+    p.add_argument('manifest', metavar = 'MANIFEST')
+    p.add_argument('--dry-run', action = 'store_true',
+        help = 'only count what would be removed')
+    p.add_argument('--install-cache', metavar = 'FILE',
+        help = 'install cache whose records of removed files are dropped')
+    p.set_defaults(function = _uninstall)
+    return parser
+
+#############################################################################
+def main(argv=None, stdin=None, stdout=None):
+    """Entry point of ``python -m SConsGnuVariables``"""
+    if stdin is None:   stdin = sys.stdin
+    if stdout is None:  stdout = sys.stdout
+    parser = _argument_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.function(args, stdin, stdout)
+    except (ValueError, EnvironmentError) as e:
+        parser.error(str(e))
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,110 @@
+"""Import-time benchmark for SConsGnuVariables
+
+Every SConscript process pays the cost of importing this package, so the
+import time and memory are kept under a budget. The benchmark imports the
+package and its submodules in fresh interpreters and reports the median
+time and the peak memory allocated (as seen by ``tracemalloc``).
+
+Run from top-level directory::
+
+    python benchmarks/bench_import.py [--runs N] [--time-budget MS]
+                                      [--memory-budget KIB]
+
+The script exits with status 1 if any budget is exceeded.
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import sys
+import json
+import subprocess
+
+_top_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_modules = [
+    'SConsGnuVariables',
+    'SConsGnuVariables.AmUniformNames',
+    'SConsGnuVariables.GnuDirVariables',
+]
+
+# Code run in a fresh interpreter for each measurement.
+_probe = """
+import sys, json, time, tracemalloc
+sys.path.insert(0, %(top)r)
+tracemalloc.start()
+t0 = time.perf_counter()
+import importlib
+importlib.import_module(%(module)r)
+t1 = time.perf_counter()
+current, peak = tracemalloc.get_traced_memory()
+json.dump({'time' : t1 - t0, 'peak' : peak, 'current' : current}, sys.stdout)
+"""
+
+def measure(module, runs):
+    """Import ``module`` in ``runs`` fresh interpreters and return a
+    dictionary with median time (seconds) and worst peak/retained memory
+    (bytes)."""
+    samples = []
+    for i in range(runs):
+        code = _probe % { 'top' : _top_dir, 'module' : module }
+        out = subprocess.check_output([sys.executable, '-c', code])
+        samples.append(json.loads(out.decode('ascii')))
+    times = sorted(s['time'] for s in samples)
+    return { 'time'     : times[len(times) // 2],
+             'peak'     : max(s['peak'] for s in samples),
+             'current'  : max(s['current'] for s in samples) }
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=11)
+    parser.add_argument('--time-budget', type=float, default=20.0,
+                        help = 'maximum median import time, in ms')
+    parser.add_argument('--memory-budget', type=float, default=256.0,
+                        help = 'maximum peak memory during import, in KiB')
+    args = parser.parse_args(argv)
+
+    status = 0
+    print('%-36s %10s %12s %12s' % ('module', 'time [ms]', 'peak [KiB]',
+                                    'kept [KiB]'))
+    for module in _modules:
+        res = measure(module, args.runs)
+        ms, peak, kept = res['time'] * 1e3, res['peak'] / 1024.0, \
+                         res['current'] / 1024.0
+        flag = ''
+        if ms > args.time_budget or peak > args.memory_budget:
+            flag = '  OVER BUDGET'
+            status = 1
+        print('%-36s %10.3f %12.1f %12.1f%s' % (module, ms, peak, kept, flag))
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,203 @@
+"""Memory benchmark for AmUniformNames decomposition results
+
+Decomposes synthetic sets of uniform names (10^4 - 10^6 names by default)
+and keeps the results, as a build would do for every file of a
+distribution. For each representation of the results, the peak and
+retained memory are measured with ``tracemalloc`` and the top allocation
+sites are listed.
+
+Compared representations:
+
+    list+tuple
+        what `decompose_name()` returns, ``([add, ...], main, primary)``
+    tuple+intern
+        ``((add, ...), main, primary)`` with interned strings
+    shared
+        one shared ``((add, ...), main, primary)`` tuple per distinct name
+    codes
+        three ``array('H')`` columns holding indices into symbol tables
+        (main prefixes, primary names and distinct additional prefix tuples)
+
+Run from top-level directory::
+
+    python benchmarks/bench_memory.py [--sizes 10000,100000,1000000]
+                                      [--top N] [--only REPR]
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import sys
+import gc
+import random
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SConsGnuVariables import AmUniformNames
+
+#############################################################################
+def synthetic_names(count, seed=0):
+    """Return list of ``count`` valid uniform names.
+
+    Each name is a separate string object, as if read from different
+    SConscripts.
+    """
+    rng = random.Random(seed)
+    table = AmUniformNames.standard_primary_main_prefixes()
+    mains = frozenset(AmUniformNames.standard_main_prefixes())
+    pairs = [(m, p) for p in sorted(table) for m in table[p] if m in mains]
+    adds = [(), (), (), ('dist',), ('nodist',), ('nobase',),
+            ('nodist', 'nobase'), ('notrans',)]
+    names = []
+    for i in range(count):
+        main, primary = rng.choice(pairs)
+        names.append('_'.join(rng.choice(adds) + (main, primary)))
+    return names
+
+#############################################################################
+def build_list_tuple(names):
+    decompose = AmUniformNames.decompose_name
+    return [decompose(n) for n in names]
+
+#############################################################################
+def build_tuple_intern(names):
+    decompose = AmUniformNames.decompose_name
+    intern = sys.intern
+    result = []
+    for n in names:
+        adds, main, primary = decompose(n)
+        result.append((tuple(intern(a) for a in adds), intern(main),
+                       intern(primary)))
+    return result
+
+#############################################################################
+def build_shared(names):
+    decompose = AmUniformNames.decompose_name
+    cache = {}
+    result = []
+    for n in names:
+        try:
+            result.append(cache[n])
+        except KeyError:
+            adds, main, primary = decompose(n)
+            item = (tuple(adds), main, primary)
+            cache[n] = item
+            result.append(item)
+    return result
+
+#############################################################################
+def build_codes(names):
+    decompose = AmUniformNames.decompose_name
+    symbols = [{}, {}, {}]          # adds tuple, main, primary -> code
+    columns = (array('H'), array('H'), array('H'))
+    decomposed = {}
+    for n in names:
+        try:
+            codes = decomposed[n]
+        except KeyError:
+            adds, main, primary = decompose(n)
+            parts = (tuple(adds), main, primary)
+            codes = tuple(table.setdefault(part, len(table))
+                          for table, part in zip(symbols, parts))
+            decomposed[n] = codes
+        for column, code in zip(columns, codes):
+            column.append(code)
+    decomposed.clear()
+    return symbols, columns
+
+_representations = [
+    ('list+tuple',   build_list_tuple),
+    ('tuple+intern', build_tuple_intern),
+    ('shared',       build_shared),
+    ('codes',        build_codes),
+]
+
+#############################################################################
+def measure(build, names, top):
+    """Build a representation of decomposed ``names`` and return
+    ``(peak, retained, sites)``, where ``sites`` lists the top allocation
+    sites of the retained memory."""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.clear_traces()
+    result = build(names)
+    retained, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    sites = []
+    for stat in snapshot.statistics('lineno')[:top]:
+        frame = stat.traceback[0]
+        sites.append(('%s:%d' % (os.path.basename(frame.filename),
+                                 frame.lineno), stat.size, stat.count))
+    return peak, retained, sites
+
+#############################################################################
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('--sizes', default = '10000,100000,1000000',
+                        help = 'comma-separated numbers of names')
+    parser.add_argument('--top', type = int, default = 3,
+                        help = 'number of allocation sites to show')
+    parser.add_argument('--only', action = 'append',
+                        choices = [r[0] for r in _representations],
+                        help = 'measure only this representation')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    representations = [r for r in _representations
+                       if not args.only or r[0] in args.only]
+    for size in sizes:
+        names = synthetic_names(size)
+        print('%d names' % size)
+        print('  %-14s %12s %12s %10s' % ('representation', 'peak [KiB]',
+                                          'kept [KiB]', 'B/name'))
+        details = []
+        for label, build in representations:
+            peak, retained, sites = measure(build, names, args.top)
+            print('  %-14s %12.1f %12.1f %10.1f' % (label, peak / 1024.0,
+                  retained / 1024.0, float(retained) / size))
+            details.append((label, sites))
+        for label, sites in details:
+            print('  %s, top allocation sites:' % label)
+            for site, nbytes, count in sites:
+                print('    %-40s %12.1f KiB %10d blocks' % (site,
+                      nbytes / 1024.0, count))
+        print('')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
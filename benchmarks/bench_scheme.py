@@ -0,0 +1,127 @@
+"""Serialization benchmark for compiled AmScheme.Scheme
+
+Measures how long it takes to make a naming scheme configuration available
+in another process (or to load it from a cache file), and how large the
+serialized form is. Compared ways:
+
+    loose
+        pickled keyword arguments (user primaries, prefixes and forbid
+        tables), compiled into `Scheme` after loading
+    scheme
+        pickled compiled `Scheme`, used as loaded
+
+Each configuration has ``N`` user-defined primary names and main prefixes
+(``--users``), and forbid tables of the same size. Every round-trip is
+checked to yield a scheme with same content hash.
+
+Run from top-level directory::
+
+    python benchmarks/bench_scheme.py [--users 0,10,100,1000] [--repeat N]
+"""
+
+#
+# Copyright (c) 2012 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import sys
+import time
+import pickle
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SConsGnuVariables import AmScheme
+
+#############################################################################
+def synthetic_config(count):
+    """Return keyword arguments of `AmScheme.Scheme` with ``count``
+    user-defined names of each kind."""
+    primaries = ['PRIMARY%d' % i for i in range(count)]
+    mains = ['main%d' % i for i in range(count)]
+    adds = ['add%d' % i for i in range(count)]
+    return { 'primary_names'                : primaries,
+             'main_prefixes'                : mains,
+             'add_prefixes'                 : adds,
+             'primary_main_prefixes'        : dict((p, [m]) for p, m in
+                                                   zip(primaries, mains)),
+             'forbid_main_add_prefixes'     : dict((m, [a]) for m, a in
+                                                   zip(mains, adds)) }
+
+#############################################################################
+def best_time(function, repeat):
+    best = None
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+#############################################################################
+def measure(config, repeat):
+    """Return rows ``(label, size, dump_time, load_time)``."""
+    protocol = pickle.HIGHEST_PROTOCOL
+    reference = AmScheme.Scheme(**config).content_hash()
+    rows = []
+
+    dump, data = best_time(lambda: pickle.dumps(config, protocol), repeat)
+    load, scheme = best_time(lambda: AmScheme.Scheme(**pickle.loads(data)),
+                             repeat)
+    assert scheme.content_hash() == reference
+    rows.append(('loose', len(data), dump, load))
+
+    compiled = AmScheme.Scheme(**config)
+    compiled.content_hash()
+    dump, data = best_time(lambda: pickle.dumps(compiled, protocol), repeat)
+    load, scheme = best_time(lambda: pickle.loads(data), repeat)
+    assert scheme.content_hash() == reference
+    rows.append(('scheme', len(data), dump, load))
+    return rows
+
+#############################################################################
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('--users', default = '0,10,100,1000',
+                        help = 'comma-separated numbers of user names')
+    parser.add_argument('--repeat', type = int, default = 20,
+                        help = 'number of repetitions, best time is shown')
+    args = parser.parse_args(argv)
+
+    print('%8s %-8s %10s %12s %12s' % ('users', 'form', 'size [B]',
+                                       'dump [us]', 'load [us]'))
+    for count in [int(s) for s in args.users.split(',')]:
+        config = synthetic_config(count)
+        for label, size, dump, load in measure(config, args.repeat):
+            print('%8d %-8s %10d %12.1f %12.1f' % (count, label, size,
+                  dump * 1e6, load * 1e6))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4: